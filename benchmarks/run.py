@@ -0,0 +1,157 @@
+"""Standalone benchmark runner: writes one JSON result file per commit.
+
+    uv run python -m benchmarks.run                     # everything -> out/benchmarks/<commit>.json
+    uv run python -m benchmarks.run --quick --only concat
+    uv run python -m benchmarks.run --compare out/benchmarks/abc1234.json
+
+Each benchmark runs in a fresh process so its peak RSS is its own.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import pathlib
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+import typer
+
+from benchmarks.scenarios import BENCHMARKS
+from benchmarks.scenarios import run_benchmark
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+RESULTS_DIR = ROOT / "out" / "benchmarks"
+
+# Metrics where a larger value is an improvement; every other number is a cost
+HIGHER_IS_BETTER = {"jobs_per_min", "combinations_per_s"}
+# Counts that describe the workload rather than measure it
+SIZES = {"jobs", "clips", "calls", "combinations"}
+
+app = typer.Typer(add_completion=False, no_args_is_help=False)
+
+
+def git_revision() -> tuple[str, bool]:
+    """Short HEAD commit and whether the work tree has uncommitted changes."""
+    try:
+        head = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return head, bool(status.strip())
+
+
+def _run_isolated(name: str, quick: bool) -> dict:
+    with tempfile.TemporaryDirectory(prefix=f"bench-{name}-") as tmp:
+        return run_benchmark(name, pathlib.Path(tmp), quick)
+
+
+def run_all(names: list[str], quick: bool = False, isolate: bool = True) -> dict[str, dict]:
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    for name in names:
+        print(f"⏱️ {name}...", flush=True)
+        if isolate:
+            with ctx.Pool(1) as pool:
+                results[name] = pool.apply(_run_isolated, (name, quick))
+        else:
+            results[name] = _run_isolated(name, quick)
+        print(f"   {results[name]}")
+    return results
+
+
+def compare(base: dict, head: dict, threshold: float = 0.10) -> list[dict]:
+    """Per-metric changes from `base` to `head` results; `regressed` past `threshold`."""
+    rows = []
+    for name, metrics in head.get("results", {}).items():
+        old = base.get("results", {}).get(name, {})
+        for key, value in metrics.items():
+            before = old.get(key)
+            if key in SIZES or not isinstance(value, int | float) or not before:
+                continue
+            change = (value - before) / before
+            worse = -change if key in HIGHER_IS_BETTER else change
+            rows.append(
+                {
+                    "benchmark": name,
+                    "metric": key,
+                    "base": before,
+                    "head": value,
+                    "change": round(change, 4),
+                    "regressed": worse > threshold,
+                }
+            )
+    return rows
+
+
+@app.command()
+def run(
+    only: list[str] = typer.Option(
+        None, "--only", help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})"
+    ),
+    quick: bool = typer.Option(False, "--quick", help="Smaller workloads for a fast smoke run"),
+    output: pathlib.Path | None = typer.Option(
+        None, "--out", "-o", help="Result file (default: out/benchmarks/<commit>.json)"
+    ),
+    baseline: pathlib.Path | None = typer.Option(
+        None, "--compare", help="Earlier result file to diff against"
+    ),
+    threshold: float = typer.Option(
+        0.10, "--threshold", help="Relative change that counts as a regression"
+    ),
+    isolate: bool = typer.Option(
+        True, "--isolate/--in-process", help="Run each benchmark in its own process"
+    ),
+):
+    """Run the benchmarks and write their metrics to JSON."""
+    names = only or list(BENCHMARKS)
+    unknown = sorted(set(names) - set(BENCHMARKS))
+    if unknown:
+        raise typer.BadParameter(f"unknown benchmark(s): {', '.join(unknown)}", param_hint="--only")
+
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": run_all(names, quick, isolate),
+    }
+    path = output or RESULTS_DIR / f"{commit}{'-dirty' if dirty else ''}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"💾 Results -> {path}")
+
+    if baseline:
+        base = json.loads(baseline.read_text(encoding="utf-8"))
+        rows = compare(base, report, threshold)
+        print(f"\nvs {base.get('commit', baseline.name)}")
+        for row in rows:
+            flag = "  ⚠️ regression" if row["regressed"] else ""
+            print(
+                f"  {row['benchmark']:<22}{row['metric']:<22}"
+                f"{row['base']:>10g} -> {row['head']:<10g}{row['change']:+.1%}{flag}"
+            )
+        if any(row["regressed"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,298 @@
+"""Benchmark scenarios shared by the standalone runner and the pytest-benchmark suite.
+
+Pipeline scenarios drive the real commands against the simulated backend
+(`veo_lab.fake_backend`) with short render times, so they measure scheduling,
+polling and post-processing overhead rather than Veo itself. Microbenchmarks time
+single helpers on synthetic clips and sessions.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import pathlib
+import resource
+import shutil
+import sys
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import yaml
+
+from veo_lab import common
+from veo_lab import fake_backend
+from veo_lab import tracing
+from veo_lab.metrics import percentile
+from veo_lab.stats import collect_metrics
+
+BENCH_MODEL = "veo-bench"
+# Stages that make up one job's latency (concat is per chain, not per job)
+JOB_STAGES = ("slot_wait", "submit", "render", "download", "last_frame")
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    fn: Callable[[pathlib.Path, bool], dict]
+    needs_ffmpeg: bool = True
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, needs_ffmpeg: bool = True) -> Callable:
+    """Register `fn(workdir, quick) -> metrics` under `name`."""
+
+    def register(fn: Callable[[pathlib.Path, bool], dict]) -> Callable:
+        BENCHMARKS[name] = Benchmark(name, fn, needs_ffmpeg)
+        return fn
+
+    return register
+
+
+def have_ffmpeg() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+@contextlib.contextmanager
+def simulated_backend(render: str = "uniform:0.2:0.6", concurrency: int = 8) -> Iterator[None]:
+    """Route every client through the fake backend with fast polling and no quota pacing."""
+    env = {
+        "VEO_BACKEND": "fake",
+        "VEO_FAKE_RENDER": render,
+        "VEO_FAKE_SEED": "1",
+        "VEO_MODEL": BENCH_MODEL,
+        "VEO_CACHE": "0",
+        "IMAGEN_CACHE": "0",
+    }
+    saved_env = {key: os.environ.get(key) for key in env}
+    saved = (common.POLLER, common.RATE_LIMITER, fake_backend._shared)
+    os.environ.update(env)
+    tracing.configure(None)
+    fake_backend._shared = None
+    common.POLLER = common.OperationPoller(
+        min_interval=0.05, max_interval=0.5, max_polls_per_second=0
+    )
+    common.RATE_LIMITER = common.RateLimiter(
+        default=common.ModelQuota(rpm=0, max_concurrent=concurrency)
+    )
+    try:
+        yield
+    finally:
+        common.POLLER, common.RATE_LIMITER, fake_backend._shared = saved
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def throughput(root: pathlib.Path, seconds: float) -> dict:
+    """Jobs/min and job latency percentiles from the session metrics under `root`."""
+    latencies: list[float] = [
+        sum(stages.get(stage, 0.0) for stage in JOB_STAGES)
+        for stages in (record.get("stages") or {} for record in collect_metrics(root))
+        if "render" in stages  # skip the concat-only records of joined outputs
+    ]
+    if not latencies:
+        return {"jobs": 0, "seconds": round(seconds, 3)}
+    return {
+        "jobs": len(latencies),
+        "seconds": round(seconds, 3),
+        "jobs_per_min": round(len(latencies) / seconds * 60, 1),
+        "p50_job_latency_s": round(percentile(latencies, 50), 3),
+        "p95_job_latency_s": round(percentile(latencies, 95), 3),
+    }
+
+
+def synthetic_clips(workdir: pathlib.Path, n: int) -> list[pathlib.Path]:
+    """`n` small MP4s from ffmpeg's test pattern (cycling through a few tints)."""
+    clips = []
+    for i in range(n):
+        clip = workdir / f"clip_{i:03d}.mp4"
+        clip.write_bytes(fake_backend.render_test_clip("16:9", i % 12 * 30))
+        clips.append(clip)
+    return clips
+
+
+def _timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+@benchmark("prompt_matrix")
+def bench_prompt_matrix(workdir: pathlib.Path, quick: bool) -> dict:
+    from veo_lab.prompt_matrix import run
+
+    subjects = ["fox", "owl", "heron", "lynx"]
+    matrix = {
+        "subject": subjects if not quick else subjects[:2],
+        "action": ["runs", "waits", "turns"],
+        "style": ["noir", "pastel"],
+    }
+    config = workdir / "matrix.yml"
+    config.write_text(yaml.safe_dump({"matrix": matrix}), encoding="utf-8")
+    template = workdir / "template.j2"
+    template.write_text("A {{ subject }} {{ action }}, {{ style }} style", encoding="utf-8")
+    out = workdir / "out"
+    with simulated_backend():
+        seconds = _timed(
+            lambda: run(
+                config=config,
+                template=template,
+                output=out,
+                dry=False,
+                concurrency=8,
+                resume=None,
+                refresh=False,
+                count=False,
+                candidates=1,
+                strategy="full",
+                seed=0,
+                shard=None,
+                preview=False,
+                promote_top=0,
+                scorer="sharpness",
+            )
+        )
+    return throughput(out, seconds)
+
+
+@benchmark("storyboard")
+def bench_storyboard(workdir: pathlib.Path, quick: bool) -> dict:
+    from veo_lab.storyboard import run
+
+    chains, length = (2, 2) if quick else (4, 3)
+    shots = [
+        {"prompt": f"Scene {c} shot {s}: the lighthouse at dusk", "carry_last_frame": s > 0}
+        for c in range(chains)
+        for s in range(length)
+    ]
+    board = workdir / "storyboard.json"
+    board.write_text(json.dumps({"shots": shots}), encoding="utf-8")
+    out = workdir / "out"
+    with simulated_backend():
+        seconds = _timed(
+            lambda: run(
+                storyboard=board,
+                output_dir=out,
+                concat_to=workdir / "storyboard.mp4",
+                model=None,
+                dry=False,
+                resume=None,
+                refresh=False,
+                concurrency=chains,
+                incremental=False,
+                preview=False,
+                promote_from=None,
+                top=0,
+                scorer="ratings",
+                ratings=workdir / "ratings.json",
+            )
+        )
+    return throughput(out, seconds)
+
+
+@benchmark("shot_chain")
+def bench_shot_chain(workdir: pathlib.Path, quick: bool) -> dict:
+    from veo_lab.shot_chain import run
+
+    prompts = [f"Shot {i}: the tide rolls over the pier" for i in range(2 if quick else 4)]
+    chain = workdir / "chain.yml"
+    chain.write_text(yaml.safe_dump({"prompts": prompts}), encoding="utf-8")
+    out = workdir / "out"
+    with simulated_backend():
+        seconds = _timed(
+            lambda: run(
+                file=chain,
+                output=out,
+                concat=str(workdir / "chain.mp4"),
+                model=None,
+                dry=False,
+                resume=None,
+                refresh=False,
+            )
+        )
+    return throughput(out, seconds)
+
+
+@benchmark("extract_last_frame")
+def bench_extract_last_frame(workdir: pathlib.Path, quick: bool) -> dict:
+    clips = synthetic_clips(workdir, 3 if quick else 12)
+    seconds = _timed(
+        lambda: [common.extract_last_frame(c, c.with_suffix(".last.jpg")) for c in clips]
+    )
+    return {"clips": len(clips), "ffmpeg_ms_per_clip": round(seconds / len(clips) * 1000, 1)}
+
+
+@benchmark("concat")
+def bench_concat(workdir: pathlib.Path, quick: bool) -> dict:
+    clips = synthetic_clips(workdir, 4 if quick else 16)
+    seconds = _timed(lambda: common.concat_videos_concat_demuxer(clips, workdir / "all.mp4"))
+    return {"clips": len(clips), "ffmpeg_ms_per_clip": round(seconds / len(clips) * 1000, 1)}
+
+
+@benchmark("save_session_metadata", needs_ffmpeg=False)
+def bench_save_session_metadata(workdir: pathlib.Path, quick: bool) -> dict:
+    calls = 50 if quick else 400
+    session = workdir / "session"
+    session.mkdir()
+
+    def save_all():
+        for i in range(calls):
+            common.save_session_metadata(
+                session, "bench", f"prompt {i}", "", BENCH_MODEL, [f"{i:04d}.mp4"]
+            )
+
+    seconds = _timed(save_all)
+    return {"calls": calls, "ms_per_call": round(seconds / calls * 1000, 3)}
+
+
+@benchmark("matrix_expansion", needs_ffmpeg=False)
+def bench_matrix_expansion(workdir: pathlib.Path, quick: bool) -> dict:
+    from jinja2 import Template
+
+    from veo_lab.prompt_matrix import iter_rendered
+    from veo_lab.prompt_matrix import plan_combinations
+    from veo_lab.sampling import parse_strategy
+
+    values = 4 if quick else 6
+    cfg = {
+        "matrix": {f"d{d}": [f"value {d}.{v}" for v in range(values)] for d in range(5)},
+        "negative": ["", "blurry"],
+    }
+    tpl = Template(" ".join(f"{{{{ d{d} }}}}" for d in range(5)))
+    rows = 0
+
+    def expand():
+        nonlocal rows
+        rows = sum(1 for _ in iter_rendered(tpl, plan_combinations(cfg, parse_strategy("full"))))
+
+    full = _timed(expand)
+    pairwise = _timed(lambda: list(plan_combinations(cfg, parse_strategy("pairwise"))))
+    return {
+        "combinations": rows,
+        "combinations_per_s": round(rows / full),
+        "pairwise_ms": round(pairwise * 1000, 1),
+    }
+
+
+def run_benchmark(name: str, workdir: pathlib.Path, quick: bool = False) -> dict:
+    """Run one benchmark, adding its peak RSS; returns {"skipped": reason} without ffmpeg."""
+    bench = BENCHMARKS[name]
+    if bench.needs_ffmpeg and not have_ffmpeg():
+        return {"skipped": "ffmpeg not installed"}
+    workdir.mkdir(parents=True, exist_ok=True)
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        result = bench.fn(workdir, quick)
+    return {**result, "peak_rss_mb": peak_rss_mb()}
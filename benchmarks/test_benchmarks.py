@@ -0,0 +1,29 @@
+"""pytest-benchmark wrappers around the shared scenarios.
+
+    uv run --with pytest-benchmark pytest benchmarks/ --benchmark-json out/benchmarks/pytest.json
+
+Each scenario's own metrics (jobs/min, p95 latency, ffmpeg ms/clip, peak RSS) are
+attached to the benchmark's `extra_info`, so they land in the JSON next to the timings.
+"""
+
+import pytest
+
+from benchmarks.scenarios import BENCHMARKS
+from benchmarks.scenarios import have_ffmpeg
+from benchmarks.scenarios import run_benchmark
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize("name", list(BENCHMARKS))
+def test_benchmark(benchmark, name, tmp_path):
+    """Time one scenario and record its metrics."""
+    if BENCHMARKS[name].needs_ffmpeg and not have_ffmpeg():
+        pytest.skip("ffmpeg not installed")
+    rounds = iter(range(1_000_000))
+
+    def scenario():
+        return run_benchmark(name, tmp_path / str(next(rounds)))
+
+    metrics = benchmark.pedantic(scenario, rounds=3, iterations=1, warmup_rounds=0)
+    benchmark.extra_info.update(metrics)
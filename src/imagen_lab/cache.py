@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+from datetime import datetime
+
+from google.genai import types
+
+from veo_lab import tracing
+from veo_lab.client import GenaiClient
+from veo_lab.common import ModelQuota
+from veo_lab.common import RateLimiter
+from veo_lab.metrics import ClipMetrics
+from veo_lab.resilience import call_with_retry
+
+CACHE_ROOT = pathlib.Path(__file__).resolve().parents[2] / "out" / "cache" / "images"
+ANALYSIS_CACHE_ROOT = CACHE_ROOT.parent / "analysis"
+
+
+def imagen_quota(model: str) -> ModelQuota:
+    """Imagen request budget (Tier 1 defaults), overridable via IMAGEN_RPM / IMAGEN_MAX_CONCURRENT."""
+    return ModelQuota(
+        rpm=float(os.environ.get("IMAGEN_RPM", 10)),
+        max_concurrent=int(os.environ.get("IMAGEN_MAX_CONCURRENT", 4)),
+    )
+
+
+# Paces generate_images calls, shared with other processes through the quota ledger
+IMAGEN_LIMITER = RateLimiter(lookup=imagen_quota, shared=True)
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("IMAGEN_CACHE", "1").lower() not in {"0", "off", "false", "no"}
+
+
+class ImageCache:
+    """On-disk store of Imagen results keyed by model, prompt and image count.
+
+    Entries live at `<root>/<key[:2]>/<key>.json` with the image bytes beside it as
+    `<key>_<N>.jpg`. Shared by imagen_lab and veo_lab.character_pack.
+    """
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model: str, prompt: str, count: int = 1) -> str:
+        fields = {"model": model, "prompt": prompt, "count": count}
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> pathlib.Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def load(self, key: str) -> tuple[list[bytes], dict] | None:
+        """Return the cached image bytes and metadata, or None on a miss."""
+        meta_path = self._path(key, ".json")
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        paths = [self._path(key, f"_{i}.jpg") for i in range(1, meta["images"] + 1)]
+        if not all(p.exists() for p in paths):
+            return None
+        return [p.read_bytes() for p in paths], meta
+
+    def store(self, key: str, images: list[bytes], **meta) -> None:
+        """Add a result to the cache, replacing any existing entry."""
+        with self._lock:
+            self.root.joinpath(key[:2]).mkdir(parents=True, exist_ok=True)
+            for i, data in enumerate(images, start=1):
+                self._path(key, f"_{i}.jpg").write_bytes(data)
+            record = {
+                "key": key,
+                "stored": datetime.now().isoformat(),
+                "images": len(images),
+                **meta,
+            }
+            self._path(key, ".json").write_text(json.dumps(record, indent=2), encoding="utf-8")
+
+
+def default_image_cache() -> ImageCache | None:
+    """The shared image cache under out/cache/images, or None when IMAGEN_CACHE=0."""
+    return ImageCache(CACHE_ROOT) if cache_enabled() else None
+
+
+def generate_images_cached(
+    client: GenaiClient,
+    model: str,
+    prompt: str,
+    count: int = 1,
+    *,
+    cache: ImageCache | None = None,
+    refresh: bool = False,
+):
+    """`client.models.generate_images`, served from the image cache when possible.
+
+    Uses `default_image_cache()` unless `cache` is given. A hit is returned as a
+    `GenerateImagesResponse` built from the stored bytes, so callers handle both
+    paths alike; `refresh=True` always calls the API and replaces the entry.
+    """
+    cache = cache if cache is not None else default_image_cache()
+    key = ImageCache.key(model, prompt, count)
+    with tracing.span("imagen.generate", model=model, count=count) as span:
+        hit = cache.load(key) if cache and not refresh else None
+        span.set("cache_hit", bool(hit))
+        if hit:
+            images, _ = hit
+            print(f"📦 Image cache hit ({key[:12]})")
+            return types.GenerateImagesResponse(
+                generated_images=[
+                    types.GeneratedImage(
+                        image=types.Image(image_bytes=data, mime_type="image/jpeg")
+                    )
+                    for data in images
+                ]
+            )
+
+        config = types.GenerateImagesConfig(number_of_images=count) if count > 1 else None
+        metrics = ClipMetrics(model=model)
+        with IMAGEN_LIMITER.slot(model):
+            response = call_with_retry(
+                lambda: client.models.generate_images(model=model, prompt=prompt, config=config),
+                model=model,
+                label="Imagen generate",
+                metrics=metrics,
+            )
+        span.set("submit_retries", metrics.submit_retries)
+        images = [
+            g.image.image_bytes
+            for g in (getattr(response, "generated_images", None) or [])
+            if isinstance(getattr(g.image, "image_bytes", None), bytes)
+        ]
+        span.set("images", len(images))
+        if cache and images:
+            cache.store(key, images, model=model, prompt=prompt, count=count)
+        return response
+
+
+class AnalysisCache:
+    """Memoized image analyses keyed by image content hash, model, prompt and size.
+
+    Entries are small JSON files at `<root>/<key[:2]>/<key>.json`.
+    """
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+
+    @staticmethod
+    def key(digest: str, model: str, prompt: str, max_edge: int) -> str:
+        fields = {"image": digest, "model": model, "prompt": prompt, "max_edge": max_edge}
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def load(self, key: str) -> dict | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def store(self, key: str, record: dict) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        tmp.replace(path)
+
+
+def default_analysis_cache() -> AnalysisCache | None:
+    """The shared analysis cache under out/cache/analysis, or None when IMAGEN_CACHE=0."""
+    return AnalysisCache(ANALYSIS_CACHE_ROOT) if cache_enabled() else None
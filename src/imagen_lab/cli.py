@@ -1,16 +1,34 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
 import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from typing import Annotated
 
 import typer
 
+from imagen_lab.cache import AnalysisCache
+from imagen_lab.cache import default_analysis_cache
+from imagen_lab.cache import generate_images_cached
+from imagen_lab.common import ANALYSIS_PROMPT
+from imagen_lab.common import IMAGE_SUFFIXES
+from imagen_lab.common import analyze_image
 from imagen_lab.common import create_client
 from imagen_lab.common import create_output_path
+from imagen_lab.common import create_prompt_snippet
+from imagen_lab.common import generate_images_to
+from imagen_lab.common import image_mime_type
 from imagen_lab.common import list_models
+from imagen_lab.common import load_batch_prompts
+from imagen_lab.common import prepare_image
 from imagen_lab.common import save_generated_image
+from imagen_lab.common import save_generated_images
 from imagen_lab.common import save_metadata
 from imagen_lab.common import save_prompt_file
+from veo_lab import tracing
 
 app = typer.Typer(
     name="imagen_lab",
@@ -20,6 +38,7 @@ app = typer.Typer(
 
 
 @app.command()
+@tracing.traced("imagen_lab.generate")
 def generate(
     prompt: Annotated[str, typer.Argument(help="Text prompt for image generation")],
     model: Annotated[
@@ -41,11 +60,16 @@ def generate(
         bool,
         typer.Option("--list-models", help="List known model ids and current default"),
     ] = False,
+    count: Annotated[
+        int,
+        typer.Option("--count", "-n", min=1, max=4, help="Images requested in the one call"),
+    ] = 1,
+    refresh: Annotated[
+        bool,
+        typer.Option("--refresh", help="Ignore cached images and generate again"),
+    ] = False,
 ) -> None:
     """Generate an image from a text prompt using Imagen."""
-    import json
-    import os
-
     if list_models_flag:
         print(json.dumps(list_models(), indent=2))
         return
@@ -70,6 +94,8 @@ def generate(
         print(f"  • Model: {picked_model}")
         print(f"  • Output directory: {output_path}")
         print(f"  • Image file: {output_path.name}.jpg")
+        if count > 1:
+            print(f"  • Images per call: {count}")
         print("  • Would create: prompt.txt, metadata.json")
         print("✅ Dry run complete - no API calls made")
         return
@@ -79,19 +105,22 @@ def generate(
     client = create_client()
 
     try:
-        # Generate image
-        response = client.models.generate_images(model=picked_model, prompt=prompt)
+        # Generate image(s) in a single call, or reuse a cached result
+        response = generate_images_cached(client, picked_model, prompt, count, refresh=refresh)
 
         # Save files with content-focused filename
-        from imagen_lab.common import create_prompt_snippet
-
         prompt_snippet = create_prompt_snippet(prompt)
-        image_filename = f"{prompt_snippet}.jpg"
-        image_path = save_generated_image(response, output_path, image_filename)
+        if count > 1:
+            image_paths = save_generated_images(response, output_path, prompt_snippet)
+        else:
+            image_paths = [save_generated_image(response, output_path, f"{prompt_snippet}.jpg")]
         save_prompt_file(output_path, prompt)
-        save_metadata(output_path, prompt, "imagen", picked_model)
+        save_metadata(
+            output_path, prompt, "imagen", picked_model, images=[p.name for p in image_paths]
+        )
 
-        print(f"✅ Generated: {image_path}")
+        for image_path in image_paths:
+            print(f"✅ Generated: {image_path}")
 
     except Exception as e:
         print(f"❌ Generation failed: {e}")
@@ -99,6 +128,97 @@ def generate(
 
 
 @app.command()
+@tracing.traced("imagen_lab.batch")
+def batch(
+    source: Annotated[
+        pathlib.Path,
+        typer.Argument(help="Prompts file (one per line) or directory of *.txt prompt files"),
+    ],
+    model: Annotated[
+        str | None, typer.Option("--model", "-m", help="Model to use for generation")
+    ] = None,
+    output: Annotated[
+        pathlib.Path | None,
+        typer.Option("--output", "-o", help="Directory for the per-prompt folders"),
+    ] = None,
+    count: Annotated[
+        int,
+        typer.Option("--count", "-n", min=1, max=4, help="Images requested per prompt"),
+    ] = 1,
+    concurrency: Annotated[
+        int,
+        typer.Option("--concurrency", "-j", min=1, help="Requests in flight at once"),
+    ] = 4,
+    dry: Annotated[
+        bool,
+        typer.Option("--dry", help="Show what would be generated without calling API"),
+    ] = False,
+    refresh: Annotated[
+        bool,
+        typer.Option("--refresh", help="Ignore cached images and generate again"),
+    ] = False,
+) -> None:
+    """Generate images for many prompts concurrently, one output folder per prompt."""
+    if not source.exists():
+        print(f"❌ Prompt source not found: {source}")
+        raise typer.Exit(1)
+
+    picked_model = model or os.environ.get("IMAGEN_MODEL") or "imagen-3.0-generate-002"
+    prompts = load_batch_prompts(source)
+    if not prompts:
+        print(f"❌ No prompts found in {source}")
+        raise typer.Exit(1)
+
+    output_path = create_output_path("imagen_batch", source.stem, output, None, picked_model)
+    print(f"Batch: {len(prompts)} prompts x {count} images ({picked_model})")
+    print(f"Output: {output_path}")
+
+    if dry:
+        print("🔍 Dry run - showing what would be generated:")
+        for name, prompt in prompts:
+            print(f"  • {name}/: {prompt[:60]}")
+        print(f"  • Concurrency: {concurrency}")
+        print("✅ Dry run complete - no API calls made")
+        return
+
+    output_path.mkdir(parents=True, exist_ok=True)
+    client = create_client()
+    results: dict[str, list[str]] = {}
+    failures: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="imagen") as pool:
+        futures = {
+            name: pool.submit(
+                tracing.bind(generate_images_to),
+                client,
+                prompt,
+                output_path / name,
+                picked_model,
+                count,
+                "imagen_batch",
+                refresh=refresh,
+            )
+            for name, prompt in prompts
+        }
+        for name, future in futures.items():
+            try:
+                paths = future.result()
+            except Exception as e:
+                failures[name] = str(e)
+                print(f"❌ {name}: {e}")
+                continue
+            results[name] = [str(p) for p in paths]
+            print(f"✅ {name}: {len(paths)} image(s)")
+
+    summary = {"model": picked_model, "count": count, "images": results, "failed": failures}
+    (output_path / "batch_results.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(f"Generated {sum(map(len, results.values()))} images for {len(results)} prompts")
+    if failures:
+        print(f"⚠️ {len(failures)} prompt(s) failed")
+        raise typer.Exit(1)
+
+
+@app.command()
+@tracing.traced("imagen_lab.analyze")
 def analyze(
     image_path: Annotated[pathlib.Path, typer.Argument(help="Path to image file")],
     model: Annotated[
@@ -119,7 +239,6 @@ def analyze(
 
     # Create client and output paths
     client = create_client()
-    analysis_prompt = "Describe this image in detail, focusing on visual elements, style, composition, and mood. Create a prompt that could be used to generate a similar image."
 
     output_path = create_output_path(
         "analyze", f"analysis_of_{image_path.stem}", output, None, model
@@ -133,24 +252,13 @@ def analyze(
         with open(image_path, "rb") as f:
             image_data = f.read()
 
-        # Create image part using genai types
-        from google.genai import types
-
-        image_part = types.Part(inline_data=types.Blob(mime_type="image/jpeg", data=image_data))
-
-        response = client.models.generate_content(
-            model=model, contents=[analysis_prompt, image_part]
-        )
-
-        generated_prompt = (
-            response.text if hasattr(response, "text") and response.text else str(response)
-        )
+        generated_prompt = analyze_image(client, model, image_data, image_mime_type(image_path))
 
         # Save analysis results
         save_prompt_file(output_path, generated_prompt)
         save_metadata(
             output_path,
-            analysis_prompt,
+            ANALYSIS_PROMPT,
             "analyze",
             model,
             source_image=str(image_path),
@@ -165,5 +273,109 @@ def analyze(
         raise typer.Exit(1)
 
 
+def _analyze_file(
+    client,
+    path: pathlib.Path,
+    model: str,
+    max_edge: int,
+    cache: AnalysisCache | None,
+    refresh: bool,
+) -> dict:
+    """Analyze one image for analyze-dir, reusing a memoized result when possible."""
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    key = AnalysisCache.key(digest, model, ANALYSIS_PROMPT, max_edge)
+    cached = cache.load(key) if cache and not refresh else None
+    if cached:
+        return {"image": str(path), **cached, "cached": True}
+
+    upload, mime_type = prepare_image(data, image_mime_type(path), max_edge)
+    record = {
+        "sha256": digest,
+        "model": model,
+        "mime_type": mime_type,
+        "bytes_sent": len(upload),
+        "prompt": analyze_image(client, model, upload, mime_type),
+    }
+    if cache:
+        cache.store(key, record)
+    return {"image": str(path), **record, "cached": False}
+
+
+@app.command("analyze-dir")
+@tracing.traced("imagen_lab.analyze_dir")
+def analyze_dir(
+    directory: Annotated[pathlib.Path, typer.Argument(help="Directory of images to analyze")],
+    model: Annotated[
+        str, typer.Option("--model", "-m", help="Vision model to use for analysis")
+    ] = "gemini-2.0-flash-exp",
+    output: Annotated[
+        pathlib.Path | None,
+        typer.Option("--output", "-o", help="JSONL file for the results"),
+    ] = None,
+    max_edge: Annotated[
+        int,
+        typer.Option("--max-edge", help="Downscale so the longest edge is at most this (0: off)"),
+    ] = 1024,
+    concurrency: Annotated[
+        int,
+        typer.Option("--concurrency", "-j", min=1, help="Requests in flight at once"),
+    ] = 4,
+    refresh: Annotated[
+        bool,
+        typer.Option("--refresh", help="Ignore memoized analyses and analyze again"),
+    ] = False,
+) -> None:
+    """Analyze every image in a directory, writing one JSON line per image."""
+    if not directory.is_dir():
+        print(f"❌ Directory not found: {directory}")
+        raise typer.Exit(1)
+
+    images = sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not images:
+        print(f"❌ No images found in {directory}")
+        raise typer.Exit(1)
+
+    if output is None:
+        output = (
+            create_output_path("analyze_dir", directory.name, None, None, model) / "analysis.jsonl"
+        )
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    print(f"Analyzing {len(images)} images in {directory} ({model})")
+    print(f"Output: {output}")
+
+    client = create_client()
+    cache = default_analysis_cache()
+    failed = cached = 0
+    with (
+        ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="analyze") as pool,
+        open(output, "w", encoding="utf-8") as f,
+    ):
+        futures = {
+            pool.submit(
+                tracing.bind(_analyze_file), client, path, model, max_edge, cache, refresh
+            ): path
+            for path in images
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                failed += 1
+                record = {"image": str(path), "error": str(e)}
+                print(f"❌ {path.name}: {e}")
+            else:
+                cached += record["cached"]
+                print(f"✅ {path.name}{' (cached)' if record['cached'] else ''}")
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+
+    print(f"Analyzed {len(images) - failed}/{len(images)} images ({cached} from cache)")
+    if failed:
+        raise typer.Exit(1)
+
+
 if __name__ == "__main__":
     app()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import io
 import json
 import os
 import pathlib
@@ -9,9 +10,35 @@ from typing import Any
 
 from dotenv import load_dotenv
 from google import genai
+from google.genai import errors
+from google.genai import types
+
+from imagen_lab.cache import ImageCache
+from imagen_lab.cache import generate_images_cached
+from veo_lab import tracing
+from veo_lab.cassette import cassette_client
+from veo_lab.client import GenaiClient
+from veo_lab.fake_backend import backend_enabled
+from veo_lab.fake_backend import fake_client
+from veo_lab.uploads import UploadCache
+from veo_lab.uploads import default_upload_cache
+from veo_lab.uploads import image_part
 
 load_dotenv()
 
+ANALYSIS_PROMPT = (
+    "Describe this image in detail, focusing on visual elements, style, composition, and "
+    "mood. Create a prompt that could be used to generate a similar image."
+)
+
+IMAGE_MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+IMAGE_SUFFIXES = set(IMAGE_MIME_TYPES)
+
 # Known Imagen model ids
 KNOWN_IMAGEN_MODELS = [
     "imagen-3.0-generate-002",
@@ -27,7 +54,13 @@ def list_models():
     }
 
 
-def create_client() -> genai.Client:
+def create_client() -> GenaiClient:
+    return cassette_client(_create_backend_client)
+
+
+def _create_backend_client() -> GenaiClient:
+    if backend_enabled():
+        return fake_client()
     return genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
 
 
@@ -120,3 +153,118 @@ def save_generated_image(
         f.write(image.image_bytes)
 
     return image_path
+
+
+def save_generated_images(
+    response: Any,
+    output_path: pathlib.Path,
+    stem: str = "generated_image",
+) -> list[pathlib.Path]:
+    """Save every image in an Imagen response as `<stem>.jpg`, or `<stem>_<N>.jpg` if several."""
+    if not hasattr(response, "generated_images") or not response.generated_images:
+        raise ValueError("No generated images in response")
+
+    images = response.generated_images
+    paths = []
+    for i, generated in enumerate(images, start=1):
+        name = f"{stem}.jpg" if len(images) == 1 else f"{stem}_{i}.jpg"
+        image_path = output_path / name
+        with open(image_path, "wb") as f:
+            f.write(generated.image.image_bytes)
+        paths.append(image_path)
+
+    return paths
+
+
+def generate_images_to(
+    client: GenaiClient,
+    prompt: str,
+    output_path: pathlib.Path,
+    model: str,
+    count: int = 1,
+    script_name: str = "imagen",
+    cache: ImageCache | None = None,
+    refresh: bool = False,
+) -> list[pathlib.Path]:
+    """Request `count` images in one call and write them, prompt.txt and metadata.json.
+
+    Repeated requests are served from the image cache; see `generate_images_cached`.
+    """
+    response = generate_images_cached(client, model, prompt, count, cache=cache, refresh=refresh)
+
+    output_path.mkdir(parents=True, exist_ok=True)
+    paths = save_generated_images(response, output_path, create_prompt_snippet(prompt))
+    save_prompt_file(output_path, prompt)
+    save_metadata(
+        output_path, prompt, script_name, model, images=[p.name for p in paths], requested=count
+    )
+    return paths
+
+
+def load_batch_prompts(source: pathlib.Path) -> list[tuple[str, str]]:
+    """Read (name, prompt) pairs for a batch run.
+
+    A directory contributes one prompt per `*.txt` file, named after the file; a file
+    contributes one prompt per non-empty line, named by line number and snippet.
+    """
+    if source.is_dir():
+        return [
+            (path.stem, text)
+            for path in sorted(source.glob("*.txt"))
+            if (text := path.read_text(encoding="utf-8").strip())
+        ]
+    lines = [ln.strip() for ln in source.read_text(encoding="utf-8").splitlines() if ln.strip()]
+    return [(f"{i:03d}_{create_prompt_snippet(ln)}", ln) for i, ln in enumerate(lines, start=1)]
+
+
+def image_mime_type(path: pathlib.Path) -> str:
+    """MIME type for an image file based on its extension (JPEG if unknown)."""
+    return IMAGE_MIME_TYPES.get(path.suffix.lower(), "image/jpeg")
+
+
+def prepare_image(data: bytes, mime_type: str, max_edge: int = 0) -> tuple[bytes, str]:
+    """Downscale an image so its longest edge is at most `max_edge` and re-encode it.
+
+    Images with transparency are re-encoded as PNG, everything else as JPEG. Images
+    already within bounds (or `max_edge <= 0`) are returned unchanged.
+    """
+    if max_edge <= 0:
+        return data, mime_type
+
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        if max(img.size) <= max_edge:
+            return data, mime_type
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if has_alpha:
+            img.save(out, format="PNG", optimize=True)
+            return out.getvalue(), "image/png"
+        img.convert("RGB").save(out, format="JPEG", quality=90)
+        return out.getvalue(), "image/jpeg"
+
+
+def analyze_image(
+    client: GenaiClient, model: str, data: bytes, mime_type: str, prompt: str = ANALYSIS_PROMPT
+) -> str:
+    """Ask a vision model to describe an image as a generation prompt.
+
+    The image goes through the upload cache, so re-analyzing it sends a Files API
+    reference instead of the bytes.
+    """
+    cache = default_upload_cache()
+    part = image_part(client, data, mime_type, cache)
+    uploaded = part.file_data is not None
+    with tracing.span("imagen.analyze", model=model, bytes=len(data), uploaded=uploaded):
+        try:
+            response = client.models.generate_content(model=model, contents=[prompt, part])
+        except errors.ClientError as e:
+            if not (uploaded and cache and e.code in (403, 404)):
+                raise
+            # The upload was deleted or expired early: forget it and send the bytes
+            cache.forget(UploadCache.digest(data))
+            part = types.Part(inline_data=types.Blob(mime_type=mime_type, data=data))
+            response = client.models.generate_content(model=model, contents=[prompt, part])
+    return response.text if hasattr(response, "text") and response.text else str(response)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import pathlib
+import sys
 
 import streamlit as st
 
@@ -10,8 +11,8 @@ OUT = ROOT / "out"
 RATINGS = OUT / "ratings.json"
 
 
-def load_results() -> list[pathlib.Path]:
-    return sorted(p for p in OUT.glob("*.mp4"))
+def load_results(root: pathlib.Path = OUT) -> list[pathlib.Path]:
+    return sorted(p for p in root.glob("*.mp4"))
 
 
 def load_ratings() -> dict[str, int]:
@@ -28,7 +29,8 @@ def save_ratings(data: dict[str, int]):
 def main():
     st.set_page_config(page_title="Veo3 A/B Viewer", layout="wide")
     st.title("Veo3 A/B Viewer")
-    videos = load_results()
+    # `streamlit run ab_viewer.py -- <session dir>` rates a session's clips, e.g. a preview tier
+    videos = load_results(pathlib.Path(sys.argv[1]) if len(sys.argv) > 1 else OUT)
     ratings = load_ratings()
     cols = st.columns(3)
     for i, vid in enumerate(videos):
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import threading
+from collections.abc import Sequence
+from datetime import datetime
+
+# Linux FICLONE ioctl: copy-on-write clone on btrfs/xfs/etc.
+_FICLONE = 0x40049409
+
+
+def link_or_copy(src: pathlib.Path, dst: pathlib.Path) -> str:
+    """Materialize `src` at `dst` as cheaply as the filesystem allows.
+
+    Tries a hardlink, then a reflink, then falls back to a plain copy. Returns the
+    method used.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.exists() and os.path.samefile(src, dst):
+        return "same"
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        pass
+    with contextlib.suppress(OSError, ImportError):
+        import fcntl
+
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return "reflink"
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+def image_digest(image) -> str:
+    """Content hash of a reference image (inline bytes or URI); empty for no image."""
+    if image is None:
+        return ""
+    data = getattr(image, "image_bytes", None)
+    if isinstance(data, bytes):
+        return hashlib.sha256(data).hexdigest()
+    uri = getattr(image, "gcs_uri", None)
+    return hashlib.sha256(str(uri or repr(image)).encode("utf-8")).hexdigest()
+
+
+def cache_enabled() -> bool:
+    return os.environ.get("VEO_CACHE", "1").lower() not in {"0", "off", "false", "no"}
+
+
+class VideoCache:
+    """Content-addressed store of finished clips and their last frames.
+
+    Entries live at `<root>/<key[:2]>/<key>.mp4` (plus `.last.jpg` and `.json`), where
+    the key hashes everything that determines a render: model, prompt, negative,
+    aspect ratio, reference-image bytes and the number of candidates requested.
+    Extra candidates are stored alongside as `<key>.c<N>.mp4`. Hits are linked into
+    the new session.
+    """
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        model: str, prompt: str, negative: str, aspect_ratio: str, image=None, candidates: int = 1
+    ) -> str:
+        fields: dict[str, str | int] = {
+            "model": model,
+            "prompt": prompt,
+            "negative": negative,
+            "aspect_ratio": aspect_ratio,
+            "image": image_digest(image),
+        }
+        if candidates > 1:  # single-candidate keys predate the field
+            fields["candidates"] = candidates
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> pathlib.Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def lookup(self, key: str) -> dict | None:
+        """Return the entry's metadata if the clip is cached."""
+        meta_path = self._path(key, ".json")
+        if not (meta_path.exists() and self._path(key, ".mp4").exists()):
+            return None
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+
+    def restore(
+        self, key: str, dest: pathlib.Path
+    ) -> tuple[pathlib.Path, pathlib.Path | None, dict] | None:
+        """Link a cached clip (and last frame) to `dest`; None on a miss."""
+        hit = self.restore_all(key, [dest])
+        if hit is None:
+            return None
+        restored, thumb, meta = hit
+        return restored[0], thumb, meta
+
+    def restore_all(
+        self, key: str, dests: list[pathlib.Path]
+    ) -> tuple[list[pathlib.Path], pathlib.Path | None, dict] | None:
+        """Link every cached candidate to `dests` in order; None on a miss.
+
+        Returns the restored paths (at most as many as were cached), the first
+        candidate's last frame and the entry's metadata.
+        """
+        meta = self.lookup(key)
+        if meta is None:
+            return None
+        restored = []
+        thumb = None
+        for index, path in enumerate(dests[: meta.get("candidates", 1)]):
+            suffix = f".c{index + 1}" if index else ""
+            if not self._path(key, f"{suffix}.mp4").exists():
+                break
+            link_or_copy(self._path(key, f"{suffix}.mp4"), path)
+            restored.append(path)
+            thumb_src = self._path(key, f"{suffix}.last.jpg")
+            if thumb_src.exists():
+                link_or_copy(thumb_src, path.with_suffix(".last.jpg"))
+                if index == 0:
+                    thumb = path.with_suffix(".last.jpg")
+        return restored, thumb, meta
+
+    def store(
+        self,
+        key: str,
+        video: pathlib.Path,
+        thumb: pathlib.Path | None = None,
+        extras: Sequence[tuple[pathlib.Path, pathlib.Path | None]] = (),
+        **meta,
+    ) -> None:
+        """Add a finished clip to the cache, replacing any existing entry.
+
+        `extras` holds the (clip, last frame) pairs of any further candidates.
+        """
+        with self._lock:
+            for index, (clip, last) in enumerate([(video, thumb), *extras]):
+                suffix = f".c{index + 1}" if index else ""
+                link_or_copy(clip, self._path(key, f"{suffix}.mp4"))
+                if last and last.exists():
+                    link_or_copy(last, self._path(key, f"{suffix}.last.jpg"))
+            if extras:
+                meta["candidates"] = len(extras) + 1
+            record = {"key": key, "stored": datetime.now().isoformat(), **meta}
+            self._path(key, ".json").write_text(json.dumps(record, indent=2), encoding="utf-8")
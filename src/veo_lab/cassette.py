@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import collections
+import hashlib
+import io
+import json
+import os
+import pathlib
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC
+from datetime import datetime
+from typing import Any
+
+import typer
+from google.genai import errors
+from google.genai import types
+from pydantic import BaseModel
+
+from .client import GenaiClient
+from .client import video_operation
+from .metrics import percentile
+
+CALLS_FILE = "calls.jsonl"
+BLOB_DIR = "blobs"
+
+app = typer.Typer(add_completion=False, no_args_is_help=True)
+
+
+class CassetteMissError(LookupError):
+    """A replayed call has no matching (unused) recording."""
+
+
+class Cassette:
+    """A directory of recorded client calls: `calls.jsonl` plus content-addressed blobs.
+
+    Each line holds the call (`kind`, e.g. "models.generate_videos"), its request
+    parameters, a `key` hashing them, the wall-clock `at` it started, its `duration`,
+    and either the response or the API error. Video and image bytes, in requests and
+    responses alike, are stored once under `blobs/<sha256>` and referenced as
+    `{"$blob": sha256}`.
+    """
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self.calls_path = root / CALLS_FILE
+        self._lock = threading.Lock()
+
+    # --- serialization ---
+
+    def _store_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.root / BLOB_DIR / digest
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        return digest
+
+    def dump(self, value, store: bool = True) -> Any:
+        """JSON-safe copy of `value` with bytes swapped for blob references."""
+        if isinstance(value, BaseModel):
+            return {
+                "$type": type(value).__name__,
+                **self.dump(value.model_dump(exclude_none=True), store),
+            }
+        if isinstance(value, io.BytesIO):  # files.upload sources
+            value = value.getvalue()
+        if isinstance(value, bytes):
+            digest = self._store_blob(value) if store else hashlib.sha256(value).hexdigest()
+            return {"$blob": digest}
+        if isinstance(value, dict):
+            return {str(k): self.dump(v, store) for k, v in value.items() if v is not None}
+        if isinstance(value, list | tuple):
+            return [self.dump(v, store) for v in value]
+        if value is None or isinstance(value, str | int | float | bool):
+            return value
+        return str(value)
+
+    def load(self, value):
+        """Inverse of `dump`: blob references become bytes, `$type` dicts SDK objects."""
+        if isinstance(value, list):
+            return [self.load(v) for v in value]
+        if not isinstance(value, dict):
+            return value
+        if "$blob" in value:
+            return (self.root / BLOB_DIR / value["$blob"]).read_bytes()
+        fields = {k: self.load(v) for k, v in value.items() if k != "$type"}
+        model = getattr(types, value.get("$type", ""), None)
+        return model.model_validate(fields) if model else fields
+
+    @staticmethod
+    def request_key(kind: str, request: dict) -> str:
+        blob = json.dumps({"kind": kind, **request}, sort_keys=True)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+    # --- recording ---
+
+    def record(self, entry: dict) -> None:
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.calls_path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def entries(self) -> list[dict]:
+        if not self.calls_path.exists():
+            return []
+        rows = []
+        for line in self.calls_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                rows.append(json.loads(line))
+        return rows
+
+
+def _dump_error(error: BaseException) -> dict:
+    if isinstance(error, errors.APIError):
+        return {"code": error.code, "details": error.details}
+    return {"type": type(error).__name__, "message": str(error)}
+
+
+def _load_error(recorded: dict) -> BaseException:
+    code = recorded.get("code")
+    if code is not None:
+        cls = errors.ClientError if code < 500 else errors.ServerError
+        return cls(code, recorded.get("details"))
+    return RuntimeError(f"{recorded.get('type', 'Error')}: {recorded.get('message', '')}")
+
+
+class _Namespace:
+    """One client namespace whose calls all go to `call(kind, args, kwargs)`."""
+
+    def __init__(self, call: Callable[[str, tuple, dict], Any], namespace: str):
+        self._call = call
+        self._namespace = namespace
+
+    def _forward(self, name: str, *args, **kwargs) -> Any:
+        return self._call(f"{self._namespace}.{name}", args, kwargs)
+
+
+class _Models(_Namespace):
+    def generate_videos(self, **kwargs: Any) -> types.GenerateVideosOperation:
+        return self._forward("generate_videos", **kwargs)
+
+    def generate_images(self, **kwargs: Any) -> types.GenerateImagesResponse:
+        return self._forward("generate_images", **kwargs)
+
+    def generate_content(self, **kwargs: Any) -> types.GenerateContentResponse:
+        return self._forward("generate_content", **kwargs)
+
+
+class _Operations(_Namespace):
+    def get(
+        self, operation: types.GenerateVideosOperation, **kwargs: Any
+    ) -> types.GenerateVideosOperation:
+        return self._forward("get", operation, **kwargs)
+
+
+class _Files(_Namespace):
+    def download(self, **kwargs: Any) -> bytes:
+        return self._forward("download", **kwargs)
+
+    def upload(self, **kwargs: Any) -> types.File:
+        return self._forward("upload", **kwargs)
+
+
+class RecordingClient:
+    """Proxy for a `genai.Client` that appends every models/operations/files call to a cassette."""
+
+    def __init__(self, inner: GenaiClient, cassette: Cassette):
+        self._inner = inner
+        self.cassette = cassette
+        self.models = _Models(self._record, "models")
+        self.operations = _Operations(self._record, "operations")
+        self.files = _Files(self._record, "files")
+
+    def __getattr__(self, name: str):
+        return getattr(self._inner, name)
+
+    def _record(self, kind: str, args: tuple, kwargs: dict) -> Any:
+        namespace, _, name = kind.partition(".")
+        method = getattr(getattr(self._inner, namespace), name)
+        cassette = self.cassette
+        request = cassette.dump({"args": list(args), **kwargs})
+        entry = {"kind": kind, "key": cassette.request_key(kind, request), "request": request}
+        entry["at"] = time.time()
+        start = time.monotonic()
+        try:
+            result = method(*args, **kwargs)
+        except Exception as e:
+            entry.update(duration=time.monotonic() - start, error=_dump_error(e))
+            cassette.record(entry)
+            raise
+        entry.update(duration=time.monotonic() - start, response=cassette.dump(result))
+        cassette.record(entry)
+        return result
+
+
+def _op_name(entry: dict) -> str:
+    name = (entry.get("response") or {}).get("name")
+    if name:
+        return name
+    target = (entry["request"].get("args") or [None])[0] or entry["request"].get("operation")
+    return target.get("name", "") if isinstance(target, dict) else ""
+
+
+def operation_timings(entries: list[dict]) -> dict[str, dict]:
+    """Recorded polls of each video operation, keyed by operation name.
+
+    Each value holds the first pending and first done `operations.get` entries, the
+    failed polls, and `render`: seconds from the submit response to the done poll.
+    """
+    submitted: dict[str, float] = {}
+    ops: dict[str, dict] = {}
+    for entry in entries:
+        if entry["kind"] == "models.generate_videos" and "response" in entry:
+            submitted[_op_name(entry)] = entry["at"] + entry["duration"]
+        if entry["kind"] != "operations.get":
+            continue
+        op = ops.setdefault(_op_name(entry), {"pending": None, "done": None, "errors": []})
+        if "error" in entry:
+            op["errors"].append(entry)
+        elif entry["response"].get("done"):
+            op["done"] = op["done"] or entry
+        else:
+            op["pending"] = op["pending"] or entry
+    for name, op in ops.items():
+        if op["done"] and name in submitted:
+            done = op["done"]
+            op["render"] = max(0.0, done["at"] + done["duration"] - submitted[name])
+    return ops
+
+
+class ReplayClient:
+    """Serves a cassette's responses back in place of a `genai.Client`, without network.
+
+    Calls are matched on their request parameters (first unused recording wins) and
+    take their recorded duration times `scale`. Video operations stay pending for
+    their recorded submit-to-done time times `scale`, however often they are polled.
+    """
+
+    def __init__(self, cassette: Cassette, scale: float = 1.0):
+        self.cassette = cassette
+        self.scale = scale
+        self._lock = threading.Lock()
+        self._queues: dict[tuple[str, str], collections.deque] = collections.defaultdict(
+            collections.deque
+        )
+        self._ops = operation_timings(cassette.entries())
+        self._started: dict[str, float] = {}
+        for entry in cassette.entries():
+            if entry["kind"] != "operations.get":
+                self._queues[(entry["kind"], entry["key"])].append(entry)
+        self.models = _Models(self.call, "models")
+        self.operations = _Operations(self.call, "operations")
+        self.files = _Files(self.call, "files")
+
+    def _wait(self, entry: dict) -> None:
+        if self.scale > 0:
+            time.sleep(entry.get("duration", 0.0) * self.scale)
+
+    def call(self, kind: str, args: tuple, kwargs: dict):
+        if kind == "operations.get":
+            return self._get_operation(args[0] if args else kwargs["operation"])
+        request = self.cassette.dump({"args": list(args), **kwargs}, store=False)
+        key = self.cassette.request_key(kind, request)
+        with self._lock:
+            queue = self._queues.get((kind, key))
+            if not queue:
+                raise CassetteMissError(f"no recorded {kind} call matches this request ({key})")
+            entry = queue.popleft()
+            name = (entry.get("response") or {}).get("name")
+            if name and kind == "models.generate_videos":
+                self._started[name] = time.monotonic() + entry["duration"] * self.scale
+        self._wait(entry)
+        if "error" in entry:
+            raise _load_error(entry["error"])
+        result = self.cassette.load(entry["response"])
+        if kind == "files.download" and isinstance(result, bytes):
+            # The SDK fills in the downloaded video's bytes; mirror that
+            target = kwargs.get("file") or (args[0] if args else None)
+            if isinstance(target, types.Video) and not target.video_bytes:
+                target.video_bytes = result
+        return result
+
+    def _get_operation(self, operation):
+        name = getattr(operation, "name", None) or ""
+        with self._lock:
+            op = self._ops.get(name)
+            if op is None or op["done"] is None:
+                raise CassetteMissError(f"operation {name} was not recorded to completion")
+            started = self._started.setdefault(name, time.monotonic())
+            error = op["errors"].pop(0) if op["errors"] else None
+        entry = error or op["done"]
+        self._wait(entry)
+        if error:
+            raise _load_error(error["error"])
+        if time.monotonic() - started < op.get("render", 0.0) * self.scale:
+            pending = op["pending"]
+            if pending:
+                return self.cassette.load(pending["response"])
+            return video_operation(name)
+        return self.cassette.load(op["done"]["response"])
+
+
+def cassette_client(make_client: Callable[[], GenaiClient]) -> GenaiClient:
+    """`make_client()`, recorded or replaced by a replay as selected by VEO_CASSETTE.
+
+    VEO_CASSETTE=record:<dir> appends every call to the cassette in <dir>;
+    VEO_CASSETTE=replay:<dir> serves them back without creating a real client, with
+    recorded latencies multiplied by VEO_CASSETTE_SCALE (default 1, 0 = no waiting).
+    """
+    setting = os.environ.get("VEO_CASSETTE", "").strip()
+    if not setting:
+        return make_client()
+    mode, _, path = setting.partition(":")
+    if mode not in {"record", "replay"} or not path:
+        raise ValueError(f"VEO_CASSETTE must be record:<dir> or replay:<dir>, not {setting!r}")
+    cassette = Cassette(pathlib.Path(path))
+    if mode == "record":
+        print(f"📼 Recording API calls to {cassette.root}")
+        return RecordingClient(make_client(), cassette)
+    if not cassette.calls_path.exists():
+        raise FileNotFoundError(f"no cassette at {cassette.calls_path}")
+    scale = float(os.environ.get("VEO_CASSETTE_SCALE", 1.0))
+    print(f"📼 Replaying API calls from {cassette.root} (latency x{scale:g})")
+    return ReplayClient(cassette, scale)
+
+
+def summarize(entries: list[dict]) -> dict:
+    """Call counts, errors, submission inter-arrival and operation completion times."""
+    calls: dict[str, dict] = {}
+    for entry in entries:
+        row = calls.setdefault(entry["kind"], {"calls": 0, "errors": {}, "durations": []})
+        row["calls"] += 1
+        row["durations"].append(entry["duration"])
+        if "error" in entry:
+            code = str(entry["error"].get("code") or entry["error"].get("type"))
+            row["errors"][code] = row["errors"].get(code, 0) + 1
+    submits = sorted(e["at"] for e in entries if e["kind"] == "models.generate_videos")
+    gaps = [b - a for a, b in zip(submits, submits[1:], strict=False)]
+    renders = [op["render"] for op in operation_timings(entries).values() if "render" in op]
+    summary = {}
+    for kind, row in sorted(calls.items()):
+        durations = row.pop("durations")
+        summary[kind] = {
+            **row,
+            "p50_s": percentile(durations, 50),
+            "p95_s": percentile(durations, 95),
+        }
+    if gaps:
+        summary["submit_interarrival"] = {
+            "p50_s": percentile(gaps, 50),
+            "p95_s": percentile(gaps, 95),
+        }
+    if renders:
+        summary["render"] = {
+            "n": len(renders),
+            "p50_s": percentile(renders, 50),
+            "p95_s": percentile(renders, 95),
+        }
+    return summary
+
+
+@app.command()
+def info(
+    cassette_dir: pathlib.Path = typer.Argument(..., help="Cassette directory"),
+    as_json: bool = typer.Option(False, "--json", help="Print the summary as JSON"),
+):
+    """Summarize a cassette's job mix: calls, errors, latencies, arrivals and render times."""
+    entries = Cassette(cassette_dir).entries()
+    if not entries:
+        raise typer.BadParameter(f"no recorded calls in {cassette_dir}")
+    summary = summarize(entries)
+    if as_json:
+        print(json.dumps(summary, indent=2))
+        return
+    span = max(e["at"] + e["duration"] for e in entries) - min(e["at"] for e in entries)
+    first = datetime.fromtimestamp(min(e["at"] for e in entries), UTC).isoformat(timespec="seconds")
+    print(f"📼 {len(entries)} calls over {span:.0f}s from {first}")
+    for name, row in summary.items():
+        cells = "  ".join(
+            f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()
+        )
+        print(f"  {name:<28}{cells}")
+
+
+if __name__ == "__main__":
+    app()
@@ -2,23 +2,30 @@ from __future__ import annotations
 
 import os
 import pathlib
-import time
 
 import typer
 
+from imagen_lab.cache import generate_images_cached
+
+from . import tracing
 from .common import OUT
+from .common import JobScheduler
 from .common import create_client
-from .common import generate_video
 from .common import image_from_file
+from .common import open_session
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
 
 
 @app.command()
+@tracing.traced("character_pack.run")
 def run(
     scene_prompt: str = typer.Option(..., "--scene"),
     ref_dir: pathlib.Path | None = typer.Option(None, "--ref-dir"),
     imagen_prompts_file: pathlib.Path | None = typer.Option(None, "--imagen-prompts"),
+    imagen_model: str | None = typer.Option(
+        None, "--imagen-model", help="Imagen model for --imagen-prompts (default: IMAGEN_MODEL)"
+    ),
     k: int = typer.Option(3),
     output: pathlib.Path = typer.Option(OUT, "--out"),
     model: str | None = typer.Option(
@@ -29,11 +36,28 @@ def run(
     dry: bool = typer.Option(
         False, "--dry", help="Show what would be generated without calling API"
     ),
+    concurrency: int | None = typer.Option(
+        None, "--concurrency", "-j", help="Jobs in flight at once (default: model quota)"
+    ),
+    resume: pathlib.Path | None = typer.Option(
+        None, "--resume", help="Resume an interrupted session directory from its journal"
+    ),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Ignore cached images and clips and generate again (replaces the cache entries)",
+    ),
+    candidates: int = typer.Option(
+        1, "--candidates", "-n", min=1, help="Videos requested per Veo call (all are saved)"
+    ),
 ):
     # Model selection
     picked_model = model or os.environ.get("VEO_MODEL")
     if not picked_model:
         raise typer.BadParameter("Specify --model or set VEO_MODEL environment variable")
+    picked_imagen_model = (
+        imagen_model or os.environ.get("IMAGEN_MODEL") or "imagen-3.0-generate-002"
+    )
 
     if dry:
         print(f"🔍 Dry run - character pack with {k} references:")
@@ -54,7 +78,10 @@ def run(
                 if ln.strip()
             ]
             print(f"  • Imagen prompts file: {imagen_prompts_file} ({len(lines[:k])} prompts)")
+            print(f"  • Imagen model: {picked_imagen_model}")
         print(f"  • Model: {picked_model}")
+        if candidates > 1:
+            print(f"  • Candidates per reference: {candidates}")
         print(f"  • Output directory: {output}")
         print("✅ Dry run complete - no API calls made")
         return
@@ -79,30 +106,40 @@ def run(
         ]
         for ln in lines[:k]:
             try:
-                r = client.models.generate_images(model="imagen-3.0-generate-002", prompt=ln)
+                r = generate_images_cached(client, picked_imagen_model, ln, refresh=refresh)
                 if r.generated_images:
                     refs.append(r.generated_images[0].image)
             except Exception as e:
                 print(f"Imagen generate failed: {e}")
     assert refs, "no reference images available (provide --ref-dir or --imagen-prompts)"
+    session_dir, journal = open_session(
+        "character_pack", scene_prompt, output, picked_model, resume
+    )
     outs = []
-    for i, ref in enumerate(refs, start=1):
-        # Add rate limit protection: wait 30 seconds between requests (except first)
-        if i > 1:
-            print("⏳ Waiting 30 seconds to respect rate limits...")
-            time.sleep(30)
-
-        print(f"🎬 Generating video {i}/{len(refs)} with character reference...")
-        res = generate_video(
-            client,
-            scene_prompt,
-            image=ref,
-            out_dir=output,
-            name_prefix=f"pack{i:02d}-",
-            model=picked_model,
-        )
-        outs.append(res.path)
-    print(f"✅ Completed {len(outs)} clips -> {output}")
+    with JobScheduler(concurrency, picked_model) as scheduler:
+        futures = []
+        for i, ref in enumerate(refs, start=1):
+            print(f"🎬 Queued video {i}/{len(refs)} with character reference...")
+            futures.append(
+                scheduler.submit_video(
+                    client,
+                    scene_prompt,
+                    image=ref,
+                    name_prefix=f"pack{i:02d}-",
+                    model=picked_model,
+                    script_name="character_pack",
+                    session_dir=session_dir,
+                    journal=journal,
+                    refresh=refresh,
+                    candidates=candidates,
+                )
+            )
+        for i, future in enumerate(futures, start=1):
+            try:
+                outs.extend(future.result().candidates)
+            except Exception as e:
+                print(f"❌ Video {i}/{len(refs)} failed: {e}")
+    print(f"✅ Completed {len(outs)} clips -> {session_dir}")
 
 
 if __name__ == "__main__":
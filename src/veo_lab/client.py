@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Any
+from typing import Protocol
+
+from google.genai import types
+
+
+class ModelsAPI(Protocol):
+    def generate_videos(
+        self,
+        *,
+        model: str,
+        prompt: str | None = None,
+        image: types.Image | None = None,
+        config: types.GenerateVideosConfig | None = None,
+    ) -> types.GenerateVideosOperation: ...
+
+    def generate_images(
+        self, *, model: str, prompt: str, config: types.GenerateImagesConfig | None = None
+    ) -> types.GenerateImagesResponse: ...
+
+    def generate_content(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> types.GenerateContentResponse: ...
+
+
+class OperationsAPI(Protocol):
+    def get(self, operation: types.GenerateVideosOperation) -> types.GenerateVideosOperation: ...
+
+
+class FilesAPI(Protocol):
+    def download(self, *, file: Any) -> bytes: ...
+
+    def upload(self, *, file: Any, config: types.UploadFileConfig | None = None) -> types.File: ...
+
+
+class GenaiClient(Protocol):
+    """The part of `genai.Client` that veo_lab and imagen_lab call.
+
+    `genai.Client` satisfies it, as do the simulated backend (`fake_backend.FakeClient`)
+    and the cassette clients (`cassette.RecordingClient`, `cassette.ReplayClient`).
+    """
+
+    @property
+    def models(self) -> ModelsAPI: ...
+
+    @property
+    def operations(self) -> OperationsAPI: ...
+
+    @property
+    def files(self) -> FilesAPI: ...
+
+
+def video_operation(
+    name: str, done: bool = False, response: types.GenerateVideosResponse | None = None
+) -> types.GenerateVideosOperation:
+    """A `GenerateVideosOperation` handle, e.g. to poll an operation known only by name."""
+    fields: dict[str, Any] = {"name": name, "done": done}
+    if response is not None:
+        fields["response"] = response
+    return types.GenerateVideosOperation.model_validate(fields)
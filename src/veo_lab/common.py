@@ -7,15 +7,40 @@ import os
 import pathlib
 import re
 import subprocess
+import threading
 import time
+from collections.abc import Callable
 from collections.abc import Iterable
+from collections.abc import Sequence
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from dataclasses import field
 from datetime import datetime
 
 from dotenv import load_dotenv  # add
 from google import genai
 from google.genai import types
 
+from . import tracing
+from .cache import VideoCache
+from .cache import cache_enabled
+from .cassette import cassette_client
+from .client import GenaiClient
+from .client import video_operation
+from .fake_backend import backend_enabled
+from .fake_backend import fake_client
+from .journal import DONE
+from .journal import FAILED
+from .journal import SUBMITTED
+from .journal import SUBMITTING
+from .journal import JobJournal
+from .metrics import ClipMetrics
+from .quota import default_ledger
+from .resilience import PERMANENT
+from .resilience import call_with_retry
+from .resilience import classify
+
 load_dotenv()  # add (loads .env from project root)
 
 
@@ -31,6 +56,198 @@ KNOWN_VEO_MODELS = [
 ]
 
 
+@dataclass(frozen=True)
+class ModelQuota:
+    """Per-model budget: submissions per minute and operations in flight at once."""
+
+    rpm: float
+    max_concurrent: int
+
+
+# Tier 1 Gemini API limits (see README "Rate Limit Protection"). A non-positive rpm
+# disables pacing for that model.
+DEFAULT_QUOTA = ModelQuota(rpm=2, max_concurrent=2)
+MODEL_QUOTAS: dict[str, ModelQuota] = {
+    "veo-3.0-generate-preview": ModelQuota(rpm=2, max_concurrent=2),
+    "veo-3.0-fast-generate-preview": ModelQuota(rpm=2, max_concurrent=2),
+    "veo-2.0-generate-001": ModelQuota(rpm=2, max_concurrent=2),
+}
+
+
+def model_quota(model: str) -> ModelQuota:
+    """Return the quota for `model`, honoring VEO_RPM / VEO_MAX_CONCURRENT overrides."""
+    base = MODEL_QUOTAS.get(model, DEFAULT_QUOTA)
+    return ModelQuota(
+        rpm=float(os.environ.get("VEO_RPM", base.rpm)),
+        max_concurrent=int(os.environ.get("VEO_MAX_CONCURRENT", base.max_concurrent)),
+    )
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate_per_minute`.
+
+    Callers reserve a token up front (the balance may go negative) and then sleep
+    off their debt, so waiting threads are served in arrival order.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = 1.0):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, blocking until it is available. Returns seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """Per-model token buckets plus a cap on concurrently running operations.
+
+    With `shared=True` the quota is also enforced across processes: submissions are
+    paced and operations counted through the host-wide `QuotaLedger` (unless
+    VEO_QUOTA_LEDGER=0), so parallel CLI runs share one budget per model.
+    """
+
+    def __init__(
+        self,
+        quotas: dict[str, ModelQuota] | None = None,
+        default: ModelQuota | None = None,
+        lookup: Callable[[str], ModelQuota] = model_quota,
+        shared: bool = False,
+    ):
+        self._quotas = quotas or {}
+        self._default = default
+        self._lookup = lookup
+        self._shared = shared
+        self._buckets: dict[str, TokenBucket] = {}
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def quota(self, model: str) -> ModelQuota:
+        return self._quotas.get(model) or self._default or self._lookup(model)
+
+    def _state(self, model: str) -> tuple[TokenBucket, threading.BoundedSemaphore]:
+        with self._lock:
+            if model not in self._buckets:
+                quota = self.quota(model)
+                self._buckets[model] = TokenBucket(quota.rpm)
+                self._slots[model] = threading.BoundedSemaphore(max(1, quota.max_concurrent))
+            return self._buckets[model], self._slots[model]
+
+    @contextlib.contextmanager
+    def slot(self, model: str, submit: bool = True):
+        """Hold one in-flight operation slot for `model`, paced by its token bucket.
+
+        Pass `submit=False` when re-attaching to an existing operation: it still
+        occupies a slot but does not spend a request token.
+        """
+        bucket, slots = self._state(model)
+        ledger = default_ledger() if self._shared else None
+        with slots:
+            if ledger is None:
+                waited = bucket.acquire() if submit else 0.0
+                if waited >= 1:
+                    print(f"⏳ Waited {waited:.0f}s for {model} quota")
+                yield
+                return
+            quota = self.quota(model)
+            with ledger.lease(model, quota.max_concurrent) as held_off:
+                if held_off >= 1:
+                    print(f"⏳ Waited {held_off:.0f}s for a {model} slot held by another process")
+                waited = ledger.acquire(model, quota.rpm) if submit else 0.0
+                if waited >= 1:
+                    print(f"⏳ Waited {waited:.0f}s for {model} quota")
+                yield
+
+
+# Shared by every generate_video call in this process, and with other processes
+RATE_LIMITER = RateLimiter(shared=True)
+
+
+class JobScheduler:
+    """Keep several generation jobs in flight at once.
+
+    Jobs run on a thread pool and block inside `RateLimiter.slot`, so submissions
+    are paced by the model quota rather than fixed sleeps. Videos queued with
+    `submit_video` are pipelined: once an operation finishes, its download and
+    ffmpeg post-processing move to a separate pool of `post_workers` threads so the
+    render worker can submit the next job straight away.
+    """
+
+    def __init__(
+        self, max_workers: int | None = None, model: str | None = None, post_workers: int = 2
+    ):
+        workers = max_workers or RATE_LIMITER.quota(model or "").max_concurrent
+        self.max_workers = max(1, workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="veo-job")
+        self._post_pool = (
+            ThreadPoolExecutor(max_workers=post_workers, thread_name_prefix="veo-post")
+            if post_workers > 0
+            else None
+        )
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        return self._pool.submit(tracing.bind(fn), *args, **kwargs)
+
+    def submit_video(self, client: GenaiClient, prompt: str, **kwargs) -> Future:
+        """Queue a `generate_video` job; the future resolves to its `VideoResult`."""
+        post_pool = self._post_pool
+        if post_pool is None:
+            return self.submit(generate_video, client, prompt, **kwargs)
+        result: Future = Future()
+
+        def rendered(stage: Future) -> None:
+            if stage.cancelled():
+                result.cancel()
+                return
+            if stage.exception() is not None:
+                result.set_exception(stage.exception())
+                return
+            staged = stage.result()
+            if isinstance(staged, VideoResult):
+                result.set_result(staged)
+                return
+            try:
+                post_pool.submit(finish_video, staged).add_done_callback(finished)
+            except RuntimeError as e:  # post pool already shut down
+                result.set_exception(e)
+
+        def finished(post: Future) -> None:
+            if post.cancelled():
+                result.cancel()
+            elif post.exception() is not None:
+                result.set_exception(post.exception())
+            else:
+                result.set_result(post.result())
+
+        self.submit(render_video, client, prompt, **kwargs).add_done_callback(rendered)
+        return result
+
+    def shutdown(self, wait: bool = True) -> None:
+        # Render jobs hand work to the post pool, so drain them first
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+        if self._post_pool is not None:
+            self._post_pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self) -> JobScheduler:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.shutdown(wait=exc_type is None)
+
+
 def list_models():
     """Return known model ids and the current default from env."""
     return {
@@ -39,7 +256,18 @@ def list_models():
     }
 
 
-def create_client() -> genai.Client:
+def default_video_cache() -> VideoCache | None:
+    """The shared clip cache under out/cache/videos, or None when VEO_CACHE=0."""
+    return VideoCache(OUT / "cache" / "videos") if cache_enabled() else None
+
+
+def create_client() -> GenaiClient:
+    return cassette_client(_create_backend_client)
+
+
+def _create_backend_client() -> GenaiClient:
+    if backend_enabled():
+        return fake_client()
     api_key = os.environ.get("GEMINI_API_KEY")
     return genai.Client(api_key=api_key) if api_key else genai.Client()
 
@@ -53,32 +281,258 @@ class VideoResult:
     thumb: pathlib.Path | None = None
     session_dir: pathlib.Path | None = None
     metadata_file: pathlib.Path | None = None
+    # Every clip the operation returned (`path` is the first); one entry unless
+    # several candidates were requested
+    candidates: list[pathlib.Path] = field(default_factory=list)
+
+
+@dataclass
+class _PendingOperation:
+    client: GenaiClient
+    op: types.GenerateVideosOperation
+    model: str
+    submitted: float
+    deadline: float | None
+    future: Future
+    next_poll: float = 0.0
+    polls: int = 0
+    errors: int = 0
+    retries: int = 0
+    last_poll: float = 0.0
+    metrics: ClipMetrics | None = None
+    trace_parent: tracing.Span | None = None
+
+
+class OperationPoller:
+    """Watch many pending operations from a single background polling loop.
+
+    Each operation is re-polled on its own adaptive schedule: nothing is fetched until
+    shortly before the model's typical render time (median of recent completions),
+    after which the interval grows with elapsed time. All `operations.get` calls share
+    a global rate cap, and every operation has a deadline.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 5.0,
+        max_interval: float = 60.0,
+        backoff: float = 0.25,
+        max_polls_per_second: float = 2.0,
+        timeout: float | None = None,
+        max_errors: int = 5,
+        history_size: int = 20,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.poll_spacing = 1.0 / max_polls_per_second if max_polls_per_second > 0 else 0.0
+        self.timeout = (
+            timeout if timeout is not None else float(os.environ.get("VEO_OP_TIMEOUT", 1800))
+        )
+        self.max_errors = max_errors
+        self.history_size = history_size
+        self._history: dict[str, list[float]] = {}
+        self._pending: list[_PendingOperation] = []
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._last_poll = 0.0
 
+    def expected_render_seconds(self, model: str) -> float | None:
+        """Median render time of recent operations for `model`, if any finished yet."""
+        with self._cond:
+            samples = sorted(self._history.get(model, []))
+        return samples[len(samples) // 2] if samples else None
 
-def wait_for_video_operation(client: genai.Client, op, poll_seconds: int = 8):
-    while True:
+    def record_render_time(self, model: str, seconds: float) -> None:
+        with self._cond:
+            samples = self._history.setdefault(model, [])
+            samples.append(seconds)
+            del samples[: -self.history_size]
+
+    def next_delay(self, elapsed: float, expected: float | None) -> float:
+        """Seconds until the next poll of an operation that has been running `elapsed`."""
+        if expected and elapsed < expected:
+            delay = expected * 0.9 - elapsed
+        else:
+            delay = elapsed * self.backoff
+        return min(self.max_interval, max(self.min_interval, delay))
+
+    def track(
+        self,
+        client: GenaiClient,
+        op,
+        model: str = "",
+        timeout: float | None = None,
+        metrics: ClipMetrics | None = None,
+    ) -> Future:
+        """Start watching `op`; the returned future resolves to the finished operation.
+
+        With `metrics`, the render time, poll count, polling retries and final poll
+        interval are recorded there once the operation settles.
+        """
+        future: Future = Future()
         if getattr(op, "done", None) is True:
-            break
-        time.sleep(poll_seconds)
+            future.set_result(op)
+            return future
+        now = time.monotonic()
+        limit = timeout if timeout is not None else self.timeout
+        entry = _PendingOperation(
+            client=client,
+            op=op,
+            model=model,
+            submitted=now,
+            deadline=now + limit if limit and limit > 0 else None,
+            future=future,
+            last_poll=now,
+            metrics=metrics,
+            trace_parent=tracing.current_span(),
+        )
+        entry.next_poll = now + self.next_delay(0.0, self.expected_render_seconds(model))
+        with self._cond:
+            self._pending.append(entry)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="veo-poller", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def wait(
+        self,
+        client: GenaiClient,
+        op,
+        model: str = "",
+        timeout: float | None = None,
+        metrics: ClipMetrics | None = None,
+    ):
+        return self.track(client, op, model, timeout, metrics).result()
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _next_due(self) -> _PendingOperation:
+        with self._cond:
+            while True:
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                entry = min(self._pending, key=lambda p: p.next_poll)
+                delay = entry.next_poll - time.monotonic()
+                if delay <= 0:
+                    return entry
+                self._cond.wait(delay)
+
+    def _run(self) -> None:
+        while True:
+            entry = self._next_due()
+            spacing = self._last_poll + self.poll_spacing - time.monotonic()
+            if spacing > 0:
+                time.sleep(spacing)
+            self._last_poll = time.monotonic()
+            self._poll(entry)
+
+    def _finish(self, entry: _PendingOperation, *, result=None, error: BaseException | None = None):
+        with self._cond:
+            self._pending.remove(entry)
+        if entry.metrics is not None:
+            now = time.monotonic()
+            entry.metrics.add("render", now - entry.submitted)
+            entry.metrics.add("poll_lag", now - entry.last_poll)
+            entry.metrics.polls += entry.polls
+            entry.metrics.retries += entry.retries
+        if error is not None:
+            entry.future.set_exception(error)
+        else:
+            entry.future.set_result(result)
+
+    def _poll(self, entry: _PendingOperation) -> None:
+        name = getattr(entry.op, "name", "") or "operation"
+        now = time.monotonic()
+        if entry.deadline is not None and now >= entry.deadline:
+            self._finish(
+                entry,
+                error=TimeoutError(f"{name} not done after {now - entry.submitted:.0f}s"),
+            )
+            return
+        entry.polls += 1
+        polled_at = time.monotonic()
         try:
-            op = client.operations.get(op)
-        except Exception:
-            with contextlib.suppress(Exception):
-                op = client.operations.get(getattr(op, "name", op))
-    return op
+            with tracing.span("veo.operations.get", entry.trace_parent, poll=entry.polls):
+                entry.op = entry.client.operations.get(entry.op)
+        except Exception as e:
+            entry.errors += 1
+            entry.retries += 1
+            if entry.errors >= self.max_errors:
+                self._finish(entry, error=e)
+                return
+            print(f"⚠️ Polling {name} failed ({entry.errors}/{self.max_errors}): {e}")
+        else:
+            entry.errors = 0
+            if getattr(entry.op, "done", None) is True:
+                self.record_render_time(entry.model, time.monotonic() - entry.submitted)
+                op_error = getattr(entry.op, "error", None)
+                if op_error:
+                    self._finish(entry, error=RuntimeError(f"{name} failed: {op_error}"))
+                else:
+                    self._finish(entry, result=entry.op)
+                return
+        entry.last_poll = polled_at
+        elapsed = time.monotonic() - entry.submitted
+        delay = self.next_delay(elapsed, self.expected_render_seconds(entry.model))
+        with self._cond:
+            entry.next_poll = time.monotonic() + delay
+
+
+# Shared by every wait_for_video_operation call in this process
+POLLER = OperationPoller()
 
 
-def save_generated_video(client: genai.Client, op, dest: pathlib.Path) -> pathlib.Path:
+def wait_for_video_operation(
+    client: GenaiClient,
+    op,
+    *,
+    model: str = "",
+    timeout: float | None = None,
+    metrics: ClipMetrics | None = None,
+):
+    """Block until `op` finishes, polling through the shared `OperationPoller`.
+
+    Raises TimeoutError past the deadline (VEO_OP_TIMEOUT, default 30 minutes) and
+    re-raises the operation's error or repeated polling failures. Render time and
+    polling counters go into `metrics` when given.
+    """
+    return POLLER.wait(client, op, model, timeout, metrics)
+
+
+def save_generated_video(
+    client: GenaiClient, op, dest: pathlib.Path, index: int = 0
+) -> pathlib.Path:
     resp = getattr(op, "response", None)
     if not resp or not getattr(resp, "generated_videos", None):
         raise RuntimeError("operation finished but no generated_videos found")
-    v = resp.generated_videos[0]
+    v = resp.generated_videos[index]
     client.files.download(file=v.video)
     dest.parent.mkdir(parents=True, exist_ok=True)
     v.video.save(str(dest))
     return dest
 
 
+def generated_video_count(op) -> int:
+    """Number of clips a finished operation returned."""
+    resp = getattr(op, "response", None)
+    return len(getattr(resp, "generated_videos", None) or [])
+
+
+def candidate_paths(dest: pathlib.Path, count: int) -> list[pathlib.Path]:
+    """Output paths for `count` candidates of one request: `<stem>_c1.mp4`, `<stem>_c2.mp4`, ...
+
+    A single candidate keeps `dest` unchanged.
+    """
+    if count <= 1:
+        return [dest]
+    return [dest.with_name(f"{dest.stem}_c{i}{dest.suffix}") for i in range(1, count + 1)]
+
+
 def stable_stem(text: str, prefix: str = "") -> str:
     h = hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
     return f"{prefix}{h}" if prefix else h
@@ -106,11 +560,19 @@ def extract_last_frame(mp4_path: pathlib.Path, out_jpg: pathlib.Path) -> pathlib
 
 
 def concat_videos_concat_demuxer(
-    files: Iterable[pathlib.Path], out_path: pathlib.Path
+    files: Iterable[pathlib.Path],
+    out_path: pathlib.Path,
+    metrics: ClipMetrics | None = None,
 ) -> pathlib.Path:
     ensure_ffmpeg()
     list_file = out_path.with_suffix(".txt")
     list_file.write_text("".join(f"file '{p.as_posix()}'\n" for p in files), encoding="utf-8")
+    with metrics.stage("concat") if metrics else contextlib.nullcontext():
+        _run_concat(list_file, out_path)
+    return out_path
+
+
+def _run_concat(list_file: pathlib.Path, out_path: pathlib.Path) -> None:
     subprocess.run(
         [
             "ffmpeg",
@@ -129,7 +591,6 @@ def concat_videos_concat_demuxer(
         ],
         check=True,
     )
-    return out_path
 
 
 def image_from_file(path: pathlib.Path):
@@ -158,6 +619,10 @@ def create_prompt_snippet(prompt: str, max_words: int = 4) -> str:
     return snippet or "untitled"
 
 
+# Guards the `latest` symlink and metadata.json read-modify-write across job threads
+_SESSION_LOCK = threading.RLock()
+
+
 def create_session_directory(
     script_name: str, prompt: str, base_dir: pathlib.Path = OUT, model: str = ""
 ) -> pathlib.Path:
@@ -179,9 +644,10 @@ def create_session_directory(
 
     # Create a symlink to latest
     latest_link = base_dir / "latest"
-    if latest_link.is_symlink() or latest_link.exists():
-        latest_link.unlink()
-    latest_link.symlink_to(session_dir.relative_to(base_dir))
+    with _SESSION_LOCK:
+        if latest_link.is_symlink() or latest_link.exists():
+            latest_link.unlink()
+        latest_link.symlink_to(session_dir.relative_to(base_dir))
 
     return session_dir
 
@@ -195,6 +661,18 @@ def save_session_metadata(
     files: list | None = None,
 ) -> pathlib.Path:
     """Save metadata about the generation session."""
+    with _SESSION_LOCK:
+        return _save_session_metadata(session_dir, script_name, prompt, negative, model, files)
+
+
+def _save_session_metadata(
+    session_dir: pathlib.Path,
+    script_name: str,
+    prompt: str,
+    negative: str,
+    model: str,
+    files: list | None,
+) -> pathlib.Path:
     metadata_file = session_dir / "metadata.json"
 
     # Load existing metadata if it exists (for multi-video sessions)
@@ -217,6 +695,8 @@ def save_session_metadata(
         "prompt_hash": hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8],
         "files": all_files,
     }
+    if "metrics" in existing_metadata:
+        metadata["metrics"] = existing_metadata["metrics"]
 
     metadata_file.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
 
@@ -231,6 +711,30 @@ def save_session_metadata(
     return metadata_file
 
 
+def record_file_metrics(
+    session_dir: pathlib.Path,
+    filename: str,
+    metrics: ClipMetrics,
+    candidates: Sequence[str] = (),
+) -> pathlib.Path:
+    """Store `metrics` for `filename` under "metrics" in the session's metadata.json.
+
+    An operation that saved several `candidates` is stored once, under its first
+    file, with the list of all of them under "files".
+    """
+    metadata_file = session_dir / "metadata.json"
+    record = metrics.to_dict()
+    if len(candidates) > 1:
+        record["files"] = list(candidates)
+    with _SESSION_LOCK:
+        metadata = {}
+        if metadata_file.exists():
+            metadata = json.loads(metadata_file.read_text(encoding="utf-8"))
+        metadata.setdefault("metrics", {})[filename] = record
+        metadata_file.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    return metadata_file
+
+
 def create_video_filename(prompt: str, model: str, sequence_num: int | None = None) -> str:
     """Create a descriptive filename for generated videos (content-focused)."""
     prompt_snippet = create_prompt_snippet(prompt)
@@ -240,8 +744,29 @@ def create_video_filename(prompt: str, model: str, sequence_num: int | None = No
     return f"{prompt_snippet}.mp4"
 
 
+@dataclass
+class RenderedOperation:
+    """A finished Veo operation waiting for download and post-processing."""
+
+    client: GenaiClient
+    op: object
+    prompt: str
+    negative: str
+    model: str
+    aspect_ratio: str
+    script_name: str
+    session_dir: pathlib.Path
+    dest: pathlib.Path
+    journal: JobJournal | None = None
+    cache: VideoCache | None = None
+    cache_key: str = ""
+    candidates: list[pathlib.Path] = field(default_factory=list)
+    metrics: ClipMetrics = field(default_factory=ClipMetrics)
+    trace: tracing.AnySpan | None = None
+
+
 def generate_video(
-    client: genai.Client,
+    client: GenaiClient,
     prompt: str,
     *,
     image=None,
@@ -253,6 +778,11 @@ def generate_video(
     script_name: str = "unknown",
     sequence_num: int | None = None,
     session_dir: pathlib.Path | None = None,
+    limiter: RateLimiter | None = None,
+    journal: JobJournal | None = None,
+    cache: VideoCache | None = None,
+    refresh: bool = False,
+    candidates: int = 1,
 ) -> VideoResult:
     """Generate a single Veo clip with organized output structure.
 
@@ -260,6 +790,68 @@ def generate_video(
     1) Explicit `model` arg
     2) VEO_MODEL environment variable
     3) "veo-2.0-generate-001"
+
+    Submission and polling run inside a `RateLimiter` slot for the model (the shared
+    `RATE_LIMITER` unless `limiter` is given), so concurrent callers respect quota.
+
+    With a `journal`, the job (keyed by its output filename) is logged as it moves
+    through submit/poll/save; a journaled job that already finished is returned as-is
+    and one that was submitted is re-attached by operation name instead of resubmitted.
+
+    Finished clips go into a content-addressed `VideoCache` (`default_video_cache()`
+    unless `cache` is given). An identical request is served from the cache by linking
+    the stored clip into the session; `refresh=True` renders anew and replaces it.
+
+    `candidates > 1` asks for that many clips in the same operation (one request
+    against the quota) and saves each returned clip as `<stem>_c<N>.mp4` with its
+    own last frame; the result's `path` is the first candidate.
+    """
+    staged = render_video(
+        client,
+        prompt,
+        image=image,
+        negative=negative,
+        aspect_ratio=aspect_ratio,
+        name_prefix=name_prefix,
+        out_dir=out_dir,
+        model=model,
+        script_name=script_name,
+        sequence_num=sequence_num,
+        session_dir=session_dir,
+        limiter=limiter,
+        journal=journal,
+        cache=cache,
+        refresh=refresh,
+        candidates=candidates,
+    )
+    if isinstance(staged, VideoResult):
+        return staged
+    return finish_video(staged)
+
+
+def render_video(
+    client: GenaiClient,
+    prompt: str,
+    *,
+    image=None,
+    negative: str = "",
+    aspect_ratio: str = "16:9",
+    name_prefix: str = "",
+    out_dir: pathlib.Path = OUT,
+    model: str | None = None,
+    script_name: str = "unknown",
+    sequence_num: int | None = None,
+    session_dir: pathlib.Path | None = None,
+    limiter: RateLimiter | None = None,
+    journal: JobJournal | None = None,
+    cache: VideoCache | None = None,
+    refresh: bool = False,
+    candidates: int = 1,
+) -> VideoResult | RenderedOperation:
+    """Submit (or reuse) a clip and wait for its operation; see `generate_video`.
+
+    Returns a `VideoResult` straight away for journal/cache hits, otherwise the
+    finished `RenderedOperation` for `finish_video` to download and post-process.
     """
     picked_model = model or os.environ.get("VEO_MODEL") or "veo-2.0-generate-001"
 
@@ -267,18 +859,6 @@ def generate_video(
     if session_dir is None:
         session_dir = create_session_directory(script_name, prompt, out_dir, picked_model)
 
-    # Generate the video
-    op = client.models.generate_videos(
-        model=picked_model,
-        prompt=prompt,
-        image=image,
-        config=types.GenerateVideosConfig(
-            aspect_ratio=aspect_ratio,
-            negative_prompt=negative,
-        ),
-    )
-    op = wait_for_video_operation(client, op)
-
     # Create organized filename
     if name_prefix:
         # For backward compatibility, use old naming when prefix is provided
@@ -286,28 +866,246 @@ def generate_video(
         filename = f"{stem}.mp4"
     else:
         filename = create_video_filename(prompt, picked_model, sequence_num)
+    paths = candidate_paths(session_dir / filename, candidates)
+    dest = paths[0]
+    filename = dest.name
+    # Ends in finish_video (possibly on another thread) unless the job stops early here
+    job_span = tracing.span("veo.job", file=filename, model=picked_model, script=script_name)
+
+    entry = journal.get(filename) if journal else None
+    if entry and entry["state"] == DONE and dest.exists():
+        print(f"↩️ Reusing finished {filename}")
+        job_span.set("reused", True)
+        job_span.end()
+        thumb = session_dir / entry["thumb"] if entry.get("thumb") else None
+        return VideoResult(
+            path=dest,
+            op_name=entry.get("op_name", ""),
+            prompt=prompt,
+            negative=negative,
+            thumb=thumb if thumb and thumb.exists() else None,
+            session_dir=session_dir,
+            metadata_file=session_dir / "metadata.json",
+            candidates=[session_dir / name for name in entry.get("candidates", [filename])],
+        )
+    reattach = entry.get("op_name") if entry and entry["state"] == SUBMITTED else None
+
+    cache = cache if cache is not None else default_video_cache()
+    cache_key = VideoCache.key(picked_model, prompt, negative, aspect_ratio, image, candidates)
+    hit = cache.restore_all(cache_key, paths) if cache and not refresh and not reattach else None
+    if hit:
+        restored, thumb, cached = hit
+        print(f"📦 Cache hit for {filename} ({cache_key[:12]})")
+        job_span.set("cache_hit", True)
+        job_span.end()
+        names = [p.name for p in restored]
+        metadata_file = save_session_metadata(
+            session_dir, script_name, prompt, negative, picked_model, names
+        )
+        if journal:
+            journal.record(
+                filename,
+                DONE,
+                op_name=cached.get("op_name", ""),
+                thumb=thumb.name if thumb else "",
+                cache_key=cache_key,
+                candidates=names,
+            )
+        return VideoResult(
+            path=dest,
+            op_name=cached.get("op_name", ""),
+            prompt=prompt,
+            negative=negative,
+            thumb=thumb,
+            session_dir=session_dir,
+            metadata_file=metadata_file,
+            candidates=restored,
+        )
+
+    # Generate the video (or pick up the operation an interrupted run submitted)
+    metrics = ClipMetrics(model=picked_model)
+    queued = time.monotonic()
+    op_name = ""
+    try:
+        with (
+            tracing.activate(job_span),
+            (limiter or RATE_LIMITER).slot(picked_model, submit=not reattach),
+        ):
+            waited = time.monotonic() - queued
+            metrics.add("slot_wait", waited)
+            tracing.record_span("veo.slot_wait", waited)
+            if reattach:
+                print(f"🔗 Re-attaching to {reattach}")
+                op = video_operation(reattach)
+            else:
+                if journal:
+                    journal.record(
+                        filename,
+                        SUBMITTING,
+                        model=picked_model,
+                        prompt=prompt,
+                        negative=negative,
+                        aspect_ratio=aspect_ratio,
+                        has_image=image is not None,
+                        candidates=candidates,
+                    )
+                op = call_with_retry(
+                    lambda: client.models.generate_videos(
+                        model=picked_model,
+                        prompt=prompt,
+                        image=image,
+                        config=types.GenerateVideosConfig(
+                            aspect_ratio=aspect_ratio,
+                            negative_prompt=negative,
+                            number_of_videos=candidates if candidates > 1 else None,
+                        ),
+                    ),
+                    model=picked_model,
+                    label=filename,
+                    metrics=metrics,
+                    # A lost response may hide an accepted (and billed) operation
+                    idempotent=False,
+                )
+                if journal:
+                    journal.record(filename, SUBMITTED, op_name=getattr(op, "name", ""))
+            op_name = getattr(op, "name", "") or ""
+            job_span.set("op_name", op_name)
+            with tracing.span("veo.poll"):
+                op = wait_for_video_operation(client, op, model=picked_model, metrics=metrics)
+    except Exception as e:
+        if journal and op_name and classify(e) != PERMANENT:
+            # Timed out or lost contact while polling: the operation may still be
+            # rendering, so stay SUBMITTED and let --resume re-attach to it
+            print(f"⏳ {filename} is still {op_name}; --resume re-attaches to it")
+        elif journal:
+            journal.record(filename, FAILED, error=str(e))
+        job_span.fail(e)
+        job_span.end()
+        raise
+
+    return RenderedOperation(
+        client=client,
+        op=op,
+        prompt=prompt,
+        negative=negative,
+        model=picked_model,
+        aspect_ratio=aspect_ratio,
+        script_name=script_name,
+        session_dir=session_dir,
+        dest=dest,
+        journal=journal,
+        cache=cache,
+        cache_key=cache_key,
+        candidates=paths,
+        metrics=metrics,
+        trace=job_span,
+    )
+
 
-    dest = session_dir / filename
-    save_generated_video(client, op, dest)
+def finish_video(job: RenderedOperation) -> VideoResult:
+    """Post-process a finished operation: download, last frame, metadata, cache, journal.
 
-    # Extract thumbnail/last frame
-    thumb = dest.with_suffix(".last.jpg")
+    Every returned candidate is saved (the service may return fewer than requested).
+    """
     try:
-        extract_last_frame(dest, thumb)
-    except Exception:
-        thumb = None
+        with tracing.activate(job.trace):
+            return _finish_video(job)
+    except Exception as e:
+        if job.trace:
+            job.trace.fail(e)
+        raise
+    finally:
+        if job.trace:
+            job.trace.end()
+
+
+def _finish_video(job: RenderedOperation) -> VideoResult:
+    filename = job.dest.name
+    paths = job.candidates or [job.dest]
+    saved: list[pathlib.Path] = []
+    metrics = job.metrics
+    try:
+        with metrics.stage("download"):
+            if len(paths) == 1:
+                save_generated_video(job.client, job.op, job.dest)
+                saved.append(job.dest)
+            else:
+                count = min(len(paths), max(generated_video_count(job.op), 1))
+                for index, path in enumerate(paths[:count]):
+                    save_generated_video(job.client, job.op, path, index)
+                    saved.append(path)
+    except Exception as e:
+        if job.journal:
+            job.journal.record(filename, FAILED, error=str(e))
+        raise
+
+    # Extract thumbnail/last frame of each candidate
+    metrics.bytes_downloaded += sum(p.stat().st_size for p in saved if p.exists())
+    thumbs: list[pathlib.Path | None] = []
+    for path in saved:
+        thumb = path.with_suffix(".last.jpg")
+        try:
+            with metrics.stage("last_frame"):
+                extract_last_frame(path, thumb)
+        except Exception:
+            thumb = None
+        thumbs.append(thumb)
+    thumb = thumbs[0]
+    names = [p.name for p in saved]
 
     # Save session metadata
     metadata_file = save_session_metadata(
-        session_dir, script_name, prompt, negative, picked_model, [filename]
+        job.session_dir, job.script_name, job.prompt, job.negative, job.model, names
     )
+    record_file_metrics(job.session_dir, names[0], metrics, names)
+    op_name = getattr(job.op, "name", "")
+    if job.cache:
+        job.cache.store(
+            job.cache_key,
+            job.dest,
+            thumb,
+            extras=list(zip(saved[1:], thumbs[1:], strict=True)),
+            model=job.model,
+            prompt=job.prompt,
+            negative=job.negative,
+            aspect_ratio=job.aspect_ratio,
+            op_name=op_name,
+        )
+    if job.journal:
+        job.journal.record(
+            filename,
+            DONE,
+            thumb=thumb.name if thumb else "",
+            cache_key=job.cache_key,
+            candidates=names,
+        )
 
     return VideoResult(
-        path=dest,
-        op_name=getattr(op, "name", ""),
-        prompt=prompt,
-        negative=negative,
+        path=job.dest,
+        op_name=op_name,
+        prompt=job.prompt,
+        negative=job.negative,
         thumb=thumb,
-        session_dir=session_dir,
+        session_dir=job.session_dir,
         metadata_file=metadata_file,
+        candidates=saved,
     )
+
+
+def open_session(
+    script_name: str,
+    prompt: str,
+    base_dir: pathlib.Path = OUT,
+    model: str = "",
+    resume: pathlib.Path | None = None,
+) -> tuple[pathlib.Path, JobJournal]:
+    """Create a new session directory, or reopen `resume`, along with its job journal."""
+    if resume is None:
+        session_dir = create_session_directory(script_name, prompt, base_dir, model)
+        return session_dir, JobJournal(session_dir)
+    if not resume.is_dir():
+        raise FileNotFoundError(f"session directory not found: {resume}")
+    journal = JobJournal(resume)
+    counts = ", ".join(f"{n} {state}" for state, n in sorted(journal.summary().items()))
+    print(f"♻️ Resuming {resume} ({counts or 'empty journal'})")
+    return resume, journal
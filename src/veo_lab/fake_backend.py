@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import io
+import itertools
+import json
+import math
+import os
+import pathlib
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+
+from google.genai import errors
+from google.genai import types
+
+from .client import video_operation
+
+# Frame sizes of the generated test clips and images per aspect ratio
+FRAME_SIZES = {"16:9": (320, 180), "9:16": (180, 320), "1:1": (256, 256)}
+CLIP_SECONDS = 2
+
+
+def backend_enabled() -> bool:
+    """True when VEO_BACKEND=fake selects the simulated backend."""
+    return os.environ.get("VEO_BACKEND", "").strip().lower() == "fake"
+
+
+@dataclass(frozen=True)
+class RenderTime:
+    """Distribution of simulated render seconds: fixed, uniform or lognormal."""
+
+    kind: str
+    a: float
+    b: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            # a is the median, b the sigma of the underlying normal
+            return rng.lognormvariate(math.log(self.a), self.b)
+        return self.a
+
+
+def parse_render_time(spec: str) -> RenderTime:
+    """Parse `12`, `fixed:12`, `uniform:5:15` or `lognormal:<median>:<sigma>`."""
+    kind, _, rest = spec.strip().partition(":")
+    try:
+        if not rest:
+            return RenderTime("fixed", float(kind))
+        args = [float(x) for x in rest.split(":")]
+        if kind == "fixed" and len(args) == 1:
+            return RenderTime("fixed", args[0])
+        if kind in {"uniform", "lognormal"} and len(args) == 2:
+            return RenderTime(kind, args[0], args[1])
+    except ValueError:
+        pass
+    raise ValueError(
+        f"bad render time {spec!r}; use N, fixed:N, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA"
+    )
+
+
+@dataclass(frozen=True)
+class FakeConfig:
+    """Behavior of the simulated backend.
+
+    `error_429` / `error_500` are the chances that any API call fails with that
+    status; `rpm` and `max_concurrent` are a server-side per-model quota (0 means
+    unlimited) that rejects excess submissions with 429 RESOURCE_EXHAUSTED.
+    """
+
+    render: RenderTime = RenderTime("uniform", 5.0, 15.0)
+    error_429: float = 0.0
+    error_500: float = 0.0
+    rpm: int = 0
+    max_concurrent: int = 0
+    seed: int | None = None
+
+    @classmethod
+    def from_env(cls) -> FakeConfig:
+        """Read the VEO_FAKE_* variables (see README "Simulated Backend")."""
+        env = os.environ.get
+        seed = env("VEO_FAKE_SEED")
+        return cls(
+            render=parse_render_time(env("VEO_FAKE_RENDER", "uniform:5:15")),
+            error_429=float(env("VEO_FAKE_429", 0)),
+            error_500=float(env("VEO_FAKE_500", 0)),
+            rpm=int(env("VEO_FAKE_RPM", 0)),
+            max_concurrent=int(env("VEO_FAKE_CONCURRENT", 0)),
+            seed=int(seed) if seed else None,
+        )
+
+
+def _api_error(code: int, status: str, message: str) -> errors.APIError:
+    body = {"error": {"code": code, "status": status, "message": message}}
+    return errors.ClientError(code, body) if code < 500 else errors.ServerError(code, body)
+
+
+def _hue(text: str) -> int:
+    """A coarse per-prompt hue, so different prompts give visibly different output."""
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:4], 16) % 12 * 30
+
+
+@functools.lru_cache(maxsize=64)
+def render_test_clip(aspect_ratio: str, hue: int) -> bytes:
+    """A small real MP4 from ffmpeg's `testsrc` pattern, tinted by `hue` degrees."""
+    width, height = FRAME_SIZES.get(aspect_ratio, FRAME_SIZES["16:9"])
+    with tempfile.TemporaryDirectory(prefix="veo-fake-") as tmp:
+        out = pathlib.Path(tmp) / "clip.mp4"
+        try:
+            subprocess.run(
+                [
+                    "ffmpeg",
+                    "-v",
+                    "error",
+                    "-f",
+                    "lavfi",
+                    "-i",
+                    f"testsrc=size={width}x{height}:rate=12:duration={CLIP_SECONDS}",
+                    "-vf",
+                    f"hue=h={hue}",
+                    "-pix_fmt",
+                    "yuv420p",
+                    str(out),
+                ],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError("ffmpeg is required on PATH") from e
+        return out.read_bytes()
+
+
+def render_test_image(prompt: str, aspect_ratio: str = "1:1", index: int = 0) -> bytes:
+    """A JPEG with a per-prompt color and the prompt text drawn on it."""
+    from PIL import Image
+    from PIL import ImageDraw
+
+    width, height = FRAME_SIZES.get(aspect_ratio, FRAME_SIZES["1:1"])
+    digest = hashlib.sha1(f"{prompt}\0{index}".encode()).digest()
+    img = Image.new("RGB", (width, height), tuple(digest[:3]))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([8, 8, width - 8, height - 8], outline=(255, 255, 255), width=2)
+    draw.multiline_text((16, 16), "\n".join(prompt[i : i + 28] for i in range(0, 112, 28)))
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=85)
+    return out.getvalue()
+
+
+@dataclass
+class _Job:
+    model: str
+    prompt: str
+    aspect_ratio: str
+    count: int
+    ready_at: float
+
+
+class FakeBackend:
+    """In-memory state shared by a process's fake clients: jobs, quota windows, RNG."""
+
+    def __init__(self, config: FakeConfig | None = None):
+        self.config = config or FakeConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs: dict[str, _Job] = {}
+        self._submits: dict[str, deque[float]] = {}
+        self.calls: dict[str, int] = {}
+
+    def request(self, kind: str, *, quota_model: str | None = None) -> None:
+        """Count one API call and raise whatever failure the config says it hits."""
+        cfg = self.config
+        with self._lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+            roll = self._rng.random()
+            if roll < cfg.error_500:
+                raise _api_error(500, "INTERNAL", f"simulated {kind} failure")
+            if roll < cfg.error_500 + cfg.error_429:
+                raise _api_error(429, "RESOURCE_EXHAUSTED", f"simulated {kind} throttling")
+            if quota_model is None:
+                return
+            now = time.monotonic()
+            window = self._submits.setdefault(quota_model, deque())
+            while window and now - window[0] >= 60:
+                window.popleft()
+            if cfg.rpm > 0 and len(window) >= cfg.rpm:
+                raise _api_error(
+                    429, "RESOURCE_EXHAUSTED", f"quota of {cfg.rpm} requests/minute exceeded"
+                )
+            running = sum(
+                1 for j in self._jobs.values() if j.model == quota_model and j.ready_at > now
+            )
+            if cfg.max_concurrent > 0 and running >= cfg.max_concurrent:
+                raise _api_error(
+                    429,
+                    "RESOURCE_EXHAUSTED",
+                    f"{cfg.max_concurrent} operations already running for {quota_model}",
+                )
+            window.append(now)
+
+    def start_job(self, model: str, prompt: str, aspect_ratio: str, count: int) -> str:
+        with self._lock:
+            seconds = max(0.0, self.config.render.sample(self._rng))
+            name = f"models/{model}/operations/fake-{next(self._ids)}"
+            self._jobs[name] = _Job(model, prompt, aspect_ratio, count, time.monotonic() + seconds)
+        return name
+
+    def job(self, name: str) -> _Job | None:
+        with self._lock:
+            return self._jobs.get(name)
+
+
+class _Models:
+    def __init__(self, backend: FakeBackend):
+        self._backend = backend
+
+    def generate_videos(self, *, model: str, prompt: str | None = None, image=None, config=None):
+        self._backend.request("generate_videos", quota_model=model)
+        aspect = getattr(config, "aspect_ratio", None) or "16:9"
+        count = getattr(config, "number_of_videos", None) or 1
+        name = self._backend.start_job(model, prompt or "", aspect, count)
+        return video_operation(name)
+
+    def generate_images(self, *, model: str, prompt: str, config=None):
+        self._backend.request("generate_images", quota_model=model)
+        count = getattr(config, "number_of_images", None) or 1
+        aspect = getattr(config, "aspect_ratio", None) or "1:1"
+        return types.GenerateImagesResponse(
+            generated_images=[
+                types.GeneratedImage(
+                    image=types.Image(
+                        image_bytes=render_test_image(prompt, aspect, i), mime_type="image/jpeg"
+                    )
+                )
+                for i in range(count)
+            ]
+        )
+
+    def generate_content(self, *, model: str, contents, config=None):
+        self._backend.request("generate_content", quota_model=model)
+        texts = [
+            c
+            for c in (contents if isinstance(contents, list) else [contents])
+            if isinstance(c, str)
+        ]
+        seed = " ".join(texts)[-80:]
+        if getattr(config, "response_mime_type", None) == "application/json":
+            text = json.dumps([f"Simulated variant {i + 1}: {seed}" for i in range(3)])
+        else:
+            text = f"Simulated description ({_hue(seed)}°): {seed}"
+        return types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(content=types.Content(role="model", parts=[types.Part(text=text)]))
+            ]
+        )
+
+
+class _Operations:
+    def __init__(self, backend: FakeBackend):
+        self._backend = backend
+
+    def get(self, operation):
+        self._backend.request("operations.get")
+        name = getattr(operation, "name", None) or ""
+        job = self._backend.job(name)
+        if job is None:
+            raise _api_error(404, "NOT_FOUND", f"operation {name} not found")
+        if time.monotonic() < job.ready_at:
+            return video_operation(name)
+        data = render_test_clip(job.aspect_ratio, _hue(job.prompt))
+        videos = [
+            types.GeneratedVideo(video=types.Video(video_bytes=data, mime_type="video/mp4"))
+            for _ in range(job.count)
+        ]
+        return video_operation(
+            name, done=True, response=types.GenerateVideosResponse(generated_videos=videos)
+        )
+
+
+class _Files:
+    def __init__(self, backend: FakeBackend):
+        self._backend = backend
+
+    def download(self, *, file):
+        self._backend.request("files.download")
+        return getattr(file, "video_bytes", None) or b""
+
+    def upload(self, *, file, config=None):
+        self._backend.request("files.upload")
+        data = file.read() if hasattr(file, "read") else pathlib.Path(file).read_bytes()
+        name = f"files/{hashlib.sha256(data).hexdigest()[:12]}"
+        return types.File(
+            name=name,
+            uri=f"https://fake.invalid/v1beta/{name}",
+            mime_type=getattr(config, "mime_type", None) or "application/octet-stream",
+            size_bytes=len(data),
+            expiration_time=datetime.now(UTC) + timedelta(hours=48),
+            state=types.FileState.ACTIVE,
+        )
+
+
+class FakeClient:
+    """Stand-in for `genai.Client` covering the calls veo_lab and imagen_lab make."""
+
+    def __init__(self, backend: FakeBackend | None = None):
+        self.backend = backend or FakeBackend()
+        self.models = _Models(self.backend)
+        self.operations = _Operations(self.backend)
+        self.files = _Files(self.backend)
+
+
+_shared: FakeBackend | None = None
+_shared_lock = threading.Lock()
+
+
+def fake_client() -> FakeClient:
+    """A client on the process-wide fake backend, configured from the environment."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FakeBackend(FakeConfig.from_env())
+            print(f"🧪 Using the simulated backend ({_shared.config})")
+        return FakeClient(_shared)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import threading
+from datetime import datetime
+
+JOURNAL_FILE = "journal.jsonl"
+
+# Job states, in the order a job moves through them
+SUBMITTING = "submitting"  # inputs recorded, request not yet acknowledged
+SUBMITTED = "submitted"  # operation name known, render in progress
+DONE = "done"  # video saved in the session directory
+FAILED = "failed"
+
+
+class JobJournal:
+    """Append-only, fsync'd log of generation jobs in a session directory.
+
+    Every state change is written before the next step runs, so an interrupted
+    session can be resumed: finished jobs are reused, submitted ones re-attached by
+    operation name, and only jobs that never reached the API are submitted again.
+    Jobs are keyed by their output filename within the session.
+    """
+
+    def __init__(self, session_dir: pathlib.Path):
+        self.path = session_dir / JOURNAL_FILE
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        entries: dict[str, dict] = {}
+        if not self.path.exists():
+            return entries
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn final write from a crash
+            entries.setdefault(record["key"], {}).update(record)
+        return entries
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry else None
+
+    def entries(self) -> dict[str, dict]:
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._entries.items()}
+
+    def record(self, key: str, state: str, **fields) -> dict:
+        """Merge `fields` into the job's entry and durably append the change."""
+        record = {"key": key, "state": state, "updated": datetime.now().isoformat(), **fields}
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            entry = self._entries.setdefault(key, {})
+            entry.update(record)
+            return dict(entry)
+
+    def summary(self) -> dict[str, int]:
+        """Count jobs per state."""
+        counts: dict[str, int] = {}
+        for entry in self.entries().values():
+            counts[entry["state"]] = counts.get(entry["state"], 0) + 1
+        return counts
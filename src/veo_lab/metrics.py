@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from collections.abc import Iterator
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+
+from . import tracing
+
+# Pipeline stages, in the order a clip goes through them
+STAGES = (
+    "slot_wait",
+    "submit",
+    "backoff",
+    "render",
+    "poll_lag",
+    "download",
+    "last_frame",
+    "concat",
+)
+
+# Trace span emitted for each timed stage
+SPAN_NAMES = {"last_frame": "ffmpeg.last_frame", "concat": "ffmpeg.concat"}
+
+
+@dataclass
+class ClipMetrics:
+    """Monotonic per-stage timings and counters for one rendered file.
+
+    `slot_wait` is time queued for a rate-limiter slot, `submit` the generate_videos
+    call, `backoff` time paused between failed submissions (see `veo_lab.resilience`),
+    `render` submit-to-done as seen by the poller, and `poll_lag` the last polling
+    interval (an upper bound on how long a finished clip sat unnoticed).
+    `retry_decisions` records why each failed submission was retried or given up.
+    """
+
+    model: str = ""
+    stages: dict[str, float] = field(default_factory=dict)
+    polls: int = 0
+    retries: int = 0
+    submit_retries: int = 0
+    retry_decisions: list[dict] = field(default_factory=list)
+    bytes_downloaded: int = 0
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Add the wall time of the block to `stages[name]` (even if it raises).
+
+        The block is also traced as a span (see `veo_lab.tracing`).
+        """
+        start = time.monotonic()
+        try:
+            with tracing.span(SPAN_NAMES.get(name, f"veo.{name}")):
+                yield
+        finally:
+            self.add(name, time.monotonic() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = round(self.stages.get(name, 0.0) + seconds, 4)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Nearest-rank percentile (`q` in 0-100) of a non-empty sample."""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil without floats
+    return ordered[int(rank) - 1]
@@ -1,17 +1,41 @@
 from __future__ import annotations
 
+import hashlib
 import itertools
 import json
+import math
+import os
 import pathlib
-import time
+import threading
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import as_completed
 
 import typer
 import yaml
+from jinja2 import Environment
+from jinja2 import FileSystemLoader
 from jinja2 import Template
 
+from . import tracing
 from .common import OUT
+from .common import ROOT
+from .common import JobScheduler
 from .common import create_client
-from .common import generate_video
+from .common import open_session
+from .sampling import Strategy
+from .sampling import halving_rounds
+from .sampling import parse_strategy
+from .sampling import prune_values
+from .sampling import sample_combinations
+from .tiers import FINAL_MODEL
+from .tiers import PREVIEW_MODEL
+from .tiers import RATINGS
+from .tiers import load_ratings
+from .tiers import load_scorer
+from .tiers import select_for_promotion
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
 
@@ -20,52 +44,602 @@ def load_config(path: pathlib.Path) -> dict:
     return yaml.safe_load(path.read_text(encoding="utf-8"))
 
 
+# Dimension name the negatives take when a sampling strategy covers them
+NEGATIVE_DIM = "__negative__"
+RESULTS_FILE = "matrix_results.json"
+RESULTS_LOG = "matrix_results.jsonl"
+
+
+def load_template(path: pathlib.Path) -> Template:
+    """Compile `path` once, resolving `{% include %}`/`{% extends %}` next to it or in examples/."""
+    env = Environment(
+        loader=FileSystemLoader([str(path.parent), str(ROOT / "examples")]),
+        auto_reload=False,
+    )
+    return env.get_template(path.name)
+
+
+def matrix_size(cfg: dict) -> int:
+    """Number of prompts x negatives the matrix expands to, without expanding it."""
+    dims = cfg.get("matrix", {})
+    return math.prod(len(values) for values in dims.values()) * len(cfg.get("negative", [""]))
+
+
+def iter_combinations(cfg: dict) -> Iterator[dict]:
+    """Yield each combination of matrix variables lazily, in sorted dimension order."""
+    dims = cfg.get("matrix", {})
+    bank = sorted(dims.keys())
+    for combo in itertools.product(*(dims[k] for k in bank)):
+        yield dict(zip(bank, combo, strict=True))
+
+
+def iter_prompts(template: Template, cfg: dict) -> Iterator[tuple[dict, str]]:
+    """Yield (variables, rendered prompt) for every combination."""
+    for vars_ in iter_combinations(cfg):
+        yield vars_, template.render(**vars_).strip()
+
+
+def plan_combinations(cfg: dict, strategy: Strategy, seed: int = 0) -> Iterator[tuple[dict, str]]:
+    """Yield (variables, negative) pairs to render, chosen by `strategy`.
+
+    The full product streams every combination with each negative. Sampling
+    strategies treat the negatives as one more dimension of the covering array or
+    sample, so e.g. pairwise also pairs every negative with every variable value.
+    """
+    negatives: list[str] = cfg.get("negative", [""])
+    if strategy.kind == "full":
+        for vars_ in iter_combinations(cfg):
+            for neg in negatives:
+                yield vars_, neg
+        return
+    dims = {**cfg.get("matrix", {}), NEGATIVE_DIM: negatives}
+    for row in sample_combinations(dims, strategy, seed):
+        neg = row.pop(NEGATIVE_DIM)
+        yield row, neg
+
+
+def iter_rendered(
+    template: Template, plan: Iterable[tuple[dict, str]]
+) -> Iterator[tuple[dict, str, str]]:
+    """Render a plan into (variables, prompt, negative), once per distinct variables dict."""
+    last_vars, prompt = None, ""
+    for vars_, neg in plan:
+        if vars_ is not last_vars:  # the full product repeats vars_ for each negative
+            last_vars, prompt = vars_, template.render(**vars_).strip()
+        yield vars_, prompt, neg
+
+
+def combo_id(prompt: str, negative: str) -> str:
+    """Stable id of a rendered combination, identical on every machine."""
+    return hashlib.sha256(f"{prompt}\0{negative}".encode()).hexdigest()[:16]
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse `i/n` (1-based) into (i, n)."""
+    try:
+        i, n = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like i/n, got {spec!r}") from None
+    if not 1 <= i <= n:
+        raise ValueError(f"shard index must be between 1 and {n}, got {spec!r}")
+    return i, n
+
+
+def in_shard(cid: str, shard: tuple[int, int]) -> bool:
+    """True if the combination with id `cid` belongs to shard (i, n)."""
+    i, n = shard
+    return int(cid, 16) % n == i - 1
+
+
+def read_results_log(path: pathlib.Path) -> dict[str, dict]:
+    """Latest row per combination id from a JSONL results log, skipping torn lines."""
+    rows: dict[str, dict] = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # partial final write from a crash
+        rows.pop(row["id"], None)
+        rows[row["id"]] = row
+    return rows
+
+
+class MatrixResults:
+    """Result rows of a matrix session, appended to a JSONL log as each video lands.
+
+    The log is fsync'd per row so a crash loses at most the row being written;
+    `snapshot` rewrites `matrix_results.json` (successful rows only) atomically.
+    Rows are keyed by `combo_id`, so a resumed run can skip finished combinations.
+    """
+
+    def __init__(self, session_dir: pathlib.Path):
+        self.log_path = session_dir / RESULTS_LOG
+        self.snapshot_path = session_dir / RESULTS_FILE
+        self._lock = threading.Lock()
+        self._rows = read_results_log(self.log_path) if self.log_path.exists() else {}
+
+    def done_ids(self) -> set[str]:
+        with self._lock:
+            return {cid for cid, row in self._rows.items() if row.get("status") == "ok"}
+
+    def append(self, row: dict) -> None:
+        with self._lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._rows.pop(row["id"], None)  # keep the latest attempt last
+            self._rows[row["id"]] = row
+
+    def get(self, cid: str) -> dict | None:
+        with self._lock:
+            return self._rows.get(cid)
+
+    def ok_rows(self) -> list[dict]:
+        with self._lock:
+            return [row for row in self._rows.values() if row.get("status") == "ok"]
+
+    def snapshot(self) -> pathlib.Path:
+        """Atomically write the successful rows to matrix_results.json."""
+        tmp = self.snapshot_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.ok_rows(), indent=2), encoding="utf-8")
+        os.replace(tmp, self.snapshot_path)
+        return self.snapshot_path
+
+
+def record_results(jobs: dict[Future, dict], results: MatrixResults) -> None:
+    """Append each job's row (base fields + outcome) the moment its video lands.
+
+    The snapshot is written even if collection is interrupted.
+    """
+    try:
+        for future in as_completed(jobs):
+            row = jobs[future]
+            try:
+                res = future.result()
+            except Exception as e:
+                print(f"❌ Generation failed for {row['prompt'][:50]}...: {e}")
+                results.append({**row, "status": "failed", "error": str(e)})
+                continue
+            results.append(
+                {
+                    **row,
+                    "status": "ok",
+                    "path": str(res.path),
+                    "thumb": str(res.thumb or ""),
+                    "candidates": [str(p) for p in res.candidates],
+                }
+            )
+    finally:
+        if results.ok_rows():
+            results.snapshot()
+            print(f"saved {len(results.ok_rows())} results -> {results.snapshot_path.parent}")
+
+
+def successive_halving(
+    cfg: dict,
+    tpl: Template,
+    batch: int,
+    seed: int,
+    scorer: str,
+    submit: Callable[..., tuple[Future, dict]],
+    results: MatrixResults,
+    rate: bool = False,
+) -> dict:
+    """Adaptive search: render a batch, score it, halve each dimension, repeat.
+
+    Each round draws `batch` combinations by Latin hypercube sampling from the
+    surviving values (so every value is tried), renders the ones without a result
+    yet, scores every clip with `scorer` (reloaded per round, so fresh ab_viewer
+    ratings count) and keeps the better half of each dimension's values. Stops when
+    every dimension is down to one value. Returns the best-scoring row.
+
+    With `rate`, waits for Enter after each round so its clips can be rated in
+    ab_viewer. A `ratings` round in which no clip was rated stops the search.
+    """
+    dims = {**cfg.get("matrix", {}), NEGATIVE_DIM: cfg.get("negative", [""])}
+    observed: dict[str, tuple[dict, float, dict]] = {}
+    rounds = max(halving_rounds([len(v) for v in dims.values()]), 1)
+    for rnd in range(1, rounds + 1):
+        plan = []
+        for row in sample_combinations(dims, Strategy("lhs", batch), seed + rnd):
+            neg = row.pop(NEGATIVE_DIM)
+            plan.append((row, neg))
+        jobs = {}
+        picked = []
+        for vars_, prompt, neg in iter_rendered(tpl, plan):
+            cid = combo_id(prompt, neg)
+            picked.append((cid, {**vars_, NEGATIVE_DIM: neg}))
+            existing = results.get(cid)
+            if existing and existing.get("status") == "ok":
+                continue
+            print(f"🎬 Round {rnd}: {prompt[:50]}...")
+            future, row = submit(vars_, prompt, neg, cid, round=rnd)
+            jobs[future] = row
+        record_results(jobs, results)
+
+        if rate:
+            input(f"⭐ Rate round {rnd} in ab_viewer, then press Enter...")
+        if scorer == "ratings":
+            rated = load_ratings(RATINGS)
+            if not any(
+                pathlib.Path(row["path"]).name in rated
+                for row in (results.get(cid) for cid, _ in picked)
+                if row and row.get("status") == "ok"
+            ):
+                print(f"❌ No clip of round {rnd} is rated in {RATINGS}; rate them and --resume")
+                raise typer.Exit(1)
+        score = load_scorer(scorer, RATINGS)
+        for cid, combo in picked:
+            row = results.get(cid)
+            if row and row.get("status") == "ok" and cid not in observed:
+                observed[cid] = (combo, score(pathlib.Path(row["path"])), row)
+        dims = prune_values(dims, [(combo, value) for combo, value, _ in observed.values()])
+        survivors = ", ".join(
+            f"{'negative' if k == NEGATIVE_DIM else k}={len(v)}" for k, v in sorted(dims.items())
+        )
+        print(f"✂️ Round {rnd}: {len(jobs)} rendered, {len(observed)} scored; kept {survivors}")
+
+    if not observed:
+        return {}
+    _, best_score, best = max(observed.values(), key=lambda item: item[1])
+    print(f"🏆 Best ({best_score:g}): {best['prompt'][:60]} -> {best['path']}")
+    return best
+
+
+def load_results(path: pathlib.Path) -> list[dict]:
+    """Rows from a matrix_results.json/.jsonl file or a session directory containing one.
+
+    A session without a snapshot (e.g. one that crashed) is read from its JSONL log.
+    """
+    if path.is_dir():
+        snapshot = path / RESULTS_FILE
+        path = (
+            snapshot
+            if snapshot.exists() or not (path / RESULTS_LOG).exists()
+            else path / RESULTS_LOG
+        )
+    if path.suffix == ".jsonl":
+        rows = read_results_log(path).values()
+        return [row for row in rows if row.get("status", "ok") == "ok"]
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def merge_results(
+    sources: list[pathlib.Path], expected: dict[str, dict] | None = None
+) -> dict[str, list]:
+    """Combine per-shard results, keeping the first row seen for each combination.
+
+    Returns the merged `results` plus `duplicates` (combinations found more than
+    once, with every source) and, when the `expected` combinations are known,
+    those `missing` from every shard.
+    """
+    merged: dict[str, dict] = {}
+    seen_in: dict[str, list[str]] = {}
+    for source in sources:
+        for row in load_results(source):
+            cid = row.get("id") or combo_id(row["prompt"], row.get("negative", ""))
+            seen_in.setdefault(cid, []).append(str(source))
+            merged.setdefault(cid, {**row, "id": cid})
+    duplicates = [
+        {"id": cid, "prompt": merged[cid]["prompt"], "sources": where}
+        for cid, where in seen_in.items()
+        if len(where) > 1
+    ]
+    missing = [entry for cid, entry in (expected or {}).items() if cid not in merged]
+    return {"results": list(merged.values()), "duplicates": duplicates, "missing": missing}
+
+
 @app.command()
+@tracing.traced("prompt_matrix.run")
 def run(
     config: pathlib.Path = typer.Option(..., "--config", "-c"),
     template: pathlib.Path = typer.Option(..., "--template", "-t"),
     output: pathlib.Path = typer.Option(OUT, "--out"),
     dry: bool = typer.Option(False, "--dry"),
+    concurrency: int | None = typer.Option(
+        None, "--concurrency", "-j", help="Jobs in flight at once (default: model quota)"
+    ),
+    resume: pathlib.Path | None = typer.Option(
+        None,
+        "--resume",
+        help="Resume an interrupted session: skip combinations with a saved result",
+    ),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Ignore cached clips and render again (replaces the cache entry)"
+    ),
+    count: bool = typer.Option(
+        False, "--count", help="Only report how many prompts the matrix expands to (no API calls)"
+    ),
+    candidates: int = typer.Option(
+        1, "--candidates", "-n", min=1, help="Videos requested per Veo call (all are saved)"
+    ),
+    strategy: str = typer.Option(
+        "full",
+        "--strategy",
+        "-s",
+        help="Combinations to render: full, pairwise, 3-wise, random:N, lhs:N or halving:N",
+    ),
+    seed: int = typer.Option(0, "--seed", help="Seed for the sampling strategies"),
+    shard: str | None = typer.Option(
+        None, "--shard", help="Render only shard i of n (1-based), split by prompt hash"
+    ),
+    preview: bool = typer.Option(
+        False, "--preview", help=f"Render on the cheap preview tier ({PREVIEW_MODEL})"
+    ),
+    promote_top: int = typer.Option(
+        0,
+        "--promote-top",
+        min=0,
+        help="Render a preview, then re-render the K best clips by --scorer on the final model",
+    ),
+    scorer: str = typer.Option(
+        "sharpness",
+        "--scorer",
+        help="Ranking for --promote-top and halving:N: ratings, sharpness or module:function",
+    ),
+    rate: bool = typer.Option(
+        False,
+        "--rate",
+        help="With halving:N, wait after each round so you can rate its clips in ab_viewer",
+    ),
 ):
+    """Render the matrix (or a shard of it) into one session."""
+    try:
+        picked_strategy = parse_strategy(strategy)
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--strategy") from e
+    try:
+        picked_shard = parse_shard(shard) if shard else None
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--shard") from e
     cfg = load_config(config)
-    tpl_text = template.read_text(encoding="utf-8")
     dims = cfg.get("matrix", {})
     negatives: list[str] = cfg.get("negative", [""])
-    bank = sorted(dims.keys())
-    combos = list(itertools.product(*(dims[k] for k in bank)))
-    client = create_client()
-    rows = []
-    total_combinations = len(combos) * len(negatives)
-    current_combination = 0
+    full_size = matrix_size(cfg)
+    adaptive = picked_strategy.kind == "halving"
+    if adaptive and picked_shard:
+        raise typer.BadParameter("adaptive strategies cannot be sharded", param_hint="--shard")
+    plan = iter(()) if adaptive else plan_combinations(cfg, picked_strategy, seed)
+    total_combinations = full_size
+    if picked_strategy.kind not in {"full", "halving"}:
+        plan = list(plan)  # sampled plans are small; size them up front
+        total_combinations = len(plan)
+    if count:
+        shape = " x ".join(f"{len(dims[k])} {k}" for k in sorted(dims))
+        print(f"🔢 {full_size} combinations ({shape} x {len(negatives)} negatives)")
+        if adaptive:
+            rounds = max(halving_rounds([len(v) for v in dims.values()] + [len(negatives)]), 1)
+            print(
+                f"🎯 {picked_strategy}: at most {picked_strategy.n * rounds} to render "
+                f"in {rounds} rounds"
+            )
+        elif picked_strategy.kind != "full":
+            print(
+                f"🎯 {picked_strategy}: {total_combinations} to render "
+                f"({full_size / max(total_combinations, 1):.1f}x fewer)"
+            )
+        return
+
+    if promote_top or adaptive:
+        preview = preview or bool(promote_top)
+        try:
+            load_scorer(scorer)
+        except (ImportError, ValueError) as e:
+            raise typer.BadParameter(str(e), param_hint="--scorer") from e
+    if adaptive and scorer == "ratings" and not rate and not dry:
+        raise typer.BadParameter(
+            "halving with ratings needs --rate (clips are rated after each round)",
+            param_hint="--scorer",
+        )
+    picked_model = PREVIEW_MODEL if preview else os.environ.get("VEO_MODEL", "")
+    tpl = load_template(template)
+    client = None
+    session_dir = None
+    journal = None
+    if not dry:
+        client = create_client()
+        label = config.stem if not picked_shard else f"{config.stem} shard {shard}"
+        session_dir, journal = open_session("prompt_matrix", label, output, picked_model, resume)
+    results = MatrixResults(session_dir) if session_dir else None
+    done = results.done_ids() if results else set()
+    if done:
+        print(f"↩️ {len(done)} combinations already have results and will be skipped")
+    jobs = {}
+
+    if adaptive and dry:
+        print(f"🔍 {picked_strategy} picks each round from the scores of the last one;")
+        print("   use --count to see the budget. No API calls made.")
+        return
+
+    with JobScheduler(concurrency, picked_model) as scheduler:
+
+        def submit(vars_: dict, prompt: str, neg: str, cid: str, **extra) -> tuple[Future, dict]:
+            assert client is not None, "nothing is submitted in a dry run"
+            future = scheduler.submit_video(
+                client,
+                prompt,
+                negative=neg,
+                name_prefix="mx-",
+                script_name="prompt_matrix",
+                session_dir=session_dir,
+                journal=journal,
+                model=picked_model or None,
+                refresh=refresh,
+                candidates=candidates,
+            )
+            row = {
+                "id": cid,
+                "vars": vars_,
+                "shard": shard or "",
+                "prompt": prompt,
+                "negative": neg,
+                "model": picked_model,
+                **extra,
+            }
+            return future, row
+
+        if adaptive and results:
+            successive_halving(cfg, tpl, picked_strategy.n, seed, scorer, submit, results, rate)
+
+        def pending() -> Iterator[tuple[dict, str, str, str]]:
+            for vars_, prompt, neg in iter_rendered(tpl, plan):
+                cid = combo_id(prompt, neg)
+                if picked_shard and not in_shard(cid, picked_shard):
+                    continue
+                if cid not in done:
+                    yield vars_, prompt, neg, cid
 
-    for combo in combos:
-        vars_ = dict(zip(bank, combo, strict=False))
-        prompt = Template(tpl_text).render(**vars_).strip()
-        for neg in negatives:
-            current_combination += 1
+        todo: Iterable[tuple[dict, str, str, str]] = pending()
+        if picked_shard or done:
+            todo = list(todo)  # number this run's own combinations, not the whole matrix
+            total_combinations = len(todo)
 
+        for current_combination, (vars_, prompt, neg, cid) in enumerate(todo, 1):
             if dry:
                 print(f"Combination {current_combination}/{total_combinations}: {prompt}")
                 continue
 
-            # Add rate limit protection: wait 30 seconds between requests (except first)
-            if current_combination > 1:
-                print("⏳ Waiting 30 seconds to respect rate limits...")
-                time.sleep(30)
+            print(f"🎬 Queued {current_combination}/{total_combinations}: {prompt[:50]}...")
+            future, row = submit(vars_, prompt, neg, cid)
+            jobs[future] = row
 
-            print(f"🎬 Generating {current_combination}/{total_combinations}: {prompt[:50]}...")
-            res = generate_video(client, prompt, negative=neg, out_dir=output, name_prefix="mx-")
-            rows.append(
-                {
-                    "prompt": prompt,
-                    "negative": neg,
-                    "path": str(res.path),
-                    "thumb": str(res.thumb or ""),
-                }
+        if results:
+            record_results(jobs, results)
+
+    if promote_top and session_dir:
+        promote(
+            session=session_dir,
+            top=promote_top,
+            approve=[],
+            scorer=scorer,
+            ratings=RATINGS,
+            model=FINAL_MODEL,
+            output=output,
+            concurrency=concurrency,
+            dry=False,
+            refresh=refresh,
+        )
+
+
+@app.command()
+@tracing.traced("prompt_matrix.promote")
+def promote(
+    session: pathlib.Path = typer.Argument(
+        ..., help="Preview session directory (or its matrix_results.json)"
+    ),
+    top: int = typer.Option(0, "--top", "-k", min=0, help="Promote the K best clips by --scorer"),
+    approve: list[str] = typer.Option(
+        [], "--approve", help="Combination id (or id prefix) to promote regardless of score"
+    ),
+    scorer: str = typer.Option(
+        "ratings",
+        "--scorer",
+        help="Ranking: ratings (ab_viewer), sharpness or module:function",
+    ),
+    ratings: pathlib.Path = typer.Option(RATINGS, "--ratings", help="ab_viewer ratings file"),
+    model: str = typer.Option(FINAL_MODEL, "--model", help="Model to re-render promoted clips on"),
+    output: pathlib.Path = typer.Option(OUT, "--out"),
+    concurrency: int | None = typer.Option(
+        None, "--concurrency", "-j", help="Jobs in flight at once (default: model quota)"
+    ),
+    dry: bool = typer.Option(False, "--dry", help="List the clips that would be promoted"),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Ignore cached clips and render again (replaces the cache entry)"
+    ),
+):
+    """Re-render the best or approved clips of a preview session on the final model."""
+    try:
+        picked_scorer = load_scorer(scorer, ratings) if top else None
+    except (ImportError, ValueError) as e:
+        raise typer.BadParameter(str(e), param_hint="--scorer") from e
+    rows = {row["id"]: row for row in load_results(session)}
+    approved = {cid for cid in rows for prefix in approve if cid.startswith(prefix)}
+    clips = {cid: pathlib.Path(row["path"]) for cid, row in rows.items()}
+    picks = select_for_promotion(clips, picked_scorer, top, approved)
+    if not picks:
+        print("❌ Nothing to promote: pass --top K and/or --approve ID")
+        raise typer.Exit(1)
+
+    print(f"⬆️ Promoting {len(picks)}/{len(rows)} clips to {model}:")
+    for cid, score in picks:
+        why = "approved" if score is None else f"score {score:g}"
+        print(f"  {cid} ({why}): {rows[cid]['prompt'][:50]}")
+    if dry:
+        print("✅ Dry run complete - no API calls made")
+        return
+
+    client = create_client()
+    session_dir, journal = open_session("prompt_matrix", f"{session.stem} promoted", output, model)
+    jobs = {}
+    with JobScheduler(concurrency, model) as scheduler:
+        for cid, score in picks:
+            row = rows[cid]
+            future = scheduler.submit_video(
+                client,
+                row["prompt"],
+                negative=row.get("negative", ""),
+                name_prefix="mx-",
+                script_name="prompt_matrix",
+                session_dir=session_dir,
+                journal=journal,
+                model=model,
+                refresh=refresh,
+                candidates=len(row.get("candidates") or [None]),
             )
-    if rows and not dry:
-        (output / "matrix_results.json").write_text(json.dumps(rows, indent=2), encoding="utf-8")
-        print(f"saved {len(rows)} results -> {output}")
+            base = {k: row[k] for k in ("id", "vars", "shard", "prompt", "negative") if k in row}
+            jobs[future] = {
+                **base,
+                "model": model,
+                "promoted_from": row["path"],
+                "score": score,
+            }
+        record_results(jobs, MatrixResults(session_dir))
+
+
+@app.command()
+def merge(
+    sources: list[pathlib.Path] = typer.Argument(
+        ..., help="Shard matrix_results.json files or their session directories"
+    ),
+    output: pathlib.Path = typer.Option(pathlib.Path(RESULTS_FILE), "--out", "-o"),
+    config: pathlib.Path | None = typer.Option(
+        None, "--config", "-c", help="Matrix config, to report combinations no shard rendered"
+    ),
+    template: pathlib.Path | None = typer.Option(None, "--template", "-t"),
+    strategy: str = typer.Option("full", "--strategy", "-s"),
+    seed: int = typer.Option(0, "--seed"),
+):
+    """Combine per-shard results into one file, flagging duplicate and missing combinations."""
+    expected = None
+    if config or template:
+        if not (config and template):
+            raise typer.BadParameter("--config and --template must be given together")
+        try:
+            picked_strategy = parse_strategy(strategy)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--strategy") from e
+        if picked_strategy.kind == "halving":
+            raise typer.BadParameter(
+                "adaptive runs have no fixed plan to check coverage against", param_hint="--config"
+            )
+        plan = plan_combinations(load_config(config), picked_strategy, seed)
+        expected = {
+            combo_id(prompt, neg): {"id": combo_id(prompt, neg), "prompt": prompt, "negative": neg}
+            for _, prompt, neg in iter_rendered(load_template(template), plan)
+        }
+
+    report = merge_results(sources, expected)
+    output.write_text(json.dumps(report["results"], indent=2), encoding="utf-8")
+    print(f"merged {len(report['results'])} results from {len(sources)} shard(s) -> {output}")
+    for dup in report["duplicates"]:
+        print(f"⚠️ Duplicate {dup['id']} in {', '.join(dup['sources'])}: {dup['prompt'][:50]}")
+    for entry in report["missing"]:
+        print(f"❌ Missing {entry['id']}: {entry['prompt'][:50]}")
+    if expected is not None:
+        print(f"coverage: {len(expected) - len(report['missing'])}/{len(expected)} combinations")
+    if report["missing"]:
+        raise typer.Exit(1)
 
 
 if __name__ == "__main__":
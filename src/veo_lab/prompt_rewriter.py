@@ -6,12 +6,14 @@ import pathlib
 import typer
 from google.genai import types
 
+from . import tracing
 from .common import create_client
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
 
 
 @app.command()
+@tracing.traced("prompt_rewriter.run")
 def run(
     base_spec_file: pathlib.Path = typer.Option(..., "--base-spec", "-b"),
     n: int = typer.Option(6, "--n"),
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+
+LEDGER_PATH = pathlib.Path(__file__).resolve().parents[2] / "out" / "quota.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pacing (model TEXT PRIMARY KEY, next_submit REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS leases (
+    id TEXT PRIMARY KEY, model TEXT NOT NULL, pid INTEGER NOT NULL, acquired REAL NOT NULL
+);
+"""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class QuotaLedger:
+    """Host-wide per-model quota shared by every process through one SQLite file.
+
+    `pacing` holds each model's earliest next submission time (a token bucket of
+    capacity one, like `TokenBucket`), and `leases` the operations in flight. Each
+    change runs in a `BEGIN IMMEDIATE` transaction, so SQLite's file lock serializes
+    processes. Leases of processes that died, or older than `max_lease_age`, are
+    reclaimed.
+    """
+
+    def __init__(
+        self, path: pathlib.Path, poll_interval: float = 0.5, max_lease_age: float = 7200.0
+    ):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.max_lease_age = max_lease_age
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with contextlib.closing(sqlite3.connect(path, timeout=60)) as db:
+            db.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    def acquire(self, model: str, rpm: float) -> float:
+        """Reserve the next submission slot for `model` and sleep until it. Returns seconds waited."""
+        if rpm <= 0:
+            return 0.0
+        with self._transaction() as db:
+            now = time.time()
+            row = db.execute("SELECT next_submit FROM pacing WHERE model = ?", (model,)).fetchone()
+            start = max(now, row[0] if row else now)
+            db.execute(
+                "INSERT OR REPLACE INTO pacing (model, next_submit) VALUES (?, ?)",
+                (model, start + 60.0 / rpm),
+            )
+        wait = start - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def defer(self, model: str, seconds: float) -> None:
+        """Hold back every process's next submission for `model` by at least `seconds`."""
+        with self._transaction() as db:
+            until = time.time() + seconds
+            row = db.execute("SELECT next_submit FROM pacing WHERE model = ?", (model,)).fetchone()
+            if not row or row[0] < until:
+                db.execute(
+                    "INSERT OR REPLACE INTO pacing (model, next_submit) VALUES (?, ?)",
+                    (model, until),
+                )
+
+    def _reclaim(self, db: sqlite3.Connection) -> None:
+        cutoff = time.time() - self.max_lease_age
+        for lease_id, pid, acquired in db.execute(
+            "SELECT id, pid, acquired FROM leases"
+        ).fetchall():
+            if acquired < cutoff or not _pid_alive(pid):
+                db.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    def try_lease(self, model: str, limit: int) -> str | None:
+        """Take one of `limit` in-flight slots for `model` if one is free."""
+        with self._transaction() as db:
+            self._reclaim(db)
+            (held,) = db.execute("SELECT COUNT(*) FROM leases WHERE model = ?", (model,)).fetchone()
+            if held >= max(1, limit):
+                return None
+            lease_id = uuid.uuid4().hex
+            db.execute(
+                "INSERT INTO leases (id, model, pid, acquired) VALUES (?, ?, ?, ?)",
+                (lease_id, model, os.getpid(), time.time()),
+            )
+            return lease_id
+
+    def release(self, lease_id: str) -> None:
+        with self._transaction() as db:
+            db.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    @contextlib.contextmanager
+    def lease(self, model: str, limit: int) -> Iterator[float]:
+        """Hold an in-flight slot for `model`, waiting while `limit` are taken host-wide.
+
+        Yields the seconds spent waiting.
+        """
+        start = time.monotonic()
+        while (lease_id := self.try_lease(model, limit)) is None:
+            time.sleep(self.poll_interval)
+        try:
+            yield time.monotonic() - start
+        finally:
+            self.release(lease_id)
+
+    def usage(self) -> dict[str, int]:
+        """Leases currently held per model."""
+        with self._transaction() as db:
+            self._reclaim(db)
+            rows = db.execute("SELECT model, COUNT(*) FROM leases GROUP BY model").fetchall()
+        return dict(rows)
+
+
+_ledgers: dict[pathlib.Path, QuotaLedger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def default_ledger() -> QuotaLedger | None:
+    """The host-wide ledger, or None when VEO_QUOTA_LEDGER=0.
+
+    VEO_QUOTA_LEDGER may also name a different ledger file; by default it is
+    out/quota.sqlite3.
+    """
+    setting = os.environ.get("VEO_QUOTA_LEDGER", "").strip()
+    if setting.lower() in {"0", "off", "false", "no"}:
+        return None
+    path = pathlib.Path(setting) if setting else LEDGER_PATH
+    with _ledgers_lock:
+        if path not in _ledgers:
+            _ledgers[path] = QuotaLedger(path)
+        return _ledgers[path]
@@ -2,19 +2,21 @@ from __future__ import annotations
 
 import os
 import pathlib
-import time
 
 import typer
 
+from . import tracing
 from .common import OUT
+from .common import JobScheduler
 from .common import create_client
-from .common import generate_video
 from .common import image_from_file
+from .common import open_session
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
 
 
 @app.command()
+@tracing.traced("ref_image_lab.run")
 def run(
     ref_dir: pathlib.Path = typer.Option(..., "--ref-dir"),
     scene_prompt_file: pathlib.Path = typer.Option(..., "--scene"),
@@ -27,6 +29,15 @@ def run(
     dry: bool = typer.Option(
         False, "--dry", help="Show what would be generated without calling API"
     ),
+    concurrency: int | None = typer.Option(
+        None, "--concurrency", "-j", help="Jobs in flight at once (default: model quota)"
+    ),
+    resume: pathlib.Path | None = typer.Option(
+        None, "--resume", help="Resume an interrupted session directory from its journal"
+    ),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Ignore cached clips and render again (replaces the cache entry)"
+    ),
 ):
     prompt = scene_prompt_file.read_text(encoding="utf-8").strip()
     imgs = sorted([p for p in ref_dir.glob("*") if p.suffix.lower() in {".jpg", ".jpeg", ".png"}])
@@ -49,23 +60,32 @@ def run(
         return
 
     client = create_client()
-    for i, path in enumerate(imgs, start=1):
-        # Add rate limit protection: wait 30 seconds between requests (except first)
-        if i > 1:
-            print("⏳ Waiting 30 seconds to respect rate limits...")
-            time.sleep(30)
-
-        print(f"🎬 Generating video {i}/{len(imgs)} with reference: {path.name}")
-        ref = image_from_file(path)
-        res = generate_video(
-            client,
-            prompt,
-            image=ref,
-            out_dir=output,
-            name_prefix=f"ref{i:03d}-",
-            model=picked_model,
-        )
-        print(f"✅ {path.name} -> {res.path.name}")
+    session_dir, journal = open_session("ref_image_lab", prompt, output, picked_model, resume)
+    with JobScheduler(concurrency, picked_model) as scheduler:
+        futures = []
+        for i, path in enumerate(imgs, start=1):
+            print(f"🎬 Queued video {i}/{len(imgs)} with reference: {path.name}")
+            ref = image_from_file(path)
+            futures.append(
+                scheduler.submit_video(
+                    client,
+                    prompt,
+                    image=ref,
+                    name_prefix=f"ref{i:03d}-",
+                    model=picked_model,
+                    script_name="ref_image_lab",
+                    session_dir=session_dir,
+                    journal=journal,
+                    refresh=refresh,
+                )
+            )
+        for path, future in zip(imgs, futures, strict=True):
+            try:
+                res = future.result()
+            except Exception as e:
+                print(f"❌ {path.name} failed: {e}")
+                continue
+            print(f"✅ {path.name} -> {res.path.name}")
 
 
 if __name__ == "__main__":
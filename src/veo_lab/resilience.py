@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import os
+import random
+import re
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+from google.genai import errors
+
+from . import tracing
+from .metrics import ClipMetrics
+from .quota import default_ledger
+
+T = TypeVar("T")
+
+QUOTA = "quota"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+_TRANSIENT_CODES = {408, 500, 502, 503, 504}
+_TRANSIENT_STATUSES = {"UNAVAILABLE", "INTERNAL", "DEADLINE_EXCEEDED", "ABORTED"}
+
+
+def classify(error: BaseException) -> str:
+    """`quota` (429 / RESOURCE_EXHAUSTED), `transient` (5xx, timeouts, dropped
+    connections) or `permanent` (bad requests, auth, safety blocks, anything else)."""
+    if isinstance(error, errors.APIError):
+        if error.code == 429 or error.status == "RESOURCE_EXHAUSTED":
+            return QUOTA
+        if error.code in _TRANSIENT_CODES or error.status in _TRANSIENT_STATUSES:
+            return TRANSIENT
+        return PERMANENT
+    if isinstance(error, ConnectionError | TimeoutError):
+        return TRANSIENT
+    try:
+        import httpx
+    except ImportError:  # pragma: no cover - httpx ships with google-genai
+        return PERMANENT
+    return TRANSIENT if isinstance(error, httpx.TransportError) else PERMANENT
+
+
+def is_definite(error: BaseException) -> bool:
+    """True when the server answered with an error, so the request was not accepted.
+
+    Timeouts and dropped connections carry no response: the request may still
+    have been accepted before the connection failed.
+    """
+    return isinstance(error, errors.APIError)
+
+
+def retry_after(error: BaseException) -> float | None:
+    """Server-requested delay: the Retry-After header or a google.rpc.RetryInfo detail."""
+    response = getattr(error, "response", None)
+    header = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    if header:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            pass
+    details = getattr(error, "details", None)
+    body = details.get("error", details) if isinstance(details, dict) else {}
+    for detail in body.get("details", []) if isinstance(body, dict) else []:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        match = re.fullmatch(r"([\d.]+)s", delay or "")
+        if match:
+            return float(match.group(1))
+    return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter, capped per attempt and in attempt count."""
+
+    max_attempts: int = 5
+    base: float = 2.0
+    cap: float = 120.0
+    # First pause for an exhausted quota with no Retry-After (the per-minute window)
+    quota_cooldown: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> RetryPolicy:
+        """VEO_RETRY_ATTEMPTS, VEO_RETRY_BASE and VEO_RETRY_CAP override the defaults."""
+        return cls(
+            max_attempts=int(os.environ.get("VEO_RETRY_ATTEMPTS", cls.max_attempts)),
+            base=float(os.environ.get("VEO_RETRY_BASE", cls.base)),
+            cap=float(os.environ.get("VEO_RETRY_CAP", cls.cap)),
+        )
+
+    def backoff(self, attempt: int, rng: random.Random | None = None) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)."""
+        return (rng or random).uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Stops every caller for a model while its quota is exhausted.
+
+    `trip` opens the breaker for a cooldown. Callers entering `wait` block until it
+    ends; then one caller probes (half-open) while the rest keep waiting. A good
+    probe closes the breaker, and another quota error re-opens it for twice as long.
+    """
+
+    def __init__(self, max_cooldown: float = 600.0):
+        self.max_cooldown = max_cooldown
+        self._cond = threading.Condition()
+        self._open_until = 0.0
+        self._probing = False
+        self._strikes = 0
+
+    @property
+    def is_open(self) -> bool:
+        with self._cond:
+            return self._probing or time.monotonic() < self._open_until
+
+    def wait(self) -> float:
+        """Block while the breaker is open; returns the seconds paused."""
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                remaining = self._open_until - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                elif self._probing:
+                    self._cond.wait(1.0)
+                else:
+                    if self._strikes:
+                        self._probing = True
+                    return time.monotonic() - start
+
+    def trip(self, cooldown: float) -> float:
+        """Open for `cooldown` seconds, doubled per consecutive trip. Returns the pause applied."""
+        with self._cond:
+            pause = min(self.max_cooldown, cooldown * 2**self._strikes)
+            self._strikes += 1
+            self._open_until = max(self._open_until, time.monotonic() + pause)
+            self._probing = False
+            self._cond.notify_all()
+            return pause
+
+    def success(self) -> None:
+        with self._cond:
+            self._strikes = 0
+            self._probing = False
+            self._cond.notify_all()
+
+    def release_probe(self) -> None:
+        """The probe failed for a reason other than quota: let the next caller probe."""
+        with self._cond:
+            self._probing = False
+            self._cond.notify_all()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        return _breakers.setdefault(model, CircuitBreaker())
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    *,
+    model: str,
+    label: str = "call",
+    metrics: ClipMetrics | None = None,
+    policy: RetryPolicy | None = None,
+    breaker: CircuitBreaker | None = None,
+    stage: str = "submit",
+    idempotent: bool = True,
+) -> T:
+    """Call `fn`, retrying quota and transient errors; permanent ones raise at once.
+
+    Unless `idempotent`, transient errors without a server response (timeouts,
+    dropped connections) also raise at once: `fn` may have started billable work
+    that a retry would duplicate. Quota errors trip the model's circuit breaker, pausing every caller in this
+    process and deferring other processes' submissions through the quota ledger.
+    Each attempt is timed as `stage` and every pause as `backoff` in `metrics`,
+    where each retry decision is also appended to `retry_decisions`.
+    """
+    policy = policy or RetryPolicy.from_env()
+    breaker = breaker or breaker_for(model)
+    attempt = 0
+    while True:
+        attempt += 1
+        paused = breaker.wait()
+        if metrics is not None and paused > 0:
+            metrics.add("backoff", paused)
+        try:
+            if metrics is not None:
+                with metrics.stage(stage):
+                    result = fn()
+            else:
+                result = fn()
+        except BaseException as e:
+            kind = classify(e) if isinstance(e, Exception) else PERMANENT
+            hinted = retry_after(e)
+            delay, source = 0.0, "breaker"
+            if kind == QUOTA:
+                # Trip even on the last attempt: it also ends this caller's probe
+                delay = breaker.trip(hinted if hinted is not None else policy.quota_cooldown)
+                ledger = default_ledger()
+                if ledger is not None:
+                    ledger.defer(model, delay)
+            else:
+                breaker.release_probe()
+            ambiguous = not idempotent and kind == TRANSIENT and not is_definite(e)
+            if ambiguous:
+                print(f"⚠️ {label} may have reached the server ({e!r}); not retrying it")
+            if kind == PERMANENT or ambiguous or attempt >= policy.max_attempts:
+                if metrics is not None and kind != PERMANENT:
+                    metrics.retry_decisions.append(
+                        {"attempt": attempt, "error": kind, "action": "give_up"}
+                    )
+                raise
+            if kind == QUOTA:
+                pass  # the breaker pause, applied in breaker.wait
+            elif hinted is not None:
+                delay, source = hinted, "retry_after"
+            else:
+                delay, source = policy.backoff(attempt), "backoff"
+            code = getattr(e, "code", None)
+            print(
+                f"🔁 {label} hit a {kind} error ({code or type(e).__name__}); "
+                f"retry {attempt}/{policy.max_attempts - 1} in {delay:.0f}s"
+            )
+            if metrics is not None:
+                metrics.submit_retries += 1
+                metrics.retry_decisions.append(
+                    {
+                        "attempt": attempt,
+                        "error": kind,
+                        "code": code,
+                        "delay": round(delay, 2),
+                        "source": source,
+                    }
+                )
+            tracing.record_span("retry.backoff", 0.0, error=kind, delay=delay, source=source)
+            if kind != QUOTA:
+                # Quota pauses happen in breaker.wait so every worker shares them
+                time.sleep(delay)
+                if metrics is not None:
+                    metrics.add("backoff", delay)
+            continue
+        breaker.success()
+        return result
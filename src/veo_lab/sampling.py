@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import itertools
+import math
+import random
+import re
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+# Candidate rows scored per step of the greedy covering-array construction
+_CANDIDATES = 20
+
+
+@dataclass(frozen=True)
+class Strategy:
+    """How to pick combinations from a matrix: all of them, a covering array, or a sample."""
+
+    kind: str  # "full", "t-wise", "random", "lhs" or "halving"
+    n: int = 0  # strength t for t-wise, sample size for random/lhs, batch per halving round
+
+    def __str__(self) -> str:
+        if self.kind == "full":
+            return "full"
+        if self.kind == "t-wise":
+            return "pairwise" if self.n == 2 else f"{self.n}-wise"
+        return f"{self.kind}:{self.n}"
+
+
+def parse_strategy(spec: str) -> Strategy:
+    """Parse `full`, `pairwise`, `<t>-wise`, `random:N`, `lhs:N` or `halving:N`."""
+    spec = spec.strip().lower()
+    if spec in {"", "full"}:
+        return Strategy("full")
+    if spec == "pairwise":
+        return Strategy("t-wise", 2)
+    if m := re.fullmatch(r"(\d+)-wise", spec):
+        t = int(m.group(1))
+        if t < 1:
+            raise ValueError(f"covering strength must be at least 1: {spec!r}")
+        return Strategy("t-wise", t)
+    if m := re.fullmatch(r"(random|lhs|halving):(\d+)", spec):
+        n = int(m.group(2))
+        if n < 1:
+            raise ValueError(f"sample size must be at least 1: {spec!r}")
+        return Strategy(m.group(1), n)
+    raise ValueError(
+        f"unknown strategy {spec!r} (use full, pairwise, 3-wise, random:N, lhs:N or halving:N)"
+    )
+
+
+def _decode(index: int, levels: list[int]) -> tuple[int, ...]:
+    """Mixed-radix decode of a row index into per-dimension value indices."""
+    row = []
+    for size in reversed(levels):
+        index, value = divmod(index, size)
+        row.append(value)
+    return tuple(reversed(row))
+
+
+def covering_array(levels: list[int], t: int, seed: int = 0) -> list[tuple[int, ...]]:
+    """Rows of value indices in which every t-way combination of values appears at least once.
+
+    Greedy AETG-style construction: each new row starts from an uncovered t-tuple and
+    fills the remaining dimensions with the values that cover the most uncovered
+    tuples; the best of several randomized candidates is kept. Not minimal, but far
+    smaller than the full product. Deterministic for a given `seed`.
+    """
+    k = len(levels)
+    if k == 0 or any(size == 0 for size in levels):
+        return []
+    if t >= k:
+        return list(itertools.product(*(range(size) for size in levels)))
+
+    rng = random.Random(seed)
+    uncovered: set[tuple[tuple[int, ...], tuple[int, ...]]] = {
+        (cols, values)
+        for cols in itertools.combinations(range(k), t)
+        for values in itertools.product(*(range(levels[c]) for c in cols))
+    }
+    pending = sorted(uncovered)  # seed pool; covered entries are dropped lazily
+    rows: list[tuple[int, ...]] = []
+
+    def pick_seed() -> tuple[tuple[int, ...], tuple[int, ...]]:
+        while True:
+            i = rng.randrange(len(pending))
+            item = pending[i]
+            if item in uncovered:
+                return item
+            pending[i] = pending[-1]
+            pending.pop()
+
+    def gain(row: dict[int, int], col: int, value: int) -> int:
+        assigned = sorted(row)
+        covered = 0
+        for others in itertools.combinations(assigned, t - 1):
+            cols = tuple(sorted((*others, col)))
+            values = tuple(value if c == col else row[c] for c in cols)
+            covered += (cols, values) in uncovered
+        return covered
+
+    while uncovered:
+        best_row: tuple[int, ...] = ()
+        best_score = -1
+        for _ in range(_CANDIDATES):
+            cols, values = pick_seed()
+            row = dict(zip(cols, values, strict=True))
+            rest = [c for c in range(k) if c not in row]
+            rng.shuffle(rest)
+            for col in rest:
+                scores = [(gain(row, col, v), rng.random(), v) for v in range(levels[col])]
+                row[col] = max(scores)[2]
+            full = tuple(row[c] for c in range(k))
+            score = sum(
+                (cols, tuple(full[c] for c in cols)) in uncovered
+                for cols in itertools.combinations(range(k), t)
+            )
+            if score > best_score:
+                best_row, best_score = full, score
+        rows.append(best_row)
+        for cols in itertools.combinations(range(k), t):
+            uncovered.discard((cols, tuple(best_row[c] for c in cols)))
+    return rows
+
+
+def random_rows(levels: list[int], n: int, seed: int = 0) -> list[tuple[int, ...]]:
+    """`n` distinct rows drawn uniformly without materializing the full product."""
+    total = math.prod(levels)
+    picks = random.Random(seed).sample(range(total), min(n, total))
+    return [_decode(i, levels) for i in sorted(picks)]
+
+
+def latin_hypercube_rows(levels: list[int], n: int, seed: int = 0) -> list[tuple[int, ...]]:
+    """`n` rows in which each dimension's values are used as evenly as possible.
+
+    Every dimension is split into `n` strata mapped onto its values and shuffled
+    independently, so each value appears floor(n/levels) or ceil(n/levels) times.
+    Duplicate rows are dropped.
+    """
+    if not levels or any(size == 0 for size in levels):
+        return []
+    rng = random.Random(seed)
+    columns = []
+    for size in levels:
+        column = [i * size // n for i in range(n)]
+        rng.shuffle(column)
+        columns.append(column)
+    return list(dict.fromkeys(zip(*columns, strict=True)))
+
+
+def sample_combinations(dims: dict[str, list], strategy: Strategy, seed: int = 0) -> Iterator[dict]:
+    """Yield dicts of dimension -> value chosen by `strategy` (sorted dimension order)."""
+    names = sorted(dims)
+    levels = [len(dims[name]) for name in names]
+    if strategy.kind == "full":
+        rows = itertools.product(*(range(size) for size in levels))
+    elif strategy.kind == "t-wise":
+        rows = covering_array(levels, strategy.n, seed)
+    elif strategy.kind == "random":
+        rows = random_rows(levels, strategy.n, seed)
+    elif strategy.kind == "lhs":
+        rows = latin_hypercube_rows(levels, strategy.n, seed)
+    else:
+        raise ValueError(f"strategy {strategy} cannot be planned up front")
+    for row in rows:
+        yield {name: dims[name][i] for name, i in zip(names, row, strict=True)}
+
+
+def halving_rounds(levels: list[int], eta: int = 2) -> int:
+    """Rounds of `prune_values` until every dimension is down to one value."""
+    return max((math.ceil(math.log(size, eta)) for size in levels if size > 1), default=0)
+
+
+def prune_values(
+    dims: dict[str, list], observations: list[tuple[dict, float]], eta: int = 2
+) -> dict[str, list]:
+    """One successive-halving step: keep the best 1/`eta` of each dimension's observed values.
+
+    A value's score is the mean score of the observed combinations that use it.
+    Only observed values are ranked; values never observed are carried forward
+    untouched, so they are neither dropped before being tried nor kept in place of
+    a value that scored well. Ties keep their configured order, and the survivors
+    keep it too. Dimensions with one value are left alone.
+    """
+    pruned = {}
+    for name, values in dims.items():
+        if len(values) <= 1:
+            pruned[name] = list(values)
+            continue
+        totals = [[0.0, 0] for _ in values]
+        for combo, score in observations:
+            if name in combo and combo[name] in values:
+                total = totals[values.index(combo[name])]
+                total[0] += score
+                total[1] += 1
+        seen = [i for i, (_, n) in enumerate(totals) if n]
+        ranked = sorted(seen, key=lambda i: (-totals[i][0] / totals[i][1], i))
+        keep = set(ranked[: math.ceil(len(seen) / eta)])
+        pruned[name] = [v for i, v in enumerate(values) if i in keep or not totals[i][1]]
+    return pruned
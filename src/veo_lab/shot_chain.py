@@ -2,22 +2,25 @@ from __future__ import annotations
 
 import os
 import pathlib
-import time
 
 import typer
 import yaml
 
+from . import tracing
 from .common import OUT
 from .common import concat_videos_concat_demuxer
 from .common import create_client
-from .common import create_session_directory
 from .common import generate_video
 from .common import image_from_file
+from .common import open_session
+from .common import record_file_metrics
+from .metrics import ClipMetrics
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
 
 
 @app.command()
+@tracing.traced("shot_chain.run")
 def run(
     file: pathlib.Path = typer.Option(..., "--file", "-f"),
     output: pathlib.Path = typer.Option(OUT, "--out"),
@@ -30,6 +33,12 @@ def run(
     dry: bool = typer.Option(
         False, "--dry", help="Show what would be generated without calling API"
     ),
+    resume: pathlib.Path | None = typer.Option(
+        None, "--resume", help="Resume an interrupted session directory from its journal"
+    ),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Ignore cached clips and render again (replaces the cache entry)"
+    ),
 ):
     data = yaml.safe_load(file.read_text(encoding="utf-8"))
     prompts: list[str] = data.get("prompts", [])
@@ -54,16 +63,11 @@ def run(
 
     # Create a single session directory for the entire chain
     first_prompt = prompts[0] if prompts else "chain"
-    session_dir = create_session_directory("shot_chain", first_prompt, output, picked_model)
+    session_dir, journal = open_session("shot_chain", first_prompt, output, picked_model, resume)
 
     last_ref = None
     outs = []
     for i, p in enumerate(prompts, start=1):
-        # Add rate limit protection: wait 30 seconds between requests (except first)
-        if i > 1:
-            print("⏳ Waiting 30 seconds to respect rate limits...")
-            time.sleep(30)
-
         print(f"🎬 Generating video {i}/{len(prompts)}: {p[:50]}...")
         res = generate_video(
             client,
@@ -73,6 +77,8 @@ def run(
             sequence_num=i,
             session_dir=session_dir,
             model=picked_model,
+            journal=journal,
+            refresh=refresh,
         )
         outs.append(res.path)
         # Use the thumbnail that was already created
@@ -83,7 +89,9 @@ def run(
     # Concatenate if requested
     if concat:
         concat_path = session_dir / concat
-        concat_videos_concat_demuxer(outs, concat_path)
+        metrics = ClipMetrics(model=picked_model)
+        concat_videos_concat_demuxer(outs, concat_path, metrics)
+        record_file_metrics(session_dir, concat_path.name, metrics)
         print(f"🎬 Concatenated {len(outs)} videos -> {concat_path}")
 
 
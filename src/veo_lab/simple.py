@@ -6,16 +6,19 @@ import pathlib
 
 import typer
 
+from . import tracing
 from .common import OUT
 from .common import create_client
 from .common import generate_video
 from .common import image_from_file
 from .common import list_models
+from .common import open_session
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
 
 
 @app.command()
+@tracing.traced("simple.run")
 def run(
     prompt: str = typer.Option(None, "--prompt", "-p", help="Inline prompt string"),
     prompt_file: pathlib.Path = typer.Option(
@@ -37,6 +40,12 @@ def run(
     dry: bool = typer.Option(
         False, "--dry", help="Show what would be generated without calling API"
     ),
+    resume: pathlib.Path | None = typer.Option(
+        None, "--resume", help="Resume an interrupted session directory from its journal"
+    ),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Ignore cached clips and render again (replaces the cache entry)"
+    ),
 ):
     """
     one-shot video generation: send a prompt (and optional negative/ref image) to veo 3.
@@ -65,14 +74,17 @@ def run(
 
     client = create_client()
     img = image_from_file(image) if image else None
+    session_dir, journal = open_session("simple", text, out, picked_model, resume)
     res = generate_video(
         client,
         text,
         negative=negative,
         image=img,
-        out_dir=out,
         script_name="simple",
         model=picked_model,
+        session_dir=session_dir,
+        journal=journal,
+        refresh=refresh,
     )
     print(res.path)
 
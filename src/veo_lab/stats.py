@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import pathlib
+
+import typer
+
+from .common import OUT
+from .metrics import STAGES
+from .metrics import percentile
+
+app = typer.Typer(add_completion=False, no_args_is_help=False)
+
+# Per-clip counters summarized alongside the stage timings
+COUNTERS = ("polls", "retries", "submit_retries", "bytes_downloaded")
+
+
+def collect_metrics(root: pathlib.Path) -> list[dict]:
+    """Every metrics record (one per operation or joined output) in the metadata.json files under `root`."""
+    records = []
+    for metadata_file in sorted(root.rglob("metadata.json")):
+        with contextlib.suppress(OSError, json.JSONDecodeError):
+            metadata = json.loads(metadata_file.read_text(encoding="utf-8"))
+            for filename, record in (metadata.get("metrics") or {}).items():
+                records.append({**record, "file": str(metadata_file.parent / filename)})
+    return records
+
+
+def summarize(records: list[dict]) -> dict[str, dict[str, dict]]:
+    """model -> stage/counter -> {n, p50, p95, max} over the collected records."""
+    samples: dict[str, dict[str, list[float]]] = {}
+    for record in records:
+        by_name = samples.setdefault(record.get("model") or "unknown", {})
+        for stage, seconds in (record.get("stages") or {}).items():
+            by_name.setdefault(stage, []).append(seconds)
+        if record.get("stages", {}).get("render") is not None:
+            for counter in COUNTERS:
+                by_name.setdefault(counter, []).append(record.get(counter, 0))
+    order = {name: i for i, name in enumerate(STAGES + COUNTERS)}
+    return {
+        model: {
+            name: {
+                "n": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "max": max(values),
+            }
+            for name, values in sorted(by_name.items(), key=lambda kv: order.get(kv[0], 99))
+        }
+        for model, by_name in sorted(samples.items())
+    }
+
+
+def _fmt(name: str, value: float) -> str:
+    if name == "bytes_downloaded":
+        return f"{value / 1e6:.1f}MB"
+    if name in COUNTERS:
+        return f"{value:g}"
+    return f"{value:.1f}s"
+
+
+@app.command()
+def run(
+    root: pathlib.Path = typer.Argument(OUT, help="Directory to scan for session metadata"),
+    as_json: bool = typer.Option(False, "--json", help="Print the summary as JSON"),
+):
+    """Per-model p50/p95 latency of each pipeline stage across recorded sessions."""
+    records = collect_metrics(root)
+    summary = summarize(records)
+    if as_json:
+        print(json.dumps(summary, indent=2))
+        return
+    if not summary:
+        print(f"No stage metrics found under {root}")
+        return
+    files = sum(len(record.get("files") or [record["file"]]) for record in records)
+    print(f"📊 {len(records)} jobs ({files} files) with metrics under {root}")
+    for model, rows in summary.items():
+        print(f"\n{model}")
+        print(f"  {'stage':<18}{'n':>6}{'p50':>10}{'p95':>10}{'max':>10}")
+        for name, row in rows.items():
+            cells = "".join(f"{_fmt(name, row[k]):>10}" for k in ("p50", "p95", "max"))
+            print(f"  {name:<18}{row['n']:>6}{cells}")
+
+
+if __name__ == "__main__":
+    app()
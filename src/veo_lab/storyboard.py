@@ -1,23 +1,167 @@
 from __future__ import annotations
 
+import contextlib
+import hashlib
 import json
 import os
 import pathlib
-import time
 
 import typer
 
+from . import tracing
+from .cache import link_or_copy
 from .common import OUT
+from .common import JobScheduler
 from .common import concat_videos_concat_demuxer
 from .common import create_client
-from .common import create_session_directory
+from .common import create_video_filename
 from .common import generate_video
 from .common import image_from_file
+from .common import open_session
+from .common import record_file_metrics
+from .common import save_session_metadata
+from .journal import DONE
+from .metrics import ClipMetrics
+from .tiers import FINAL_MODEL
+from .tiers import PREVIEW_MODEL
+from .tiers import RATINGS
+from .tiers import Scorer
+from .tiers import load_scorer
+from .tiers import select_for_promotion
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
 
 
+def carries_last_frame(shot: dict) -> bool:
+    """True if the shot continues from the previous clip's last frame (and has no own image)."""
+    return bool(shot.get("carry_last_frame", False)) and not shot.get("image")
+
+
+def build_shot_chains(shots: list[dict]) -> list[list[int]]:
+    """Split the storyboard into independent chains of shot indices (0-based).
+
+    Each carry shot joins the chain of the shot before it; every other shot starts a
+    new chain. Chains have no dependencies on each other and can render concurrently.
+    """
+    chains: list[list[int]] = []
+    for idx, shot in enumerate(shots):
+        if chains and carries_last_frame(shot):
+            chains[-1].append(idx)
+        else:
+            chains.append([idx])
+    return chains
+
+
+MANIFEST_FILE = "storyboard_manifest.json"
+
+
+def shot_fingerprints(shots: list[dict], model: str) -> list[str]:
+    """Hash each shot's render inputs; carry shots also hash their upstream fingerprint.
+
+    A change to any shot therefore changes the fingerprint of every carry shot
+    downstream of it, which is exactly the set that must be re-rendered.
+    """
+    fingerprints: list[str] = []
+    for idx, shot in enumerate(shots):
+        h = hashlib.sha256()
+        for part in (model, shot["prompt"], shot.get("negative", "")):
+            h.update(part.encode("utf-8") + b"\0")
+        if shot.get("image"):
+            h.update(pathlib.Path(shot["image"]).read_bytes())
+        elif carries_last_frame(shot) and idx > 0:
+            h.update(fingerprints[idx - 1].encode("utf-8"))
+        fingerprints.append(h.hexdigest())
+    return fingerprints
+
+
+def find_previous_manifest(
+    output_dir: pathlib.Path, storyboard: pathlib.Path, exclude: pathlib.Path | None = None
+) -> pathlib.Path | None:
+    """Newest storyboard session under `output_dir` that rendered the same storyboard file."""
+    target = str(storyboard.resolve())
+    candidates = []
+    for manifest in output_dir.glob(f"*/*_storyboard_*/{MANIFEST_FILE}"):
+        if exclude is not None and manifest.parent == exclude:
+            continue
+        with contextlib.suppress(OSError, json.JSONDecodeError):
+            if json.loads(manifest.read_text(encoding="utf-8")).get("storyboard") == target:
+                candidates.append(manifest)
+    return max(candidates, key=lambda m: m.stat().st_mtime, default=None)
+
+
+def load_clean_shots(manifest: pathlib.Path) -> dict[str, tuple[pathlib.Path, pathlib.Path | None]]:
+    """Map fingerprint -> (clip, last frame) for clips still present in a previous session."""
+    data = json.loads(manifest.read_text(encoding="utf-8"))
+    clean = {}
+    for entry in data.get("shots", []):
+        clip = manifest.parent / entry["clip"]
+        thumb = manifest.parent / entry["thumb"] if entry.get("thumb") else None
+        if clip.exists():
+            clean[entry["fingerprint"]] = (clip, thumb if thumb and thumb.exists() else None)
+    return clean
+
+
+def write_manifest(
+    session_dir: pathlib.Path,
+    storyboard: pathlib.Path,
+    model: str,
+    shots: list[dict],
+    fingerprints: list[str],
+    clips: dict[int, tuple[pathlib.Path, pathlib.Path | None]],
+) -> pathlib.Path:
+    """Record each rendered shot's fingerprint so the next --incremental run can reuse it."""
+    entries = []
+    for idx, (clip, thumb) in sorted(clips.items()):
+        entries.append(
+            {
+                "id": shots[idx].get("id", f"shot{idx + 1:02d}"),
+                "fingerprint": fingerprints[idx],
+                "clip": clip.name,
+                "thumb": thumb.name if thumb else "",
+            }
+        )
+    manifest = session_dir / MANIFEST_FILE
+    data = {"storyboard": str(storyboard.resolve()), "model": model, "shots": entries}
+    manifest.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    return manifest
+
+
+def plan_promotion(
+    shots: list[dict],
+    preview_manifest: pathlib.Path,
+    scorer: Scorer | None = None,
+    top_k: int = 0,
+) -> tuple[set[int], dict[int, tuple[pathlib.Path, pathlib.Path | None]], list[str]]:
+    """Decide which shots of a preview session to re-render on the final model.
+
+    Shots marked `"approved": true` and the `top_k` best preview clips by `scorer` are
+    promoted, along with every carry shot downstream of them (their first frame would
+    change). Shots whose preview clip is missing or stale are promoted too. Returns
+    the promoted indices, the preview clips kept for the rest, and the kept clips'
+    preview fingerprints (so a later --incremental run does not mistake them for
+    final renders).
+    """
+    data = json.loads(preview_manifest.read_text(encoding="utf-8"))
+    preview_fps = shot_fingerprints(shots, data.get("model", ""))
+    available = load_clean_shots(preview_manifest)
+    previews = {idx: available[fp] for idx, fp in enumerate(preview_fps) if fp in available}
+    ids = [shot.get("id", f"shot{idx + 1:02d}") for idx, shot in enumerate(shots)]
+    approved = {ids[idx] for idx, shot in enumerate(shots) if shot.get("approved")}
+    clips = {ids[idx]: clip for idx, (clip, _) in previews.items()}
+    picked = {cid for cid, _ in select_for_promotion(clips, scorer, top_k, approved)}
+
+    promoted = {idx for idx in range(len(shots)) if ids[idx] in picked or idx not in previews}
+    for chain in build_shot_chains(shots):
+        for pos, idx in enumerate(chain):
+            if idx in promoted:
+                promoted.update(chain[pos:])
+                break
+    kept = {idx: clip for idx, clip in previews.items() if idx not in promoted}
+    return promoted, kept, preview_fps
+
+
 @app.command()
+@tracing.traced("storyboard.run")
 def run(
     storyboard: pathlib.Path = typer.Option(..., "--storyboard", "-s"),
     output_dir: pathlib.Path = typer.Option(OUT, "--out"),
@@ -30,24 +174,103 @@ def run(
     dry: bool = typer.Option(
         False, "--dry", help="Show what would be generated without calling API"
     ),
+    resume: pathlib.Path | None = typer.Option(
+        None, "--resume", help="Resume an interrupted session directory from its journal"
+    ),
+    refresh: bool = typer.Option(
+        False, "--refresh", help="Ignore cached clips and render again (replaces the cache entry)"
+    ),
+    concurrency: int | None = typer.Option(
+        None, "--concurrency", "-j", help="Chains rendered at once (default: model quota)"
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Reuse unchanged shots from the last session of this storyboard",
+    ),
+    preview: bool = typer.Option(
+        False, "--preview", help=f"Render every shot on the cheap preview tier ({PREVIEW_MODEL})"
+    ),
+    promote_from: pathlib.Path | None = typer.Option(
+        None,
+        "--promote-from",
+        help="Preview session: re-render approved/top shots on the final model, keep the rest",
+    ),
+    top: int = typer.Option(
+        0, "--top", "-k", min=0, help="With --promote-from, also promote the K best shots"
+    ),
+    scorer: str = typer.Option(
+        "ratings",
+        "--scorer",
+        help="Ranking for --top: ratings (ab_viewer), sharpness or module:function",
+    ),
+    ratings: pathlib.Path = typer.Option(RATINGS, "--ratings", help="ab_viewer ratings file"),
 ):
     data: dict = json.loads(storyboard.read_text(encoding="utf-8"))
     shots: list[dict] = data.get("shots", [])
     assert shots, "no shots found"
 
     # Model selection
-    picked_model = model or os.environ.get("VEO_MODEL")
+    if preview and promote_from:
+        raise typer.BadParameter("--preview and --promote-from are separate passes")
+    if preview:
+        picked_model = PREVIEW_MODEL
+    elif promote_from:
+        picked_model = model or FINAL_MODEL
+    else:
+        picked_model = model or os.environ.get("VEO_MODEL")
     if not picked_model:
         raise typer.BadParameter("Specify --model or set VEO_MODEL environment variable")
 
+    chains = build_shot_chains(shots)
+    fingerprints = shot_fingerprints(shots, picked_model)
+    manifest_fps = list(fingerprints)
+    clean: dict[str, tuple[pathlib.Path, pathlib.Path | None]] = {}
+    kept: dict[int, tuple[pathlib.Path, pathlib.Path | None]] = {}
+    if promote_from:
+        try:
+            picked_scorer = load_scorer(scorer, ratings) if top else None
+        except (ImportError, ValueError) as e:
+            raise typer.BadParameter(str(e), param_hint="--scorer") from e
+        promoted, kept, preview_fps = plan_promotion(
+            shots, promote_from / MANIFEST_FILE, picked_scorer, top
+        )
+        for idx in kept:
+            manifest_fps[idx] = preview_fps[idx]
+        print(
+            f"⬆️ Promoting {len(promoted)}/{len(shots)} shots to {picked_model}; "
+            f"keeping {len(kept)} preview clips from {promote_from}"
+        )
+    if incremental:
+        previous = find_previous_manifest(output_dir, storyboard, exclude=resume)
+        if previous:
+            clean = load_clean_shots(previous)
+            dirty = sum(fp not in clean for fp in fingerprints)
+            print(f"🧮 Incremental: {dirty}/{len(shots)} shots changed since {previous.parent}")
+        else:
+            print("🧮 Incremental: no previous session for this storyboard, rendering all shots")
+
+    # Shots linked from an earlier session instead of rendered: unchanged or kept previews
+    reused = {idx: clean[fp] for idx, fp in enumerate(fingerprints) if fp in clean}
+    for idx, clip in kept.items():
+        reused.setdefault(idx, clip)
+
     if dry:
-        print(f"🔍 Dry run - storyboard with {len(shots)} shots:")
+        print(f"🔍 Dry run - storyboard with {len(shots)} shots in {len(chains)} chains:")
         for idx, shot in enumerate(shots, start=1):
             prompt = shot["prompt"]
             negative = shot.get("negative", "")
-            print(f"  Shot {idx}: {prompt[:50]}...")
+            if idx - 1 in kept:
+                reuse_note = " (preview kept)"
+            elif idx - 1 in reused:
+                reuse_note = " (unchanged, reused)"
+            else:
+                reuse_note = ""
+            print(f"  Shot {idx}: {prompt[:50]}...{reuse_note}")
             if negative:
                 print(f"    Negative: {negative}")
+        for n, chain in enumerate(chains, start=1):
+            print(f"  Chain {n}: shots {', '.join(str(i + 1) for i in chain)}")
         print(f"  • Model: {picked_model}")
         if concat_to:
             print(f"  Would concatenate to: {concat_to}")
@@ -58,44 +281,91 @@ def run(
 
     # Create a single session directory for the entire storyboard
     first_shot = shots[0]["prompt"] if shots else "storyboard"
-    session_dir = create_session_directory("storyboard", first_shot, output_dir, picked_model)
-
-    prev_last_ref = None
-    clip_paths: list[pathlib.Path] = []
-    for idx, shot in enumerate(shots, start=1):
-        # Add rate limit protection: wait 30 seconds between requests (except first)
-        if idx > 1:
-            print("⏳ Waiting 30 seconds to respect rate limits...")
-            time.sleep(30)
-
-        prompt: str = shot["prompt"]
-        negative: str = shot.get("negative", "")
-        carry_last: bool = bool(shot.get("carry_last_frame", False))
-        image_path = shot.get("image")
-        ref = prev_last_ref if (carry_last and prev_last_ref is not None) else None
-        if image_path:
-            ref = image_from_file(pathlib.Path(image_path))
-
-        print(f"🎬 Generating shot {idx}/{len(shots)}: {prompt[:50]}...")
-        res = generate_video(
-            client,
-            prompt,
-            negative=negative,
-            image=ref,
-            script_name="storyboard",
-            sequence_num=idx,
-            session_dir=session_dir,
-            model=picked_model,
+    session_dir, journal = open_session("storyboard", first_shot, output_dir, picked_model, resume)
+
+    def reuse_shot(idx: int) -> tuple[pathlib.Path, pathlib.Path | None]:
+        """Link an unchanged shot (or kept preview) from an earlier session into this one."""
+        clip_src, thumb_src = reused[idx]
+        shot = shots[idx]
+        filename = create_video_filename(shot["prompt"], picked_model, idx + 1)
+        dest = session_dir / filename
+        link_or_copy(clip_src, dest)
+        thumb = None
+        if thumb_src:
+            thumb = dest.with_suffix(".last.jpg")
+            link_or_copy(thumb_src, thumb)
+        save_session_metadata(
+            session_dir,
+            "storyboard",
+            shot["prompt"],
+            shot.get("negative", ""),
+            picked_model,
+            [filename],
         )
-        clip_paths.append(res.path)
-        # Use the thumbnail that was already created
-        if res.thumb:
-            prev_last_ref = image_from_file(res.thumb)
+        journal.record(filename, DONE, thumb=thumb.name if thumb else "", reused_from=str(clip_src))
+        print(
+            f"✔️ Shot {idx + 1}/{len(shots)} unchanged, reused {clip_src.parent.name}/{clip_src.name}"
+        )
+        return dest, thumb
+
+    def render_chain(chain: list[int]) -> list[tuple[pathlib.Path, pathlib.Path | None]]:
+        """Render one chain in order, feeding each carry shot its predecessor's last frame."""
+        prev_last_ref = None
+        outputs = []
+        for idx in chain:
+            if idx in reused:
+                path, thumb = reuse_shot(idx)
+                outputs.append((path, thumb))
+                prev_last_ref = image_from_file(thumb) if thumb else None
+                continue
+            shot = shots[idx]
+            prompt: str = shot["prompt"]
+            negative: str = shot.get("negative", "")
+            image_path = shot.get("image")
+            ref = prev_last_ref if carries_last_frame(shot) else None
+            if image_path:
+                ref = image_from_file(pathlib.Path(image_path))
+
+            print(f"🎬 Generating shot {idx + 1}/{len(shots)}: {prompt[:50]}...")
+            res = generate_video(
+                client,
+                prompt,
+                negative=negative,
+                image=ref,
+                script_name="storyboard",
+                sequence_num=idx + 1,
+                session_dir=session_dir,
+                model=picked_model,
+                journal=journal,
+                refresh=refresh,
+            )
+            outputs.append((res.path, res.thumb))
+            # Use the thumbnail that was already created
+            prev_last_ref = image_from_file(res.thumb) if res.thumb else None
+        return outputs
+
+    clips: dict[int, tuple[pathlib.Path, pathlib.Path | None]] = {}
+    failed = 0
+    with JobScheduler(concurrency, picked_model) as scheduler:
+        futures = [(chain, scheduler.submit(render_chain, chain)) for chain in chains]
+        for chain, future in futures:
+            try:
+                clips.update(zip(chain, future.result(), strict=True))
+            except Exception as e:
+                failed += 1
+                print(f"❌ Chain starting at shot {chain[0] + 1} failed: {e}")
+    clip_paths = [clips[idx][0] for idx in sorted(clips)]
+    write_manifest(session_dir, storyboard, picked_model, shots, manifest_fps, clips)
     print(f"rendered {len(clip_paths)} shots")
+    if failed:
+        print(f"⚠️ {failed} chain(s) failed; rerun with --resume {session_dir}")
+        raise typer.Exit(1)
     if concat_to:
         if not concat_to.is_absolute():
             concat_to = session_dir / concat_to.name
-        concat_videos_concat_demuxer(clip_paths, concat_to)
+        metrics = ClipMetrics(model=picked_model)
+        concat_videos_concat_demuxer(clip_paths, concat_to, metrics)
+        record_file_metrics(session_dir, concat_to.name, metrics)
         print(f"stitched -> {concat_to}")
 
 
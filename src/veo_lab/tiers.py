@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import importlib
+import json
+import pathlib
+from collections.abc import Callable
+
+from PIL import Image
+from PIL import ImageFilter
+from PIL import ImageStat
+
+from .common import OUT
+
+# Cheap exploration tier and the full-quality tier candidates are promoted to
+PREVIEW_MODEL = "veo-3.0-fast-generate-preview"
+FINAL_MODEL = "veo-3.0-generate-preview"
+
+# Where ab_viewer saves its 👍/👎 scores (kept here so scoring does not import streamlit)
+RATINGS = OUT / "ratings.json"
+
+Scorer = Callable[[pathlib.Path], float]
+
+
+def load_ratings(ratings_path: pathlib.Path = RATINGS) -> dict[str, float]:
+    """ab_viewer ratings keyed by clip file name (empty if nothing was rated yet)."""
+    if not ratings_path.exists():
+        return {}
+    return json.loads(ratings_path.read_text(encoding="utf-8"))
+
+
+def ratings_scorer(ratings_path: pathlib.Path = RATINGS) -> Scorer:
+    """Score clips by their ab_viewer rating (keyed by file name; unrated clips score 0)."""
+    ratings = load_ratings(ratings_path)
+    return lambda clip: float(ratings.get(clip.name, 0))
+
+
+def sharpness_score(clip: pathlib.Path) -> float:
+    """Edge energy of the clip's saved last frame; blurry or missing frames score 0."""
+    thumb = clip.with_suffix(".last.jpg")
+    if not thumb.exists():
+        return 0.0
+    with Image.open(thumb) as img:
+        edges = img.convert("L").filter(ImageFilter.FIND_EDGES)
+        return ImageStat.Stat(edges).var[0]
+
+
+def load_scorer(spec: str, ratings_path: pathlib.Path = RATINGS) -> Scorer:
+    """Resolve `ratings`, `sharpness` or a `package.module:function` taking a clip path."""
+    if spec == "ratings":
+        return ratings_scorer(ratings_path)
+    if spec == "sharpness":
+        return sharpness_score
+    module_name, sep, attr = spec.partition(":")
+    if not sep or not module_name or not attr:
+        raise ValueError(f"unknown scorer {spec!r} (use ratings, sharpness or module:function)")
+    scorer: Scorer | None = getattr(importlib.import_module(module_name), attr, None)
+    if not callable(scorer):
+        raise ValueError(f"scorer {spec!r} is not a callable")
+    return scorer
+
+
+def select_for_promotion(
+    clips: dict[str, pathlib.Path],
+    scorer: Scorer | None,
+    top_k: int = 0,
+    approved: set[str] | frozenset[str] = frozenset(),
+) -> list[tuple[str, float | None]]:
+    """Pick which preview clips to re-render on the final model.
+
+    Every `approved` id is promoted, plus the `top_k` best of the rest by `scorer`
+    (ties broken by id, so the choice is deterministic). Returns `(id, score)` pairs,
+    approved first, then by descending score; score is None for unscored picks.
+    """
+    picked: list[tuple[str, float | None]] = [(cid, None) for cid in clips if cid in approved]
+    if top_k > 0 and scorer is not None:
+        scored = [(cid, scorer(path)) for cid, path in clips.items() if cid not in approved]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        picked.extend(scored[:top_k])
+    return picked
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import pathlib
+import random
+import sys
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from datetime import datetime
+
+TRACE_DIR = pathlib.Path(__file__).resolve().parents[2] / "out" / "traces"
+
+# OTLP enum values
+_KIND_INTERNAL = 1
+_STATUS_ERROR = 2
+
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("veo_span", default=None)
+
+
+class Span:
+    """One timed operation; exported when `end` is called."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_ns",
+        "_start_mono",
+        "_exporter",
+        "_error",
+        "_token",
+    )
+
+    def __init__(self, exporter: JsonlExporter, name: str, parent: Span | None, attributes):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else ""
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self._start_mono = time.monotonic_ns()
+        self._exporter = exporter
+        self._error = ""
+
+    def set(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def fail(self, error: BaseException | str) -> None:
+        self._error = str(error) or type(error).__name__
+
+    def end(self) -> None:
+        end_ns = self.start_ns + (time.monotonic_ns() - self._start_mono)
+        self._exporter.export(self, end_ns)
+
+    # Context-manager use makes the span current for the block
+    def __enter__(self) -> Span:
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current.reset(self._token)
+        if exc is not None:
+            self.fail(exc)
+        self.end()
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is off, so call sites need no checks."""
+
+    def set(self, key: str, value) -> None:
+        pass
+
+    def fail(self, error) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# What `span` returns: a real span, or NOOP_SPAN while tracing is off
+AnySpan = Span | _NoopSpan
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class JsonlExporter:
+    """Append each finished span as one OTLP/JSON `ExportTraceServiceRequest` line.
+
+    This is the layout of the OpenTelemetry collector's file exporter, so the file
+    can be replayed into any OTLP backend or opened by trace viewers offline.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._resource = {
+            "attributes": [
+                _attribute("service.name", "vidgenlab"),
+                _attribute("process.pid", os.getpid()),
+                _attribute("process.command_line", " ".join(sys.argv)),
+            ]
+        }
+
+    def export(self, span: Span, end_ns: int) -> None:
+        record = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id,
+            "name": span.name,
+            "kind": _KIND_INTERNAL,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [_attribute(k, v) for k, v in span.attributes.items()],
+            "status": {"code": _STATUS_ERROR, "message": span._error} if span._error else {},
+        }
+        line = {
+            "resourceSpans": [
+                {
+                    "resource": self._resource,
+                    "scopeSpans": [{"scope": {"name": "vidgenlab"}, "spans": [record]}],
+                }
+            ]
+        }
+        data = json.dumps(line) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(data)
+
+
+_exporter: JsonlExporter | None = None
+_configured = False
+
+
+def configure(path: pathlib.Path | None) -> JsonlExporter | None:
+    """Send spans to `path` (None turns tracing off). Overrides VEO_TRACE."""
+    global _exporter, _configured
+    _exporter = JsonlExporter(path) if path else None
+    _configured = True
+    return _exporter
+
+
+def exporter() -> JsonlExporter | None:
+    """The active exporter, set up from VEO_TRACE on first use.
+
+    VEO_TRACE unset or 0 disables tracing; 1 writes to out/traces/<time>-<pid>.jsonl;
+    any other value is the output path.
+    """
+    if not _configured:
+        setting = os.environ.get("VEO_TRACE", "").strip()
+        if setting.lower() in {"", "0", "off", "false", "no"}:
+            configure(None)
+        elif setting.lower() in {"1", "on", "true", "yes"}:
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            configure(TRACE_DIR / f"{stamp}-{os.getpid()}.jsonl")
+        else:
+            configure(pathlib.Path(setting))
+    return _exporter
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def span(name: str, parent: Span | None = None, **attributes) -> AnySpan:
+    """A child of `parent` (default: the current span).
+
+    Use it as a context manager, or call `.end()` for work that finishes elsewhere
+    (e.g. on another thread). Returns `NOOP_SPAN` when tracing is off.
+    """
+    exp = exporter()
+    if exp is None:
+        return NOOP_SPAN
+    return Span(exp, name, parent if parent is not None else _current.get(), attributes)
+
+
+@contextlib.contextmanager
+def activate(active: AnySpan | None) -> Iterator[None]:
+    """Make `active` the current span for the block without ending it."""
+    if not isinstance(active, Span):
+        yield
+        return
+    token = _current.set(active)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def record_span(name: str, seconds: float, **attributes) -> None:
+    """Emit a child span of the current span that ended just now and lasted `seconds`."""
+    exp = exporter()
+    if exp is None:
+        return
+    entry = Span(exp, name, _current.get(), attributes)
+    entry.start_ns -= int(seconds * 1e9)
+    entry._start_mono -= int(seconds * 1e9)
+    entry.end()
+
+
+def bind(fn: Callable) -> Callable:
+    """Run `fn` in a copy of the caller's context, so pool threads see the current span."""
+    if exporter() is None:
+        return fn
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def traced(name: str) -> Callable:
+    """Decorator giving a CLI command a root span for its whole run."""
+
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
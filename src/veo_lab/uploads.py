@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import pathlib
+import threading
+from dataclasses import asdict
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+
+from google.genai import types
+
+UPLOADS_ROOT = pathlib.Path(__file__).resolve().parents[2] / "out" / "cache" / "uploads"
+
+# Files API uploads are deleted after 48 hours
+DEFAULT_TTL = timedelta(hours=48)
+# Stop handing out a handle this long before it expires, so a slow request can't outlive it
+EXPIRY_MARGIN = timedelta(minutes=30)
+# Requests are capped at 20 MB and inline bytes grow by a third in base64
+INLINE_LIMIT = 14 * 1024 * 1024
+
+
+def uploads_enabled() -> bool:
+    return os.environ.get("VEO_UPLOADS", "1").lower() not in {"0", "off", "false", "no"}
+
+
+def files_api_supported(client) -> bool:
+    """Whether `client` can upload through the Files API (Gemini Developer API only)."""
+    api_client = getattr(client, "_api_client", None)
+    return hasattr(client, "files") and not getattr(api_client, "vertexai", False)
+
+
+@dataclass(frozen=True)
+class UploadHandle:
+    name: str
+    uri: str
+    mime_type: str
+    expires: str  # ISO 8601, UTC
+
+    def usable(self, now: datetime | None = None) -> bool:
+        now = now or datetime.now(UTC)
+        return now + EXPIRY_MARGIN < datetime.fromisoformat(self.expires)
+
+
+class UploadCache:
+    """Files API handles of uploaded images, keyed by content hash.
+
+    Each unique image is uploaded once and its handle reused, across requests and
+    processes, until shortly before the upload expires. Handles are stored at
+    `<root>/<digest[:2]>/<digest>.json`, next to a `.seen` marker for images sent
+    inline once. Concurrent requests for the same image in one process share a
+    single upload.
+    """
+
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self._lock = threading.Lock()
+        self._inflight: dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, digest: str) -> pathlib.Path:
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def lookup(self, digest: str) -> UploadHandle | None:
+        """The stored handle for `digest` if it is still usable."""
+        path = self._path(digest)
+        try:
+            handle = UploadHandle(**json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+        return handle if handle.usable() else None
+
+    def store(self, digest: str, handle: UploadHandle) -> None:
+        path = self._path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(asdict(handle), indent=2), encoding="utf-8")
+        tmp.replace(path)
+
+    def first_sighting(self, digest: str) -> bool:
+        """True the first time `digest` is asked about (in any process), False after."""
+        path = self._path(digest).with_suffix(".seen")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            path.touch(exist_ok=False)
+        except FileExistsError:
+            return False
+        return True
+
+    def forget(self, digest: str) -> None:
+        """Drop a handle the API no longer accepts."""
+        self._path(digest).unlink(missing_ok=True)
+
+    def handle(self, client, data: bytes, mime_type: str) -> UploadHandle | None:
+        """A handle for `data`, uploading it first if needed; None if the upload fails."""
+        digest = self.digest(data)
+        with self._lock:
+            inflight = self._inflight.setdefault(digest, threading.Lock())
+        with inflight:
+            handle = self.lookup(digest)
+            if handle:
+                return handle
+            try:
+                file = client.files.upload(
+                    file=io.BytesIO(data),
+                    config=types.UploadFileConfig(
+                        mime_type=mime_type, display_name=f"ref-{digest[:16]}"
+                    ),
+                )
+            except Exception as e:
+                print(f"⚠️ Upload failed, sending the image inline: {e}")
+                return None
+            expires = file.expiration_time or datetime.now(UTC) + DEFAULT_TTL
+            handle = UploadHandle(
+                name=file.name or "",
+                uri=file.uri or "",
+                mime_type=file.mime_type or mime_type,
+                expires=expires.astimezone(UTC).isoformat(),
+            )
+            if not handle.uri:
+                return None
+            self.store(digest, handle)
+            return handle
+
+
+def default_upload_cache() -> UploadCache | None:
+    """The shared upload cache, or None when VEO_UPLOADS=0."""
+    return UploadCache(UPLOADS_ROOT) if uploads_enabled() else None
+
+
+def image_part(client, data: bytes, mime_type: str, cache: UploadCache | None = None) -> types.Part:
+    """A content part for an image: a Files API reference when it pays off, else inline bytes.
+
+    An image is sent inline the first time and uploaded once it comes back (or right
+    away if it is too large to send inline), so one-off images cost no extra round-trip.
+    """
+    cache = cache if cache is not None else default_upload_cache()
+    if cache is not None and files_api_supported(client):
+        digest = cache.digest(data)
+        reuse = cache.lookup(digest) is not None or not cache.first_sighting(digest)
+        handle = (
+            cache.handle(client, data, mime_type) if reuse or len(data) > INLINE_LIMIT else None
+        )
+        if handle:
+            return types.Part.from_uri(file_uri=handle.uri, mime_type=handle.mime_type)
+    return types.Part(inline_data=types.Blob(mime_type=mime_type, data=data))
@@ -28,3 +28,57 @@ def sample_metadata():
         "model": "test-model",
         "timestamp": "2025-01-18T10:30:00",
     }
+
+
+@pytest.fixture(autouse=True)
+def unlimited_rate_limiter(monkeypatch):
+    """Keep tests from pacing generate_video / generate_images calls against the real quotas."""
+    from veo_lab.common import ModelQuota
+    from veo_lab.common import RateLimiter
+
+    limiter = RateLimiter(default=ModelQuota(rpm=0, max_concurrent=8))
+    monkeypatch.setattr("veo_lab.common.RATE_LIMITER", limiter)
+    monkeypatch.setattr("imagen_lab.cache.IMAGEN_LIMITER", limiter)
+    return limiter
+
+
+@pytest.fixture(autouse=True)
+def no_quota_ledger(monkeypatch):
+    """Keep tests from sharing quota with real runs through out/quota.sqlite3."""
+    monkeypatch.setenv("VEO_QUOTA_LEDGER", "0")
+
+
+@pytest.fixture(autouse=True)
+def no_video_cache(monkeypatch):
+    """Keep tests from reading or populating the shared clip cache under out/."""
+    monkeypatch.setenv("VEO_CACHE", "0")
+
+
+@pytest.fixture(autouse=True)
+def no_image_cache(monkeypatch):
+    """Keep tests from reading or populating the shared Imagen cache under out/."""
+    monkeypatch.setenv("IMAGEN_CACHE", "0")
+
+
+@pytest.fixture(autouse=True)
+def no_tracing():
+    """Keep tests from writing trace files, whatever VEO_TRACE is set to."""
+    from veo_lab import tracing
+
+    tracing.configure(None)
+    yield
+    tracing.configure(None)
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    """Keep retry backoff short and start every test with closed circuit breakers."""
+    monkeypatch.setenv("VEO_RETRY_BASE", "0.01")
+    monkeypatch.setenv("VEO_RETRY_CAP", "0.05")
+    monkeypatch.setattr("veo_lab.resilience._breakers", {})
+
+
+@pytest.fixture(autouse=True)
+def no_upload_cache(monkeypatch):
+    """Keep tests from uploading images or reusing handles stored under out/."""
+    monkeypatch.setenv("VEO_UPLOADS", "0")
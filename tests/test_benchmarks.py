@@ -0,0 +1,54 @@
+"""Tests for the benchmark runner's scenarios and result diffing."""
+
+import json
+
+from benchmarks.run import compare
+from benchmarks.scenarios import run_benchmark
+from benchmarks.scenarios import throughput
+
+
+class TestScenarios:
+    """Test the scenarios that need no ffmpeg on small workloads."""
+
+    def test_cpu_scenarios(self, temp_dir):
+        """Test that metadata and expansion benchmarks report their metrics."""
+        saved = run_benchmark("save_session_metadata", temp_dir / "meta", quick=True)
+        assert saved["calls"] == 50 and saved["ms_per_call"] > 0
+        expanded = run_benchmark("matrix_expansion", temp_dir / "matrix", quick=True)
+        assert expanded["combinations"] == 4**5 * 2
+        assert expanded["peak_rss_mb"] > 0
+
+    def test_throughput_counts_rendered_jobs(self, temp_dir):
+        """Test that jobs/min and latency come from rendered files, not concat records."""
+        session = temp_dir / "session"
+        session.mkdir()
+        metrics = {
+            f"{i}.mp4": {"stages": {"slot_wait": 0.5, "render": float(i), "download": 0.5}}
+            for i in range(1, 5)
+        }
+        metrics["joined.mp4"] = {"stages": {"concat": 3.0}}
+        (session / "metadata.json").write_text(json.dumps({"metrics": metrics}))
+
+        result = throughput(temp_dir, seconds=30)
+        assert result["jobs"] == 4
+        assert result["jobs_per_min"] == 8
+        assert result["p95_job_latency_s"] == 5
+
+
+class TestCompare:
+    """Test regression detection between two result files."""
+
+    def test_direction_and_threshold(self):
+        """Test that lower throughput and higher latency regress; sizes are ignored."""
+        base = {"results": {"m": {"jobs": 10, "jobs_per_min": 100, "p95_job_latency_s": 2.0}}}
+        head = {"results": {"m": {"jobs": 20, "jobs_per_min": 80, "p95_job_latency_s": 2.1}}}
+        rows = {row["metric"]: row for row in compare(base, head, threshold=0.1)}
+        assert set(rows) == {"jobs_per_min", "p95_job_latency_s"}
+        assert rows["jobs_per_min"]["regressed"] is True
+        assert rows["p95_job_latency_s"]["regressed"] is False
+
+    def test_skipped_and_new_benchmarks(self):
+        """Test that skipped or new benchmarks produce no rows."""
+        base = {"results": {"concat": {"skipped": "ffmpeg not installed"}}}
+        head = {"results": {"concat": {"ffmpeg_ms_per_clip": 40.0}, "new": {"x": 1.0}}}
+        assert compare(base, head) == []
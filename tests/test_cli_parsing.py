@@ -1,5 +1,6 @@
 """Tests for CLI argument parsing and validation."""
 
+import json
 from pathlib import Path
 from unittest.mock import Mock
 from unittest.mock import patch
@@ -178,6 +179,83 @@ class TestImagenLabCLI:
         mock_create_client.assert_called_once()
         mock_client.models.generate_content.assert_called_once()
 
+    def test_batch_dry_run_lists_prompt_folders(self, temp_dir):
+        """Test batch --dry lists one folder per prompt without calling the API."""
+        (temp_dir / "witch.txt").write_text("cyber witch")
+        (temp_dir / "monk.txt").write_text("digital monk")
+
+        runner = CliRunner()
+        result = runner.invoke(
+            imagen_app, ["batch", str(temp_dir), "--dry", "-n", "2", "-o", str(temp_dir / "o")]
+        )
+
+        assert result.exit_code == 0
+        assert "Batch: 2 prompts x 2 images" in result.output
+        assert "witch/: cyber witch" in result.output
+        assert not (temp_dir / "o").exists()
+
+    @patch("imagen_lab.cli.create_client")
+    def test_batch_writes_per_prompt_folders(self, mock_create_client, temp_dir):
+        """Test batch generates every prompt into its own folder and reports failures."""
+        prompts = temp_dir / "prompts"
+        prompts.mkdir()
+        (prompts / "witch.txt").write_text("cyber witch")
+        (prompts / "monk.txt").write_text("digital monk")
+
+        def generate_images(model, prompt, config):
+            if prompt == "digital monk":
+                raise RuntimeError("blocked")
+            image = Mock()
+            image.image.image_bytes = b"jpg"
+            return Mock(generated_images=[image, image])
+
+        mock_client = Mock()
+        mock_client.models.generate_images.side_effect = generate_images
+        mock_create_client.return_value = mock_client
+
+        runner = CliRunner()
+        out = temp_dir / "out"
+        result = runner.invoke(imagen_app, ["batch", str(prompts), "-n", "2", "-o", str(out)])
+
+        assert result.exit_code == 1
+        assert (out / "witch" / "cyber_witch_1.jpg").exists()
+        assert (out / "witch" / "cyber_witch_2.jpg").exists()
+        summary = json.loads((out / "batch_results.json").read_text())
+        assert list(summary["images"]) == ["witch"]
+        assert summary["failed"] == {"monk": "blocked"}
+
+    @patch("imagen_lab.cli.create_client")
+    def test_analyze_dir_streams_jsonl_and_memoizes(
+        self, mock_create_client, temp_dir, monkeypatch
+    ):
+        """Test analyze-dir writes one line per image and reuses unchanged analyses."""
+        monkeypatch.setenv("IMAGEN_CACHE", "1")
+        monkeypatch.setattr("imagen_lab.cache.ANALYSIS_CACHE_ROOT", temp_dir / "cache")
+        images = temp_dir / "refs"
+        images.mkdir()
+        (images / "a.png").write_bytes(b"png-bytes")
+        (images / "b.jpg").write_bytes(b"jpg-bytes")
+        (images / "notes.txt").write_text("ignored")
+
+        mock_client = Mock()
+        mock_client.models.generate_content.return_value = Mock(text="a described prompt")
+        mock_create_client.return_value = mock_client
+
+        runner = CliRunner()
+        out = temp_dir / "analysis.jsonl"
+        args = ["analyze-dir", str(images), "-o", str(out), "--max-edge", "0"]
+        first = runner.invoke(imagen_app, args)
+        second = runner.invoke(imagen_app, args)
+
+        assert first.exit_code == 0
+        assert second.exit_code == 0
+        assert mock_client.models.generate_content.call_count == 2  # first run only
+        records = {r["image"]: r for r in map(json.loads, out.read_text().splitlines())}
+        assert set(records) == {str(images / "a.png"), str(images / "b.jpg")}
+        assert all(r["cached"] for r in records.values())
+        assert records[str(images / "a.png")]["mime_type"] == "image/png"
+        assert records[str(images / "a.png")]["prompt"] == "a described prompt"
+
 
 class TestCLIValidation:
     """Test CLI input validation and edge cases."""
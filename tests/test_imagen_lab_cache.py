@@ -0,0 +1,131 @@
+"""Tests for the shared Imagen result cache."""
+
+from concurrent.futures import Future
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from imagen_lab.cache import ImageCache
+from imagen_lab.cache import generate_images_cached
+
+
+def _image_response(*payloads: bytes) -> Mock:
+    images = []
+    for data in payloads:
+        generated = Mock()
+        generated.image.image_bytes = data
+        images.append(generated)
+    return Mock(generated_images=images)
+
+
+def _first_image(response):
+    assert response.generated_images
+    image = response.generated_images[0].image
+    assert image is not None
+    return image.image_bytes
+
+
+class TestImageCache:
+    """Test the on-disk image store."""
+
+    def test_key_depends_on_model_prompt_and_count(self):
+        """Test that every input changes the key."""
+        base = ImageCache.key("imagen-x", "witch")
+        assert base == ImageCache.key("imagen-x", "witch", 1)
+        assert base != ImageCache.key("imagen-y", "witch")
+        assert base != ImageCache.key("imagen-x", "monk")
+        assert base != ImageCache.key("imagen-x", "witch", 2)
+
+    def test_store_and_load_round_trip(self, temp_dir):
+        """Test that stored bytes and metadata come back."""
+        cache = ImageCache(temp_dir)
+        cache.store("ab" * 32, [b"one", b"two"], model="imagen-x")
+
+        loaded = cache.load("ab" * 32)
+        assert loaded is not None
+        images, meta = loaded
+        assert images == [b"one", b"two"]
+        assert meta["model"] == "imagen-x"
+        assert meta["images"] == 2
+
+    def test_missing_image_file_is_a_miss(self, temp_dir):
+        """Test that a partially deleted entry is not served."""
+        cache = ImageCache(temp_dir)
+        cache.store("cd" * 32, [b"one", b"two"])
+        (temp_dir / "cd" / f"{'cd' * 32}_2.jpg").unlink()
+
+        assert cache.load("cd" * 32) is None
+
+
+class TestGenerateImagesCached:
+    """Test cache-aware image generation."""
+
+    def test_repeat_request_skips_api(self, temp_dir):
+        """Test that the second identical request is served from disk."""
+        cache = ImageCache(temp_dir)
+        client = Mock()
+        client.models.generate_images.return_value = _image_response(b"jpg")
+
+        generate_images_cached(client, "imagen-x", "witch", cache=cache)
+        second = generate_images_cached(client, "imagen-x", "witch", cache=cache)
+
+        assert client.models.generate_images.call_count == 1
+        assert _first_image(second) == b"jpg"
+
+    def test_refresh_regenerates_and_replaces(self, temp_dir):
+        """Test that refresh calls the API and updates the entry."""
+        cache = ImageCache(temp_dir)
+        client = Mock()
+        client.models.generate_images.side_effect = [
+            _image_response(b"old"),
+            _image_response(b"new"),
+        ]
+
+        generate_images_cached(client, "imagen-x", "witch", cache=cache)
+        generate_images_cached(client, "imagen-x", "witch", cache=cache, refresh=True)
+        third = generate_images_cached(client, "imagen-x", "witch", cache=cache)
+
+        assert client.models.generate_images.call_count == 2
+        assert _first_image(third) == b"new"
+
+    def test_character_pack_rerun_skips_imagen(self, temp_dir, monkeypatch):
+        """Test that rerunning a character pack reuses its cached reference images."""
+        from veo_lab.character_pack import run as character_pack_run
+
+        monkeypatch.setattr("imagen_lab.cache.CACHE_ROOT", temp_dir / "cache")
+        monkeypatch.setenv("IMAGEN_CACHE", "1")
+        prompts = temp_dir / "prompts.txt"
+        prompts.write_text("cyber witch\ndigital monk\n")
+        client = Mock()
+        client.models.generate_images.side_effect = lambda model, prompt, config: _image_response(
+            prompt.encode()
+        )
+
+        with (
+            patch("veo_lab.character_pack.create_client", return_value=client),
+            patch("veo_lab.character_pack.JobScheduler.submit_video") as mock_submit_video,
+        ):
+            done = Future()
+            done.set_result(Mock(candidates=[temp_dir / "clip.mp4"]))
+            mock_submit_video.return_value = done
+            for _ in range(2):
+                character_pack_run(
+                    scene_prompt="test scene",
+                    ref_dir=None,
+                    imagen_prompts_file=prompts,
+                    imagen_model="imagen-x",
+                    k=2,
+                    output=temp_dir,
+                    model="veo-2.0-generate-001",
+                    dry=False,
+                    concurrency=2,
+                    resume=None,
+                    refresh=False,
+                    candidates=1,
+                )
+
+        assert client.models.generate_images.call_count == 2  # first run only
+        assert {c.kwargs["model"] for c in client.models.generate_images.call_args_list} == {
+            "imagen-x"
+        }
+        refs = [c.kwargs["image"].image_bytes for c in mock_submit_video.call_args_list]
+        assert sorted(refs) == sorted([b"cyber witch", b"digital monk"] * 2)
@@ -1,12 +1,18 @@
 """Tests for imagen_lab.common utility functions."""
 
 import json
+from pathlib import Path
 from unittest.mock import Mock
 
 import pytest
 
 from imagen_lab.common import create_output_path
+from imagen_lab.common import generate_images_to
+from imagen_lab.common import image_mime_type
+from imagen_lab.common import load_batch_prompts
+from imagen_lab.common import prepare_image
 from imagen_lab.common import save_generated_image
+from imagen_lab.common import save_generated_images
 from imagen_lab.common import save_metadata
 from imagen_lab.common import save_prompt_file
 
@@ -177,3 +183,107 @@ class TestModelManagement:
         with patch.dict("os.environ", {"IMAGEN_MODEL": "imagen-3.0-fast-generate-001"}):
             result = list_models()
             assert result["default"] == "imagen-3.0-fast-generate-001"
+
+
+def _image_response(count: int) -> Mock:
+    images = []
+    for i in range(count):
+        generated = Mock()
+        generated.image.image_bytes = f"image{i}".encode()
+        images.append(generated)
+    response = Mock()
+    response.generated_images = images
+    return response
+
+
+class TestBatchGeneration:
+    """Test multi-image saving and batch prompt loading."""
+
+    def test_save_generated_images_keeps_every_image(self, temp_dir):
+        """Test that all images in a response are written with indexed names."""
+        paths = save_generated_images(_image_response(3), temp_dir, "witch")
+
+        assert [p.name for p in paths] == ["witch_1.jpg", "witch_2.jpg", "witch_3.jpg"]
+        assert paths[2].read_bytes() == b"image2"
+
+    def test_save_generated_images_single_image_unindexed(self, temp_dir):
+        """Test that a single image keeps the plain filename."""
+        paths = save_generated_images(_image_response(1), temp_dir, "witch")
+        assert [p.name for p in paths] == ["witch.jpg"]
+
+    def test_generate_images_to_requests_count_in_one_call(self, temp_dir):
+        """Test that several images are requested in a single call and recorded."""
+        client = Mock()
+        client.models.generate_images.return_value = _image_response(2)
+
+        paths = generate_images_to(client, "a cyber witch", temp_dir / "witch", "imagen-x", 2)
+
+        assert client.models.generate_images.call_count == 1
+        assert client.models.generate_images.call_args[1]["config"].number_of_images == 2
+        metadata = json.loads((temp_dir / "witch" / "metadata.json").read_text())
+        assert metadata["images"] == [p.name for p in paths]
+        assert (temp_dir / "witch" / "prompt.txt").read_text() == "a cyber witch"
+
+    def test_load_batch_prompts_from_directory(self, temp_dir):
+        """Test that each *.txt file in a directory is one named prompt."""
+        (temp_dir / "b_monk.txt").write_text("digital monk\n")
+        (temp_dir / "a_witch.txt").write_text("cyber witch")
+        (temp_dir / "empty.txt").write_text("  ")
+        (temp_dir / "notes.md").write_text("ignored")
+
+        assert load_batch_prompts(temp_dir) == [
+            ("a_witch", "cyber witch"),
+            ("b_monk", "digital monk"),
+        ]
+
+    def test_load_batch_prompts_from_file(self, temp_dir):
+        """Test that each non-empty line of a file is one prompt."""
+        prompts_file = temp_dir / "prompts.txt"
+        prompts_file.write_text("cyber witch\n\ndigital monk\n")
+
+        assert load_batch_prompts(prompts_file) == [
+            ("001_cyber_witch", "cyber witch"),
+            ("002_digital_monk", "digital monk"),
+        ]
+
+
+class TestImagePreparation:
+    """Test MIME detection and downscaling before upload."""
+
+    @staticmethod
+    def _png(size, mode="RGB") -> bytes:
+        import io
+
+        from PIL import Image
+
+        buf = io.BytesIO()
+        Image.new(mode, size).save(buf, format="PNG")
+        return buf.getvalue()
+
+    def test_image_mime_type_by_extension(self):
+        """Test that PNGs are no longer sent as JPEG."""
+        assert image_mime_type(Path("a.PNG")) == "image/png"
+        assert image_mime_type(Path("a.jpeg")) == "image/jpeg"
+        assert image_mime_type(Path("a.webp")) == "image/webp"
+
+    def test_prepare_image_downscales_to_max_edge(self):
+        """Test that large images are shrunk and re-encoded as JPEG."""
+        import io
+
+        from PIL import Image
+
+        data, mime = prepare_image(self._png((2000, 1000)), "image/png", max_edge=500)
+
+        assert mime == "image/jpeg"
+        assert Image.open(io.BytesIO(data)).size == (500, 250)
+
+    def test_prepare_image_keeps_alpha_as_png(self):
+        """Test that transparent images stay PNG."""
+        _, mime = prepare_image(self._png((800, 800), "RGBA"), "image/png", max_edge=100)
+        assert mime == "image/png"
+
+    def test_prepare_image_small_or_disabled_unchanged(self):
+        """Test that images within bounds, or max_edge=0, pass through untouched."""
+        original = self._png((100, 50))
+        assert prepare_image(original, "image/png", max_edge=500) == (original, "image/png")
+        assert prepare_image(original, "image/png", max_edge=0) == (original, "image/png")
@@ -1,7 +1,9 @@
 """Integration tests using mocks instead of real API calls."""
 
 import json
+from concurrent.futures import Future
 from pathlib import Path
+from unittest.mock import ANY
 from unittest.mock import Mock
 from unittest.mock import patch
 
@@ -60,7 +62,7 @@ class TestVideoGenerationMocks:
 
         # Verify API calls
         mock_client.models.generate_videos.assert_called_once()
-        mock_wait_op.assert_called_once_with(mock_client, mock_operation)
+        mock_wait_op.assert_called_once_with(mock_client, mock_operation, model=ANY, metrics=ANY)
         mock_save_video.assert_called_once()
         mock_extract_frame.assert_called_once()
 
@@ -166,6 +168,39 @@ class TestVideoGenerationMocks:
             assert result.thumb is None  # Should be None when extraction fails
 
 
+class TestStageMetrics:
+    """Test per-stage metrics recorded in session metadata."""
+
+    @patch("veo_lab.common.extract_last_frame")
+    @patch("veo_lab.common.save_generated_video")
+    @patch("veo_lab.common.wait_for_video_operation")
+    def test_generate_video_records_stage_metrics(
+        self, mock_wait_op, mock_save_video, mock_extract, temp_dir
+    ):
+        """Test that metadata.json gets timings, bytes and poller counters per file."""
+
+        def fake_wait(client, op, *, model, metrics):
+            metrics.add("render", 42.0)
+            metrics.polls += 3
+            return op
+
+        mock_wait_op.side_effect = fake_wait
+        mock_save_video.side_effect = lambda client, op, dest: dest.write_bytes(b"x" * 1000)
+
+        result = generate_video(
+            Mock(), "metrics prompt", model="veo-x", script_name="test", session_dir=temp_dir
+        )
+
+        metadata = json.loads((temp_dir / "metadata.json").read_text())
+        record = metadata["metrics"][result.path.name]
+        assert record["model"] == "veo-x"
+        assert record["stages"]["render"] == 42.0
+        assert {"slot_wait", "submit", "download", "last_frame"} <= set(record["stages"])
+        assert record["polls"] == 3
+        assert record["bytes_downloaded"] == 1000
+        assert metadata["files"] == [result.path.name]
+
+
 class TestWorkflowIntegration:
     """Test complete workflow integration with mocks."""
 
@@ -181,7 +216,7 @@ class TestWorkflowIntegration:
 
         with (
             patch("veo_lab.character_pack.create_client") as mock_create_client,
-            patch("veo_lab.character_pack.generate_video") as mock_generate_video,
+            patch("veo_lab.character_pack.JobScheduler.submit_video") as mock_submit_video,
             patch("veo_lab.character_pack.image_from_file") as mock_image_from_file,
         ):
             mock_client = Mock()
@@ -193,26 +228,37 @@ class TestWorkflowIntegration:
             # Mock video generation
             mock_result1 = Mock()
             mock_result1.path = temp_dir / "video1.mp4"
+            mock_result1.candidates = [mock_result1.path]
             mock_result2 = Mock()
             mock_result2.path = temp_dir / "video2.mp4"
-            mock_generate_video.side_effect = [mock_result1, mock_result2]
+            mock_result2.candidates = [mock_result2.path]
+            futures = [Future(), Future()]
+            futures[0].set_result(mock_result1)
+            futures[1].set_result(mock_result2)
+            mock_submit_video.side_effect = futures
 
             # Execute character pack
             character_pack_run(
                 scene_prompt="test scene",
                 ref_dir=ref_dir,
+                imagen_prompts_file=None,
+                imagen_model=None,
                 k=2,
                 output=temp_dir,
                 model="veo-2.0-generate-001",
                 dry=False,
+                concurrency=2,
+                resume=None,
+                refresh=False,
+                candidates=1,
             )
 
             # Verify workflow
             assert mock_image_from_file.call_count == 2
-            assert mock_generate_video.call_count == 2
+            assert mock_submit_video.call_count == 2
 
-            # Verify generate_video was called with correct parameters
-            for call in mock_generate_video.call_args_list:
+            # Verify submit_video was called with correct parameters
+            for call in mock_submit_video.call_args_list:
                 assert call[0][1] == "test scene"  # scene prompt
                 assert "image" in call[1]  # reference image passed
 
@@ -259,6 +305,8 @@ prompts:
                 concat=None,
                 model="veo-2.0-generate-001",
                 dry=False,
+                resume=None,
+                refresh=False,
             )
 
             # Verify workflow
@@ -314,3 +362,166 @@ negative: ["blurry", "low quality"]
         assert config["matrix"]["subject"] == ["witch", "monk"]
         assert config["matrix"]["style"] == ["cyberpunk", "medieval"]
         assert config["negative"] == ["blurry", "low quality"]
+
+
+class TestPipelinedScheduling:
+    """Test that downloads and post-processing overlap with generation."""
+
+    def test_submit_video_overlaps_download_with_next_submit(self, temp_dir):
+        """Test that the render worker submits the next job while downloads run."""
+        import threading
+        from types import SimpleNamespace
+
+        from veo_lab.common import JobScheduler
+
+        mock_client = Mock()
+        submitted = []
+        second_submitted = threading.Event()
+
+        def submit(**kwargs):
+            submitted.append(kwargs["prompt"])
+            if len(submitted) == 2:
+                second_submitted.set()
+            return SimpleNamespace(name="op", done=True)
+
+        mock_client.models.generate_videos.side_effect = submit
+        download_threads = set()
+        overlapped = []
+
+        def blocking_save(client, op, dest_path):
+            # Only returns promptly if the render worker moved on while this download runs
+            download_threads.add(threading.current_thread().name)
+            overlapped.append(second_submitted.wait(5))
+            dest_path.write_bytes(b"mp4")
+            return dest_path
+
+        with (
+            patch("veo_lab.common.wait_for_video_operation", side_effect=lambda c, op, **kw: op),
+            patch("veo_lab.common.save_generated_video", side_effect=blocking_save),
+            patch("veo_lab.common.extract_last_frame", side_effect=Exception("no ffmpeg")),
+            JobScheduler(max_workers=1, post_workers=4) as scheduler,
+        ):
+            futures = [
+                scheduler.submit_video(
+                    mock_client, f"prompt {i}", session_dir=temp_dir, sequence_num=i
+                )
+                for i in range(4)
+            ]
+            results = [f.result(timeout=30) for f in futures]
+
+        assert [r.path.name for r in results] == [f"{i:02d}_prompt_{i}.mp4" for i in range(4)]
+        assert overlapped == [True] * 4
+        assert all(name.startswith("veo-post") for name in download_threads)
+
+    def test_submit_video_propagates_render_errors(self, temp_dir):
+        """Test that failures in the render stage reach the returned future."""
+        import pytest
+
+        from veo_lab.common import JobScheduler
+
+        mock_client = Mock()
+        mock_client.models.generate_videos.side_effect = RuntimeError("quota")
+        with JobScheduler(max_workers=1) as scheduler:
+            future = scheduler.submit_video(mock_client, "prompt", session_dir=temp_dir)
+            with pytest.raises(RuntimeError, match="quota"):
+                future.result(timeout=5)
+
+
+class TestVideoCandidates:
+    """Test requesting several candidates per Veo call."""
+
+    @staticmethod
+    def _operation(count: int):
+        from types import SimpleNamespace
+
+        videos = []
+        for i in range(count):
+            video = Mock()
+            video.save.side_effect = lambda path, i=i: Path(path).write_bytes(f"clip{i}".encode())
+            videos.append(SimpleNamespace(video=video))
+        return SimpleNamespace(
+            name="operations/1", done=True, response=SimpleNamespace(generated_videos=videos)
+        )
+
+    @patch("veo_lab.common.extract_last_frame", side_effect=Exception("no ffmpeg"))
+    @patch("veo_lab.common.wait_for_video_operation")
+    def test_all_candidates_saved_with_indexed_names(self, mock_wait, _mock_extract, temp_dir):
+        """Test that every returned video is saved and requested in one call."""
+        mock_client = Mock()
+        op = self._operation(3)
+        mock_client.models.generate_videos.return_value = op
+        mock_wait.return_value = op
+
+        result = generate_video(
+            mock_client, "a cat", session_dir=temp_dir, sequence_num=1, candidates=3
+        )
+
+        assert mock_client.models.generate_videos.call_count == 1
+        config = mock_client.models.generate_videos.call_args[1]["config"]
+        assert config.number_of_videos == 3
+        assert [p.name for p in result.candidates] == [
+            "01_a_cat_c1.mp4",
+            "01_a_cat_c2.mp4",
+            "01_a_cat_c3.mp4",
+        ]
+        assert result.path == result.candidates[0]
+        assert [p.read_bytes() for p in result.candidates] == [b"clip0", b"clip1", b"clip2"]
+
+    @patch("veo_lab.common.extract_last_frame", side_effect=Exception("no ffmpeg"))
+    @patch("veo_lab.common.wait_for_video_operation")
+    def test_fewer_videos_than_requested(self, mock_wait, _mock_extract, temp_dir):
+        """Test that only the videos the service returned are saved."""
+        mock_client = Mock()
+        op = self._operation(2)
+        mock_client.models.generate_videos.return_value = op
+        mock_wait.return_value = op
+
+        result = generate_video(mock_client, "a cat", session_dir=temp_dir, candidates=4)
+
+        assert [p.name for p in result.candidates] == ["a_cat_c1.mp4", "a_cat_c2.mp4"]
+        assert not (temp_dir / "a_cat_c3.mp4").exists()
+
+    @patch("veo_lab.common.extract_last_frame", side_effect=Exception("no ffmpeg"))
+    @patch("veo_lab.common.wait_for_video_operation")
+    def test_metrics_recorded_once_per_operation(self, mock_wait, _mock_extract, temp_dir):
+        """Test that a multi-candidate operation counts once in veo_lab.stats."""
+        from veo_lab.stats import collect_metrics
+        from veo_lab.stats import summarize
+
+        mock_client = Mock()
+        op = self._operation(2)
+        mock_client.models.generate_videos.return_value = op
+        mock_wait.return_value = op
+
+        generate_video(mock_client, "a cat", session_dir=temp_dir, candidates=2)
+
+        metadata = json.loads((temp_dir / "metadata.json").read_text())
+        (record,) = metadata["metrics"].values()
+        assert record["files"] == ["a_cat_c1.mp4", "a_cat_c2.mp4"]
+        (stages,) = summarize(collect_metrics(temp_dir)).values()
+        assert stages["download"]["n"] == 1
+        assert {row["n"] for row in stages.values()} == {1}
+
+    @patch("veo_lab.common.extract_last_frame", side_effect=Exception("no ffmpeg"))
+    @patch("veo_lab.common.wait_for_video_operation")
+    def test_candidates_restored_from_cache(self, mock_wait, _mock_extract, temp_dir):
+        """Test that a cached multi-candidate render restores every candidate."""
+        from veo_lab.cache import VideoCache
+
+        cache = VideoCache(temp_dir / "cache")
+        mock_client = Mock()
+        op = self._operation(2)
+        mock_client.models.generate_videos.return_value = op
+        mock_wait.return_value = op
+        (temp_dir / "s1").mkdir()
+        (temp_dir / "s2").mkdir()
+
+        generate_video(mock_client, "a cat", session_dir=temp_dir / "s1", cache=cache, candidates=2)
+        second = generate_video(
+            mock_client, "a cat", session_dir=temp_dir / "s2", cache=cache, candidates=2
+        )
+        single = generate_video(mock_client, "a cat", session_dir=temp_dir / "s2", cache=cache)
+
+        assert mock_client.models.generate_videos.call_count == 2  # single is a new key
+        assert [p.read_bytes() for p in second.candidates] == [b"clip0", b"clip1"]
+        assert single.candidates == [temp_dir / "s2" / "a_cat.mp4"]
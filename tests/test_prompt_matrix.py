@@ -1,14 +1,32 @@
 """Tests for veo_lab.prompt_matrix utility functions."""
 
 import itertools
+import json
 import tempfile
+import types
+from concurrent.futures import Future
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 import yaml
 from jinja2 import Template
-
+from typer.testing import CliRunner
+
+from veo_lab.prompt_matrix import RESULTS_LOG
+from veo_lab.prompt_matrix import MatrixResults
+from veo_lab.prompt_matrix import app
+from veo_lab.prompt_matrix import combo_id
+from veo_lab.prompt_matrix import in_shard
+from veo_lab.prompt_matrix import iter_combinations
+from veo_lab.prompt_matrix import iter_prompts
 from veo_lab.prompt_matrix import load_config
+from veo_lab.prompt_matrix import load_results
+from veo_lab.prompt_matrix import load_template
+from veo_lab.prompt_matrix import matrix_size
+from veo_lab.prompt_matrix import merge_results
+from veo_lab.prompt_matrix import parse_shard
+from veo_lab.tiers import FINAL_MODEL
 
 
 class TestLoadConfig:
@@ -307,3 +325,362 @@ class TestConfigValidation:
         finally:
             if config_file.exists():
                 config_file.unlink()
+
+
+class TestLazyExpansion:
+    """Test streaming matrix expansion through a compiled template."""
+
+    @staticmethod
+    def _big_config() -> dict:
+        return {"matrix": {f"dim{d}": [f"v{i}" for i in range(8)] for d in range(6)}}
+
+    def test_matrix_size_without_expanding(self):
+        """Test that totals come from dimension sizes and negatives."""
+        cfg = self._big_config()
+        assert matrix_size(cfg) == 8**6
+        cfg["negative"] = ["a", "b"]
+        assert matrix_size(cfg) == 2 * 8**6
+
+    def test_iter_combinations_is_lazy(self):
+        """Test that the first combination is available without materializing 262k."""
+        combos = iter_combinations(self._big_config())
+        assert isinstance(combos, types.GeneratorType)
+        assert next(combos) == {f"dim{d}": "v0" for d in range(6)}
+
+    def test_template_extends_base_template(self, temp_dir):
+        """Test that a template can extend examples/base_template.j2."""
+        child = temp_dir / "child.j2"
+        child.write_text('{% extends "base_template.j2" %}', encoding="utf-8")
+        values = ["subject", "action", "style", "camera", "ambience", "audio"]
+        cfg = {"matrix": {k: [k.upper()] for k in values}}
+
+        [(vars_, prompt)] = list(iter_prompts(load_template(child), cfg))
+
+        assert vars_["subject"] == "SUBJECT"
+        assert prompt.startswith("Subject: SUBJECT\nAction: ACTION")
+
+    def test_template_include_from_same_directory(self, temp_dir):
+        """Test that includes resolve relative to the template's directory."""
+        (temp_dir / "style.j2").write_text("in {{ style }} style", encoding="utf-8")
+        main = temp_dir / "main.j2"
+        main.write_text('{{ subject }} {% include "style.j2" %}', encoding="utf-8")
+        cfg = {"matrix": {"subject": ["witch", "monk"], "style": ["noir"]}}
+
+        prompts = [p for _, p in iter_prompts(load_template(main), cfg)]
+
+        assert prompts == ["witch in noir style", "monk in noir style"]
+
+    @patch("veo_lab.prompt_matrix.create_client", side_effect=AssertionError("client built"))
+    def test_dry_run_never_creates_client(self, _mock_client, temp_dir):
+        """Test that --dry renders prompts without constructing a client."""
+        config = temp_dir / "m.yml"
+        config.write_text(yaml.dump({"matrix": {"subject": ["a", "b"]}}), encoding="utf-8")
+        template = temp_dir / "t.j2"
+        template.write_text("Subject: {{ subject }}", encoding="utf-8")
+
+        result = CliRunner().invoke(app, ["run", "-c", str(config), "-t", str(template), "--dry"])
+
+        assert result.exit_code == 0
+        assert "Combination 2/2: Subject: b" in result.output
+
+    @patch("veo_lab.prompt_matrix.load_template", side_effect=AssertionError("rendered"))
+    @patch("veo_lab.prompt_matrix.create_client", side_effect=AssertionError("client built"))
+    def test_count_reports_totals_without_rendering(self, _mock_client, _mock_tpl, temp_dir):
+        """Test that --dry --count only reports the matrix size."""
+        config = temp_dir / "m.yml"
+        config.write_text(yaml.dump(self._big_config()), encoding="utf-8")
+
+        result = CliRunner().invoke(
+            app, ["run", "-c", str(config), "-t", str(temp_dir / "t.j2"), "--dry", "--count"]
+        )
+
+        assert result.exit_code == 0
+        assert "262144 combinations" in result.output
+
+
+class TestSharding:
+    """Test deterministic sharding and merging of shard results."""
+
+    def _matrix(self, temp_dir):
+        config = temp_dir / "m.yml"
+        config.write_text(
+            yaml.dump(
+                {
+                    "matrix": {"subject": ["a", "b", "c", "d"], "style": ["x", "y"]},
+                    "negative": ["n"],
+                }
+            ),
+            encoding="utf-8",
+        )
+        template = temp_dir / "t.j2"
+        template.write_text("{{ subject }} in {{ style }}", encoding="utf-8")
+        return config, template
+
+    def test_parse_shard(self):
+        """Test the i/n syntax and its bounds."""
+        assert parse_shard("2/3") == (2, 3)
+        for bad in ["0/3", "4/3", "1", "a/b"]:
+            with pytest.raises(ValueError):
+                parse_shard(bad)
+
+    def test_shards_partition_combinations(self):
+        """Test that every combination lands in exactly one shard."""
+        ids = [combo_id(f"prompt {i}", "neg") for i in range(50)]
+        for cid in ids:
+            assert sum(in_shard(cid, (i, 3)) for i in range(1, 4)) == 1
+
+    def test_dry_shards_cover_matrix_once(self, temp_dir):
+        """Test that the shards of a dry run together list each prompt exactly once."""
+        config, template = self._matrix(temp_dir)
+        listed = []
+        for i in range(1, 4):
+            result = CliRunner().invoke(
+                app, ["run", "-c", str(config), "-t", str(template), "--dry", "--shard", f"{i}/3"]
+            )
+            assert result.exit_code == 0
+            listed += [ln.split(": ", 1)[1] for ln in result.output.splitlines() if ": " in ln]
+        assert sorted(listed) == sorted(f"{s} in {t}" for s in "abcd" for t in "xy")
+
+    def test_dry_shard_numbers_its_own_combinations(self, temp_dir):
+        """Test that a shard counts 1..k of its own k combinations, not of the matrix."""
+        config, template = self._matrix(temp_dir)
+        for i in range(1, 4):
+            result = CliRunner().invoke(
+                app, ["run", "-c", str(config), "-t", str(template), "--dry", "--shard", f"{i}/3"]
+            )
+            assert result.exit_code == 0
+            counters = [ln.split(": ", 1)[0] for ln in result.output.splitlines() if ": " in ln]
+            k = len(counters)
+            assert counters == [f"Combination {n}/{k}" for n in range(1, k + 1)]
+
+    def test_merge_flags_duplicates_and_missing(self, temp_dir):
+        """Test that merge keeps one row per combination and reports gaps."""
+        config, template = self._matrix(temp_dir)
+        rows = [{"prompt": f"{s} in x", "negative": "n", "path": f"{s}.mp4"} for s in "abcd"]
+        (temp_dir / "s1").mkdir()
+        (temp_dir / "s1" / "matrix_results.json").write_text(json.dumps(rows[:3]))
+        (temp_dir / "s2.json").write_text(json.dumps(rows[2:]))
+        out = temp_dir / "merged.json"
+
+        result = CliRunner().invoke(
+            app,
+            ["merge", str(temp_dir / "s1"), str(temp_dir / "s2.json"), "-o", str(out)]
+            + ["-c", str(config), "-t", str(template)],
+        )
+
+        assert result.exit_code == 1  # the four "... in y" combos were never rendered
+        merged = json.loads(out.read_text())
+        assert [r["path"] for r in merged] == ["a.mp4", "b.mp4", "c.mp4", "d.mp4"]
+        assert "Duplicate" in result.output and "c in x" in result.output
+        assert result.output.count("❌ Missing") == 4
+        assert "coverage: 4/8 combinations" in result.output
+
+    def test_merge_without_config_only_deduplicates(self, temp_dir):
+        """Test that merge without a matrix config succeeds when there are no gaps to check."""
+        row = {"prompt": "a in x", "negative": "", "path": "a.mp4"}
+        (temp_dir / "r.json").write_text(json.dumps([row]))
+
+        report = merge_results([temp_dir / "r.json", temp_dir / "r.json"])
+
+        assert len(report["results"]) == 1
+        assert report["results"][0]["id"] == combo_id("a in x", "")
+        assert len(report["duplicates"]) == 1
+        assert report["missing"] == []
+
+
+class TestStreamingResults:
+    """Test the per-combination results log and resuming from it."""
+
+    def _run(self, temp_dir, fail=(), resume=None):
+        config = temp_dir / "m.yml"
+        config.write_text(yaml.dump({"matrix": {"subject": ["a", "b", "c"]}}), encoding="utf-8")
+        template = temp_dir / "t.j2"
+        template.write_text("{{ subject }} at dusk", encoding="utf-8")
+        submitted = []
+
+        def fake_submit(scheduler, client, prompt, **kwargs):
+            submitted.append(prompt)
+            future = Future()
+            if prompt.split()[0] in fail:
+                future.set_exception(RuntimeError("quota"))
+            else:
+                path = temp_dir / f"{prompt.split()[0]}.mp4"
+                future.set_result(types.SimpleNamespace(path=path, thumb=None, candidates=[path]))
+            return future
+
+        args = ["run", "-c", str(config), "-t", str(template), "--out", str(temp_dir / "out")]
+        if resume:
+            args += ["--resume", str(resume)]
+        with (
+            patch("veo_lab.prompt_matrix.create_client"),
+            patch("veo_lab.prompt_matrix.JobScheduler.submit_video", fake_submit),
+        ):
+            result = CliRunner().invoke(app, args)
+        assert result.exit_code == 0, result.output
+        session = resume or next((temp_dir / "out").iterdir())
+        return session, submitted
+
+    def test_each_result_is_logged_with_status(self, temp_dir):
+        """Test that successes and failures are both appended to the JSONL log."""
+        session, _ = self._run(temp_dir, fail={"b"})
+
+        log = [json.loads(ln) for ln in (session / RESULTS_LOG).read_text().splitlines()]
+        assert {row["prompt"]: row["status"] for row in log} == {
+            "a at dusk": "ok",
+            "b at dusk": "failed",
+            "c at dusk": "ok",
+        }
+        snapshot = json.loads((session / "matrix_results.json").read_text())
+        assert sorted(row["prompt"] for row in snapshot) == ["a at dusk", "c at dusk"]
+
+    def test_resume_skips_finished_combinations(self, temp_dir):
+        """Test that a resumed run only resubmits combinations without a result."""
+        session, _ = self._run(temp_dir, fail={"b"})
+
+        _, submitted = self._run(temp_dir, resume=session)
+
+        assert submitted == ["b at dusk"]
+        snapshot = json.loads((session / "matrix_results.json").read_text())
+        assert sorted(row["prompt"] for row in snapshot) == ["a at dusk", "b at dusk", "c at dusk"]
+
+    def test_log_tolerates_torn_last_line(self, temp_dir):
+        """Test that a crash mid-write does not lose earlier rows."""
+        log = temp_dir / RESULTS_LOG
+        ok = {"id": "1", "prompt": "a", "negative": "", "status": "ok"}
+        log.write_text(json.dumps(ok) + "\n" + '{"id": "2", "pro')
+
+        assert MatrixResults(temp_dir).done_ids() == {"1"}
+        assert load_results(temp_dir) == [ok]
+
+
+class TestPromotion:
+    """Test re-rendering the best preview clips on the final model."""
+
+    def test_promote_top_k_by_ratings(self, temp_dir):
+        """Test that promote re-renders the highest rated clips on the final tier."""
+        rows = [
+            {"id": cid, "prompt": f"{cid} prompt", "negative": "", "path": f"{cid}.mp4"}
+            for cid in ("aa", "bb", "cc")
+        ]
+        (temp_dir / "matrix_results.json").write_text(json.dumps(rows))
+        ratings = temp_dir / "ratings.json"
+        ratings.write_text(json.dumps({"bb.mp4": 2, "cc.mp4": 1}))
+        session_dir = temp_dir / "final"
+        session_dir.mkdir()
+        submitted = []
+
+        def fake_submit(scheduler, client, prompt, **kwargs):
+            submitted.append((prompt, kwargs["model"]))
+            future = Future()
+            path = session_dir / f"{prompt.split()[0]}.mp4"
+            future.set_result(types.SimpleNamespace(path=path, thumb=None, candidates=[path]))
+            return future
+
+        with (
+            patch("veo_lab.prompt_matrix.create_client"),
+            patch("veo_lab.prompt_matrix.open_session", return_value=(session_dir, None)),
+            patch("veo_lab.prompt_matrix.JobScheduler.submit_video", fake_submit),
+        ):
+            result = CliRunner().invoke(
+                app, ["promote", str(temp_dir), "--top", "1", "--ratings", str(ratings)]
+            )
+
+        assert result.exit_code == 0, result.output
+        assert submitted == [("bb prompt", FINAL_MODEL)]
+        promoted = json.loads((session_dir / "matrix_results.json").read_text())
+        assert promoted[0]["promoted_from"] == "bb.mp4"
+        assert promoted[0]["score"] == 2
+
+    def test_promote_requires_a_selection(self, temp_dir):
+        """Test that promote without --top or --approve fails instead of doing nothing."""
+        (temp_dir / "matrix_results.json").write_text("[]")
+        result = CliRunner().invoke(app, ["promote", str(temp_dir), "--dry"])
+        assert result.exit_code == 1
+
+
+class TestAdaptiveSearch:
+    """Test the successive-halving strategy end to end."""
+
+    def _run(self, temp_dir, *options, score=None):
+        config = temp_dir / "m.yml"
+        config.write_text(
+            yaml.dump({"matrix": {"subject": list("abcd"), "style": list("wxyz")}}),
+            encoding="utf-8",
+        )
+        template = temp_dir / "t.j2"
+        template.write_text("{{ subject }} {{ style }}", encoding="utf-8")
+        submitted = []
+
+        def fake_submit(scheduler, client, prompt, **kwargs):
+            submitted.append(prompt)
+            future = Future()
+            path = temp_dir / f"{prompt.replace(' ', '_')}.mp4"
+            future.set_result(types.SimpleNamespace(path=path, thumb=None, candidates=[path]))
+            return future
+
+        with (
+            patch("veo_lab.prompt_matrix.create_client"),
+            patch("veo_lab.prompt_matrix.JobScheduler.submit_video", fake_submit),
+            patch("veo_lab.prompt_matrix.load_scorer", return_value=score),
+        ):
+            result = CliRunner().invoke(
+                app,
+                ["run", "-c", str(config), "-t", str(template), "--out", str(temp_dir / "out")]
+                + ["--strategy", "halving:4", *options],
+            )
+        return result, submitted
+
+    def test_halving_converges_without_full_product(self, temp_dir):
+        """Test that later rounds only use surviving values and the best combo wins."""
+
+        def score(path):
+            subject, style = path.stem.split("_")
+            return {"a": 10, "b": 5, "c": 1, "d": 0}[subject] + {"x": 20, "y": 8}.get(style, 0)
+
+        result, submitted = self._run(temp_dir, "--scorer", "custom:score", score=score)
+
+        assert result.exit_code == 0, result.output
+        assert len(submitted) < 16
+        assert len(submitted) == len(set(submitted))
+        session = next((temp_dir / "out").iterdir())
+        rows = json.loads((session / "matrix_results.json").read_text())
+        second = [r["vars"] for r in rows if r["round"] == 2]
+        assert second
+        assert len({v["subject"] for v in second}) <= 2
+        assert len({v["style"] for v in second}) <= 2
+        best = max(rows, key=lambda r: score(Path(r["path"])))
+        assert f"🏆 Best ({score(Path(best['path']))}): {best['prompt']}" in result.output
+
+    def test_ratings_need_rate(self, temp_dir):
+        """Test that halving on ratings refuses to start without --rate."""
+        result, submitted = self._run(temp_dir, "--scorer", "ratings")
+
+        assert result.exit_code == 2
+        assert "--rate" in result.output
+        assert submitted == []
+
+    def test_unrated_round_stops(self, temp_dir):
+        """Test that a rated search stops after a round nobody rated."""
+        with (
+            patch("veo_lab.prompt_matrix.RATINGS", temp_dir / "ratings.json"),
+            patch("builtins.input") as mock_input,
+        ):
+            result, submitted = self._run(temp_dir, "--scorer", "ratings", "--rate")
+
+        assert result.exit_code == 1
+        assert "No clip of round 1 is rated" in result.output
+        assert mock_input.call_count == 1
+        assert 0 < len(submitted) <= 4
+
+    def test_count_reports_round_budget(self, temp_dir):
+        """Test that --count shows the worst-case budget of an adaptive run."""
+        config = temp_dir / "m.yml"
+        config.write_text(yaml.dump({"matrix": {"subject": list("abcd")}}), encoding="utf-8")
+
+        result = CliRunner().invoke(
+            app,
+            ["run", "-c", str(config), "-t", "t.j2", "--count", "-s", "halving:3"],
+        )
+
+        assert result.exit_code == 0
+        assert "at most 6 to render in 2 rounds" in result.output
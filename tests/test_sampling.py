@@ -0,0 +1,181 @@
+"""Tests for veo_lab.sampling combination strategies."""
+
+import itertools
+from collections import Counter
+
+import pytest
+import yaml
+from typer.testing import CliRunner
+
+from veo_lab.prompt_matrix import app
+from veo_lab.prompt_matrix import plan_combinations
+from veo_lab.sampling import Strategy
+from veo_lab.sampling import covering_array
+from veo_lab.sampling import halving_rounds
+from veo_lab.sampling import latin_hypercube_rows
+from veo_lab.sampling import parse_strategy
+from veo_lab.sampling import prune_values
+from veo_lab.sampling import random_rows
+from veo_lab.sampling import sample_combinations
+
+
+def _covers(rows, levels, t) -> bool:
+    for cols in itertools.combinations(range(len(levels)), t):
+        seen = {tuple(row[c] for c in cols) for row in rows}
+        if len(seen) != len(list(itertools.product(*(range(levels[c]) for c in cols)))):
+            return False
+    return True
+
+
+class TestParseStrategy:
+    """Test --strategy parsing."""
+
+    @pytest.mark.parametrize(
+        ("spec", "expected"),
+        [
+            ("full", Strategy("full")),
+            ("pairwise", Strategy("t-wise", 2)),
+            ("3-wise", Strategy("t-wise", 3)),
+            ("random:12", Strategy("random", 12)),
+            ("LHS:5", Strategy("lhs", 5)),
+            ("halving:8", Strategy("halving", 8)),
+        ],
+    )
+    def test_valid_specs(self, spec, expected):
+        """Test that each supported spelling parses."""
+        assert parse_strategy(spec) == expected
+
+    @pytest.mark.parametrize("spec", ["triplewise", "random", "random:0", "0-wise", "lhs:x"])
+    def test_invalid_specs(self, spec):
+        """Test that unknown or degenerate specs are rejected."""
+        with pytest.raises(ValueError):
+            parse_strategy(spec)
+
+    def test_str_round_trips(self):
+        """Test the display form used in run summaries."""
+        assert str(parse_strategy("2-wise")) == "pairwise"
+        assert str(parse_strategy("random:4")) == "random:4"
+
+
+class TestCoveringArray:
+    """Test the greedy covering-array construction."""
+
+    @pytest.mark.parametrize(
+        ("levels", "t"), [([2] * 7, 2), ([3, 3, 3, 3], 2), ([4, 2, 3, 5, 2], 2), ([3] * 5, 3)]
+    )
+    def test_every_t_tuple_is_covered(self, levels, t):
+        """Test that every t-way value combination appears in some row."""
+        rows = covering_array(levels, t)
+        assert _covers(rows, levels, t)
+
+    def test_much_smaller_than_full_product(self):
+        """Test that pairwise over 6 dimensions of 8 values cuts the run >1000x."""
+        rows = covering_array([8] * 6, 2)
+        assert len(rows) < 8**6 // 1000
+        assert _covers(rows, [8] * 6, 2)
+
+    def test_deterministic_for_seed(self):
+        """Test that the same seed gives the same rows."""
+        assert covering_array([3] * 5, 2, seed=7) == covering_array([3] * 5, 2, seed=7)
+
+    def test_strength_at_least_dimensions_is_full_product(self):
+        """Test that t >= number of dimensions degenerates to the full product."""
+        assert len(covering_array([2, 3], 2)) == 6
+
+
+class TestSamples:
+    """Test random and Latin hypercube sampling."""
+
+    def test_random_rows_distinct_and_capped(self):
+        """Test that random rows never repeat and never exceed the product."""
+        rows = random_rows([4, 4, 4], 20, seed=1)
+        assert len(rows) == len(set(rows)) == 20
+        assert len(random_rows([2, 2], 10)) == 4
+
+    def test_lhs_balances_each_dimension(self):
+        """Test that every value of each dimension is used equally often."""
+        rows = latin_hypercube_rows([4, 2], 8, seed=3)
+        for col, size in enumerate([4, 2]):
+            counts = Counter(row[col] for row in rows)
+            assert set(counts) == set(range(size))
+
+    def test_sample_combinations_maps_values(self):
+        """Test that rows come back as dimension -> value dicts."""
+        dims = {"subject": ["witch", "monk"], "style": ["noir"]}
+        combos = list(sample_combinations(dims, Strategy("full")))
+        assert combos == [
+            {"style": "noir", "subject": "witch"},
+            {"style": "noir", "subject": "monk"},
+        ]
+
+
+class TestSuccessiveHalving:
+    """Test the pruning step of the adaptive search."""
+
+    def test_keeps_best_half_by_mean_score(self):
+        """Test that each dimension keeps the values with the best mean score."""
+        dims = {"subject": ["a", "b", "c", "d"], "style": ["x", "y"], "fps": [24]}
+        observations = [
+            ({"subject": "a", "style": "x", "fps": 24}, 9.0),
+            ({"subject": "b", "style": "y", "fps": 24}, 1.0),
+            ({"subject": "c", "style": "x", "fps": 24}, 5.0),
+            ({"subject": "d", "style": "y", "fps": 24}, 3.0),
+        ]
+
+        pruned = prune_values(dims, observations)
+
+        assert pruned == {"subject": ["a", "c"], "style": ["x"], "fps": [24]}
+
+    def test_unobserved_values_survive(self):
+        """Test that values nobody has tried yet are carried forward next to the best one."""
+        observations = [({"subject": "a"}, 1.0), ({"subject": "b"}, 3.0)]
+        pruned = prune_values({"subject": ["a", "b", "c", "d"]}, observations)
+        assert pruned == {"subject": ["b", "c", "d"]}
+
+    def test_best_observed_value_survives(self):
+        """Test that untried values do not crowd out the best scored one."""
+        observations = [({"a": 0}, 0.0), ({"a": 7}, 7.0)]
+        assert prune_values({"a": list(range(8))}, observations) == {"a": [1, 2, 3, 4, 5, 6, 7]}
+
+    def test_rounds_until_single_values(self):
+        """Test the number of halvings needed for the widest dimension."""
+        assert halving_rounds([8, 3, 1]) == 3
+        assert halving_rounds([1, 1]) == 0
+
+
+class TestMatrixStrategies:
+    """Test prompt_matrix integration."""
+
+    def test_pairwise_pairs_negatives_with_every_value(self):
+        """Test that negatives are covered as one more dimension."""
+        cfg = {
+            "matrix": {"subject": ["a", "b", "c"], "style": ["x", "y", "z"]},
+            "negative": ["blurry", "text"],
+        }
+        plan = list(plan_combinations(cfg, parse_strategy("pairwise")))
+
+        pairs = {(vars_["subject"], neg) for vars_, neg in plan}
+        assert pairs == set(itertools.product(["a", "b", "c"], ["blurry", "text"]))
+        assert len(plan) < 3 * 3 * 2
+
+    def test_count_reports_reduction(self, temp_dir):
+        """Test that --count shows the sampled size next to the full product."""
+        config = temp_dir / "m.yml"
+        matrix = {f"dim{d}": [f"v{i}" for i in range(4)] for d in range(5)}
+        config.write_text(yaml.dump({"matrix": matrix}), encoding="utf-8")
+
+        result = CliRunner().invoke(
+            app,
+            ["run", "-c", str(config), "-t", str(temp_dir / "t.j2"), "--count", "-s", "pairwise"],
+        )
+
+        assert result.exit_code == 0
+        assert "1024 combinations" in result.output
+        assert "pairwise:" in result.output
+
+    def test_bad_strategy_is_a_usage_error(self, temp_dir):
+        """Test that an unknown strategy fails before any work."""
+        result = CliRunner().invoke(
+            app, ["run", "-c", str(temp_dir / "m.yml"), "-t", "t.j2", "--strategy", "bogus"]
+        )
+        assert result.exit_code == 2
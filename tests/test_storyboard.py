@@ -0,0 +1,295 @@
+"""Tests for veo_lab.storyboard dependency handling."""
+
+import json
+import threading
+import time
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from veo_lab.journal import JobJournal
+from veo_lab.storyboard import build_shot_chains
+from veo_lab.storyboard import plan_promotion
+from veo_lab.storyboard import run as storyboard_run
+from veo_lab.storyboard import shot_fingerprints
+from veo_lab.tiers import FINAL_MODEL
+from veo_lab.tiers import PREVIEW_MODEL
+from veo_lab.tiers import RATINGS
+
+
+class TestShotChains:
+    """Test splitting a storyboard into independent chains."""
+
+    def test_independent_shots(self):
+        shots = [{"prompt": "a"}, {"prompt": "b"}, {"prompt": "c"}]
+        assert build_shot_chains(shots) == [[0], [1], [2]]
+
+    def test_carry_shots_join_previous_chain(self):
+        shots = [
+            {"prompt": "a"},
+            {"prompt": "b", "carry_last_frame": True},
+            {"prompt": "c"},
+            {"prompt": "d", "carry_last_frame": True},
+            {"prompt": "e", "carry_last_frame": True},
+        ]
+        assert build_shot_chains(shots) == [[0, 1], [2, 3, 4]]
+
+    def test_explicit_image_breaks_dependency(self):
+        shots = [
+            {"prompt": "a"},
+            {"prompt": "b", "carry_last_frame": True, "image": "ref.jpg"},
+            {"prompt": "c", "carry_last_frame": True},
+        ]
+        assert build_shot_chains(shots) == [[0], [1, 2]]
+
+    def test_leading_carry_shot_starts_chain(self):
+        shots = [{"prompt": "a", "carry_last_frame": True}, {"prompt": "b"}]
+        assert build_shot_chains(shots) == [[0], [1]]
+
+
+class TestShotFingerprints:
+    """Test change detection for incremental re-renders."""
+
+    SHOTS = [
+        {"prompt": "a"},
+        {"prompt": "b", "carry_last_frame": True},
+        {"prompt": "c"},
+        {"prompt": "d", "carry_last_frame": True},
+    ]
+
+    def test_stable(self):
+        assert shot_fingerprints(self.SHOTS, "veo-x") == shot_fingerprints(self.SHOTS, "veo-x")
+
+    def test_model_changes_every_shot(self):
+        before = shot_fingerprints(self.SHOTS, "veo-x")
+        after = shot_fingerprints(self.SHOTS, "veo-y")
+        assert all(b != a for b, a in zip(before, after, strict=True))
+
+    def test_edit_dirties_shot_and_downstream_carry_shots(self):
+        before = shot_fingerprints(self.SHOTS, "veo-x")
+        edited = [dict(shot) for shot in self.SHOTS]
+        edited[0]["prompt"] = "a, but at night"
+        after = shot_fingerprints(edited, "veo-x")
+        changed = [b != a for b, a in zip(before, after, strict=True)]
+        assert changed == [True, True, False, False]
+
+    def test_negative_and_image_bytes_count(self, temp_dir):
+        ref = temp_dir / "ref.jpg"
+        ref.write_bytes(b"one")
+        shots = [{"prompt": "a", "image": str(ref)}]
+        first = shot_fingerprints(shots, "veo-x")
+        ref.write_bytes(b"two")
+        assert shot_fingerprints(shots, "veo-x") != first
+        assert shot_fingerprints([{"prompt": "a", "negative": "blur"}], "veo-x") != (
+            shot_fingerprints([{"prompt": "a"}], "veo-x")
+        )
+
+
+class TestStoryboardRun:
+    """Test storyboard rendering with mocked generation."""
+
+    def _write_storyboard(self, temp_dir, shots):
+        path = temp_dir / "board.json"
+        path.write_text(json.dumps({"shots": shots}), encoding="utf-8")
+        return path
+
+    def test_independent_chains_render_concurrently(self, temp_dir):
+        """Test that chains overlap while carry shots wait for their predecessor."""
+        board = self._write_storyboard(
+            temp_dir,
+            [
+                {"prompt": "scene one"},
+                {"prompt": "scene one cont", "carry_last_frame": True},
+                {"prompt": "scene two"},
+                {"prompt": "scene two cont", "carry_last_frame": True},
+            ],
+        )
+        active = 0
+        peak = 0
+        order = []
+        lock = threading.Lock()
+
+        def fake_generate(client, prompt, **kwargs):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+                order.append((prompt, kwargs["image"]))
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            result = Mock()
+            result.path = temp_dir / f"{kwargs['sequence_num']:02d}.mp4"
+            result.thumb = temp_dir / f"{kwargs['sequence_num']:02d}.last.jpg"
+            return result
+
+        with (
+            patch("veo_lab.storyboard.create_client"),
+            patch("veo_lab.storyboard.generate_video", side_effect=fake_generate),
+            patch("veo_lab.storyboard.image_from_file", side_effect=lambda p: f"frame:{p.name}"),
+            patch("veo_lab.storyboard.concat_videos_concat_demuxer") as mock_concat,
+        ):
+            storyboard_run(
+                storyboard=board,
+                output_dir=temp_dir,
+                concat_to=temp_dir / "final.mp4",
+                model="veo-2.0-generate-001",
+                dry=False,
+                resume=None,
+                refresh=False,
+                concurrency=2,
+                incremental=False,
+                preview=False,
+                promote_from=None,
+                top=0,
+                scorer="ratings",
+                ratings=RATINGS,
+            )
+
+        assert peak == 2
+        images = dict(order)
+        assert images["scene one"] is None
+        assert images["scene one cont"] == "frame:01.last.jpg"
+        assert images["scene two"] is None
+        assert images["scene two cont"] == "frame:03.last.jpg"
+        # Concat keeps storyboard order regardless of completion order
+        concat_files = mock_concat.call_args[0][0]
+        assert [p.name for p in concat_files] == ["01.mp4", "02.mp4", "03.mp4", "04.mp4"]
+
+    def test_incremental_rerender_only_regenerates_dirty_shots(self, temp_dir):
+        """Test that an edited shot and its carry successor are the only re-renders."""
+        shots = [
+            {"prompt": "scene one"},
+            {"prompt": "scene one cont", "carry_last_frame": True},
+            {"prompt": "scene two"},
+        ]
+        board = self._write_storyboard(temp_dir, shots)
+        rendered = []
+
+        def fake_generate(client, prompt, **kwargs):
+            rendered.append(prompt)
+            path = kwargs["session_dir"] / f"{kwargs['sequence_num']:02d}.mp4"
+            path.write_bytes(prompt.encode())
+            thumb = path.with_suffix(".last.jpg")
+            thumb.write_bytes(b"jpeg")
+            result = Mock()
+            result.path = path
+            result.thumb = thumb
+            return result
+
+        def render(session_dir, incremental):
+            session_dir.mkdir(parents=True)
+            with (
+                patch(
+                    "veo_lab.storyboard.open_session",
+                    return_value=(session_dir, JobJournal(session_dir)),
+                ),
+                patch("veo_lab.storyboard.create_client"),
+                patch("veo_lab.storyboard.generate_video", side_effect=fake_generate),
+                patch("veo_lab.storyboard.image_from_file", return_value=Mock()),
+            ):
+                storyboard_run(
+                    storyboard=board,
+                    output_dir=temp_dir,
+                    concat_to=None,
+                    model="veo-2.0-generate-001",
+                    dry=False,
+                    resume=None,
+                    refresh=False,
+                    concurrency=1,
+                    incremental=incremental,
+                    preview=False,
+                    promote_from=None,
+                    top=0,
+                    scorer="ratings",
+                    ratings=RATINGS,
+                )
+
+        render(temp_dir / "2025-01-01" / "100000_storyboard_2.0_first", incremental=False)
+        assert sorted(rendered) == sorted(s["prompt"] for s in shots)
+
+        shots[0]["prompt"] = "scene one at night"
+        board.write_text(json.dumps({"shots": shots}), encoding="utf-8")
+        rendered.clear()
+        second = temp_dir / "2025-01-01" / "110000_storyboard_2.0_second"
+        render(second, incremental=True)
+
+        assert sorted(rendered) == ["scene one at night", "scene one cont"]
+        manifest = json.loads((second / "storyboard_manifest.json").read_text())
+        assert len(manifest["shots"]) == 3
+        assert (second / "03_scene_two.mp4").read_bytes() == b"scene two"
+
+    def _preview_session(self, temp_dir, shots):
+        """Write a preview session whose manifest covers every shot."""
+        session = temp_dir / "preview"
+        session.mkdir()
+        entries = []
+        for idx, fp in enumerate(shot_fingerprints(shots, PREVIEW_MODEL)):
+            clip = session / f"p{idx + 1:02d}.mp4"
+            clip.write_bytes(b"preview")
+            entries.append({"id": f"shot{idx + 1:02d}", "fingerprint": fp, "clip": clip.name})
+        manifest = {"storyboard": "", "model": PREVIEW_MODEL, "shots": entries}
+        (session / "storyboard_manifest.json").write_text(json.dumps(manifest))
+        return session
+
+    def test_plan_promotion_follows_carry_chains(self, temp_dir):
+        """Test that promoting a shot also promotes the carry shots that continue it."""
+        shots = [
+            {"prompt": "scene one", "approved": True},
+            {"prompt": "scene one cont", "carry_last_frame": True},
+            {"prompt": "scene two"},
+        ]
+        session = self._preview_session(temp_dir, shots)
+
+        promoted, kept, _ = plan_promotion(shots, session / "storyboard_manifest.json")
+
+        assert promoted == {0, 1}
+        assert list(kept) == [2]
+
+    def test_promote_rerenders_only_promoted_shots_on_final_model(self, temp_dir):
+        """Test that kept preview clips are linked and promoted shots render on the final tier."""
+        shots = [
+            {"prompt": "scene one"},
+            {"prompt": "scene two", "approved": True},
+        ]
+        board = self._write_storyboard(temp_dir, shots)
+        preview = self._preview_session(temp_dir, shots)
+        session_dir = temp_dir / "final"
+        session_dir.mkdir()
+        calls = []
+
+        def fake_generate(client, prompt, **kwargs):
+            calls.append((prompt, kwargs["model"]))
+            path = kwargs["session_dir"] / f"{kwargs['sequence_num']:02d}.mp4"
+            path.write_bytes(b"final")
+            return Mock(path=path, thumb=None)
+
+        with (
+            patch(
+                "veo_lab.storyboard.open_session",
+                return_value=(session_dir, JobJournal(session_dir)),
+            ),
+            patch("veo_lab.storyboard.create_client"),
+            patch("veo_lab.storyboard.generate_video", side_effect=fake_generate),
+        ):
+            storyboard_run(
+                storyboard=board,
+                output_dir=temp_dir,
+                concat_to=None,
+                model=None,
+                dry=False,
+                resume=None,
+                refresh=False,
+                concurrency=1,
+                incremental=False,
+                preview=False,
+                promote_from=preview,
+                top=0,
+                scorer="ratings",
+                ratings=RATINGS,
+            )
+
+        assert calls == [("scene two", FINAL_MODEL)]
+        assert (session_dir / "01_scene_one.mp4").read_bytes() == b"preview"
+        manifest = json.loads((session_dir / "storyboard_manifest.json").read_text())
+        preview_fps = shot_fingerprints(shots, PREVIEW_MODEL)
+        assert manifest["shots"][0]["fingerprint"] == preview_fps[0]
@@ -0,0 +1,64 @@
+"""Tests for veo_lab.tiers preview scoring and promotion."""
+
+import json
+
+import pytest
+from PIL import Image
+from PIL import ImageDraw
+
+from veo_lab.tiers import load_scorer
+from veo_lab.tiers import ratings_scorer
+from veo_lab.tiers import select_for_promotion
+from veo_lab.tiers import sharpness_score
+
+
+class TestScorers:
+    """Test the built-in and pluggable scorers."""
+
+    def test_ratings_scorer_reads_ab_viewer_file(self, temp_dir):
+        """Test that clips score their saved rating and unrated clips score 0."""
+        ratings = temp_dir / "ratings.json"
+        ratings.write_text(json.dumps({"a.mp4": 3}))
+        score = ratings_scorer(ratings)
+
+        assert score(temp_dir / "a.mp4") == 3
+        assert score(temp_dir / "b.mp4") == 0
+
+    def test_sharpness_prefers_detailed_last_frame(self, temp_dir):
+        """Test that a detailed last frame outscores a flat one."""
+        flat = Image.new("RGB", (64, 64), "gray")
+        busy = flat.copy()
+        draw = ImageDraw.Draw(busy)
+        for x in range(0, 64, 4):
+            draw.line([(x, 0), (x, 63)], fill="white")
+        flat.save(temp_dir / "flat.last.jpg")
+        busy.save(temp_dir / "busy.last.jpg")
+
+        assert sharpness_score(temp_dir / "busy.mp4") > sharpness_score(temp_dir / "flat.mp4")
+        assert sharpness_score(temp_dir / "missing.mp4") == 0
+
+    def test_load_scorer_imports_module_function(self):
+        """Test the module:function form and rejection of unknown specs."""
+        assert load_scorer("os.path:getsize").__name__ == "getsize"
+        with pytest.raises(ValueError):
+            load_scorer("bogus")
+        with pytest.raises(ValueError):
+            load_scorer("os:sep")
+
+
+class TestSelectForPromotion:
+    """Test picking which preview clips go to the final tier."""
+
+    def test_approved_plus_top_k(self, temp_dir):
+        """Test that approved clips are always promoted, plus the K best of the rest."""
+        clips = {cid: temp_dir / f"{cid}.mp4" for cid in "abcd"}
+        scores = {"a": 1, "b": 5, "c": 5, "d": 9}
+
+        picks = select_for_promotion(clips, lambda p: scores[p.stem], top_k=2, approved={"a"})
+
+        assert picks == [("a", None), ("d", 9), ("b", 5)]
+
+    def test_no_scorer_promotes_only_approved(self, temp_dir):
+        """Test that without a scorer only approvals count."""
+        clips = {"a": temp_dir / "a.mp4", "b": temp_dir / "b.mp4"}
+        assert select_for_promotion(clips, None, top_k=5, approved={"b"}) == [("b", None)]
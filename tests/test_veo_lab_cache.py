@@ -0,0 +1,146 @@
+"""Tests for the content-addressed clip cache."""
+
+from types import SimpleNamespace
+from unittest.mock import Mock
+from unittest.mock import patch
+
+from google.genai import types
+
+from veo_lab.cache import VideoCache
+from veo_lab.cache import image_digest
+from veo_lab.cache import link_or_copy
+from veo_lab.common import generate_video
+
+
+class TestCacheKeys:
+    """Test cache key derivation."""
+
+    def test_key_is_stable(self):
+        key1 = VideoCache.key("veo-x", "prompt", "neg", "16:9")
+        key2 = VideoCache.key("veo-x", "prompt", "neg", "16:9")
+        assert key1 == key2
+        assert len(key1) == 64
+
+    def test_key_changes_with_each_input(self):
+        base = VideoCache.key("veo-x", "prompt", "neg", "16:9")
+        assert VideoCache.key("veo-y", "prompt", "neg", "16:9") != base
+        assert VideoCache.key("veo-x", "prompt!", "neg", "16:9") != base
+        assert VideoCache.key("veo-x", "prompt", "", "16:9") != base
+        assert VideoCache.key("veo-x", "prompt", "neg", "9:16") != base
+
+    def test_key_hashes_image_bytes(self):
+        img_a = types.Image(image_bytes=b"aaa", mime_type="image/jpeg")
+        img_a2 = types.Image(image_bytes=b"aaa", mime_type="image/jpeg")
+        img_b = types.Image(image_bytes=b"bbb", mime_type="image/jpeg")
+        key_a = VideoCache.key("veo-x", "p", "", "16:9", img_a)
+        assert key_a == VideoCache.key("veo-x", "p", "", "16:9", img_a2)
+        assert key_a != VideoCache.key("veo-x", "p", "", "16:9", img_b)
+        assert key_a != VideoCache.key("veo-x", "p", "", "16:9")
+
+    def test_image_digest_none(self):
+        assert image_digest(None) == ""
+
+
+class TestVideoCacheStore:
+    """Test storing and restoring cached clips."""
+
+    def test_link_or_copy_shares_content(self, temp_dir):
+        src = temp_dir / "src.mp4"
+        src.write_bytes(b"video")
+        dst = temp_dir / "nested" / "dst.mp4"
+        method = link_or_copy(src, dst)
+        assert method in {"hardlink", "reflink", "copy"}
+        assert dst.read_bytes() == b"video"
+
+    def test_miss(self, temp_dir):
+        cache = VideoCache(temp_dir / "cache")
+        assert cache.lookup("0" * 64) is None
+        assert cache.restore("0" * 64, temp_dir / "out.mp4") is None
+
+    def test_store_and_restore(self, temp_dir):
+        cache = VideoCache(temp_dir / "cache")
+        video = temp_dir / "clip.mp4"
+        video.write_bytes(b"video")
+        thumb = temp_dir / "clip.last.jpg"
+        thumb.write_bytes(b"jpeg")
+        key = VideoCache.key("veo-x", "p", "", "16:9")
+
+        cache.store(key, video, thumb, op_name="operations/1")
+        hit = cache.restore(key, temp_dir / "session" / "01_p.mp4")
+
+        assert hit is not None
+        dest, restored_thumb, meta = hit
+        assert dest.read_bytes() == b"video"
+        assert restored_thumb == temp_dir / "session" / "01_p.last.jpg"
+        assert (temp_dir / "session" / "01_p.last.jpg").read_bytes() == b"jpeg"
+        assert meta["op_name"] == "operations/1"
+
+    def test_restore_all_candidates(self, temp_dir):
+        """Test that every cached candidate is linked, up to the paths requested."""
+        cache = VideoCache(temp_dir / "cache")
+        clips = [temp_dir / f"clip{i}.mp4" for i in range(3)]
+        for i, clip in enumerate(clips):
+            clip.write_bytes(b"video%d" % i)
+        key = VideoCache.key("veo-x", "p", "", "16:9", candidates=3)
+        cache.store(key, clips[0], extras=[(clips[1], None), (clips[2], None)])
+
+        dests = [temp_dir / "session" / f"01_p{suffix}.mp4" for suffix in ("", "_2", "_3", "_4")]
+        hit = cache.restore_all(key, dests)
+
+        assert hit is not None
+        restored, thumb, meta = hit
+        assert restored == dests[:3]
+        assert [p.read_bytes() for p in restored] == [b"video0", b"video1", b"video2"]
+        assert thumb is None
+        assert meta["candidates"] == 3
+
+
+class TestGenerateVideoCache:
+    """Test generate_video with a cache."""
+
+    @patch("veo_lab.common.extract_last_frame", side_effect=Exception("no ffmpeg"))
+    @patch("veo_lab.common.wait_for_video_operation")
+    @patch("veo_lab.common.save_generated_video")
+    def test_second_render_is_served_from_cache(
+        self, mock_save, mock_wait, _mock_extract, temp_dir
+    ):
+        """Test that an identical request skips the API and links the cached clip."""
+        cache = VideoCache(temp_dir / "cache")
+        client = Mock()
+        op = SimpleNamespace(name="operations/1", done=True)
+        client.models.generate_videos.return_value = op
+        mock_wait.return_value = op
+        mock_save.side_effect = lambda client, op, dest: dest.write_bytes(b"video") or dest
+        (temp_dir / "s1").mkdir()
+        (temp_dir / "s2").mkdir()
+
+        first = generate_video(
+            client, "prompt", session_dir=temp_dir / "s1", cache=cache, model="veo-x"
+        )
+        second = generate_video(
+            client, "prompt", session_dir=temp_dir / "s2", cache=cache, model="veo-x"
+        )
+
+        assert client.models.generate_videos.call_count == 1
+        assert second.path.parent == temp_dir / "s2"
+        assert second.path.read_bytes() == first.path.read_bytes()
+        assert second.op_name == "operations/1"
+
+    @patch("veo_lab.common.extract_last_frame", side_effect=Exception("no ffmpeg"))
+    @patch("veo_lab.common.wait_for_video_operation")
+    @patch("veo_lab.common.save_generated_video")
+    def test_refresh_bypasses_cache(self, mock_save, mock_wait, _mock_extract, temp_dir):
+        """Test that refresh renders again even when cached."""
+        cache = VideoCache(temp_dir / "cache")
+        client = Mock()
+        op = SimpleNamespace(name="operations/1", done=True)
+        client.models.generate_videos.return_value = op
+        mock_wait.return_value = op
+        mock_save.side_effect = lambda client, op, dest: dest.write_bytes(b"video") or dest
+        (temp_dir / "s1").mkdir()
+        (temp_dir / "s2").mkdir()
+
+        generate_video(client, "prompt", session_dir=temp_dir / "s1", cache=cache)
+        generate_video(client, "prompt", session_dir=temp_dir / "s2", cache=cache, refresh=True)
+
+        assert client.models.generate_videos.call_count == 2
@@ -0,0 +1,183 @@
+"""Tests for veo_lab.cassette record/replay."""
+
+import json
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from google.genai import errors
+from google.genai import types
+
+from veo_lab import fake_backend
+from veo_lab.cassette import Cassette
+from veo_lab.cassette import CassetteMissError
+from veo_lab.cassette import RecordingClient
+from veo_lab.cassette import ReplayClient
+from veo_lab.cassette import cassette_client
+from veo_lab.cassette import summarize
+from veo_lab.client import video_operation
+from veo_lab.common import save_generated_video
+from veo_lab.fake_backend import FakeBackend
+from veo_lab.fake_backend import FakeClient
+from veo_lab.fake_backend import FakeConfig
+
+
+class _VideoService:
+    """Minimal stand-in for the Veo endpoints: done on the third poll, URI download."""
+
+    def __init__(self):
+        self.polls = 0
+        self.models: Any = SimpleNamespace(generate_videos=self.generate_videos)
+        self.operations: Any = SimpleNamespace(get=self.get)
+        self.files: Any = SimpleNamespace(download=self.download)
+
+    def generate_videos(self, *, model, prompt, image=None, config=None):
+        return video_operation("models/veo/operations/42")
+
+    def get(self, operation):
+        self.polls += 1
+        time.sleep(0.05)
+        if self.polls < 3:
+            return video_operation(operation.name)
+        video = types.Video(uri="https://files/42", mime_type="video/mp4")
+        return video_operation(
+            operation.name,
+            done=True,
+            response=types.GenerateVideosResponse(
+                generated_videos=[types.GeneratedVideo(video=video)]
+            ),
+        )
+
+    def download(self, *, file):
+        file.video_bytes = b"mp4-bytes"
+        return file.video_bytes
+
+
+def _render(client, dest, prompt="a fox"):
+    op = client.models.generate_videos(
+        model="veo-x", prompt=prompt, config=types.GenerateVideosConfig(aspect_ratio="16:9")
+    )
+    while not op.done:
+        op = client.operations.get(op)
+    return save_generated_video(client, op, dest)
+
+
+class TestRecording:
+    """Test what a recording captures."""
+
+    def test_calls_timings_and_blobs(self, temp_dir):
+        """Test that requests, responses, timings and bytes are captured once."""
+        cassette = Cassette(temp_dir / "tape")
+        client = RecordingClient(FakeClient(FakeBackend()), cassette)
+        for _ in range(2):
+            client.models.generate_images(model="imagen-x", prompt="a red fox")
+
+        entries = cassette.entries()
+        assert [e["kind"] for e in entries] == ["models.generate_images"] * 2
+        assert entries[0]["key"] == entries[1]["key"]
+        assert entries[0]["request"]["prompt"] == "a red fox"
+        assert entries[0]["duration"] >= 0 and entries[1]["at"] >= entries[0]["at"]
+        image = entries[0]["response"]["generated_images"][0]["image"]["image_bytes"]
+        assert set(image) == {"$blob"}
+        assert len(list((temp_dir / "tape" / "blobs").iterdir())) == 1
+
+    def test_errors_are_recorded(self, temp_dir):
+        """Test that API errors are stored and re-raised."""
+        cassette = Cassette(temp_dir / "tape")
+        client = RecordingClient(FakeClient(FakeBackend(FakeConfig(error_429=1.0))), cassette)
+        with pytest.raises(errors.ClientError):
+            client.models.generate_images(model="imagen-x", prompt="p")
+        assert cassette.entries()[0]["error"]["code"] == 429
+
+
+class TestReplay:
+    """Test serving a cassette back."""
+
+    def test_video_round_trip(self, temp_dir):
+        """Test that a recorded submit/poll/download replays to the same file, offline."""
+        cassette = Cassette(temp_dir / "tape")
+        _render(RecordingClient(_VideoService(), cassette), temp_dir / "recorded.mp4")
+
+        replayed = _render(ReplayClient(cassette, scale=0), temp_dir / "replayed.mp4")
+        assert replayed.read_bytes() == b"mp4-bytes"
+
+    def test_render_time_is_scaled(self, temp_dir):
+        """Test that an operation stays pending for its scaled recorded render time."""
+        cassette = Cassette(temp_dir / "tape")
+        _render(RecordingClient(_VideoService(), cassette), temp_dir / "recorded.mp4")
+
+        client = ReplayClient(cassette, scale=1.0)
+        op = client.models.generate_videos(
+            model="veo-x", prompt="a fox", config=types.GenerateVideosConfig(aspect_ratio="16:9")
+        )
+        assert client.operations.get(op).done is False
+        time.sleep(0.2)
+        assert client.operations.get(op).done is True
+
+    def test_errors_replay(self, temp_dir):
+        """Test that a recorded 429 is raised again."""
+        cassette = Cassette(temp_dir / "tape")
+        client = RecordingClient(FakeClient(FakeBackend(FakeConfig(error_429=1.0))), cassette)
+        with pytest.raises(errors.ClientError):
+            client.models.generate_images(model="imagen-x", prompt="p")
+
+        with pytest.raises(errors.ClientError) as e:
+            ReplayClient(cassette, scale=0).models.generate_images(model="imagen-x", prompt="p")
+        assert e.value.code == 429
+
+    def test_unmatched_request(self, temp_dir):
+        """Test that unrecorded or exhausted requests raise CassetteMissError."""
+        cassette = Cassette(temp_dir / "tape")
+        RecordingClient(FakeClient(FakeBackend()), cassette).models.generate_images(
+            model="imagen-x", prompt="p"
+        )
+        client = ReplayClient(cassette, scale=0)
+        with pytest.raises(CassetteMissError):
+            client.models.generate_images(model="imagen-x", prompt="other")
+        client.models.generate_images(model="imagen-x", prompt="p")
+        with pytest.raises(CassetteMissError):
+            client.models.generate_images(model="imagen-x", prompt="p")
+
+
+class TestSelection:
+    """Test VEO_CASSETTE handling and the summary."""
+
+    def test_record_then_replay_from_env(self, temp_dir, monkeypatch):
+        """Test that replay needs no backend client and reproduces recorded responses."""
+        tape = temp_dir / "tape"
+        monkeypatch.setattr(fake_backend, "_shared", None)
+        monkeypatch.setenv("VEO_BACKEND", "fake")
+        monkeypatch.setenv("VEO_FAKE_RENDER", "0")
+        monkeypatch.setenv("VEO_CASSETTE", f"record:{tape}")
+        from imagen_lab.common import create_client
+
+        recorded = create_client().models.generate_content(model="gemini-x", contents="describe")
+
+        monkeypatch.setenv("VEO_CASSETTE", f"replay:{tape}")
+        monkeypatch.setenv("VEO_CASSETTE_SCALE", "0")
+
+        def no_client():
+            raise AssertionError("replay must not create a client")
+
+        client = cassette_client(no_client)
+        assert client.models.generate_content(model="gemini-x", contents="describe").text == (
+            recorded.text
+        )
+
+    @pytest.mark.parametrize("setting", ["play:x", "record:"])
+    def test_bad_setting(self, setting, monkeypatch):
+        """Test that malformed VEO_CASSETTE values are rejected."""
+        monkeypatch.setenv("VEO_CASSETTE", setting)
+        with pytest.raises(ValueError, match="VEO_CASSETTE"):
+            cassette_client(_VideoService)
+
+    def test_summarize(self, temp_dir):
+        """Test call counts, error codes, inter-arrival and render times."""
+        cassette = Cassette(temp_dir / "tape")
+        _render(RecordingClient(_VideoService(), cassette), temp_dir / "a.mp4")
+        summary = summarize(cassette.entries())
+        assert summary["operations.get"]["calls"] == 3
+        assert summary["render"]["n"] == 1
+        assert summary["render"]["p50_s"] >= 0.1
+        json.dumps(summary)
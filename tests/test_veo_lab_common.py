@@ -2,14 +2,27 @@
 
 import json
 import os
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
 from unittest.mock import patch
 
+import pytest
+
+from veo_lab.common import JobScheduler
+from veo_lab.common import ModelQuota
+from veo_lab.common import OperationPoller
+from veo_lab.common import RateLimiter
+from veo_lab.common import TokenBucket
 from veo_lab.common import create_prompt_snippet
 from veo_lab.common import create_session_directory
 from veo_lab.common import create_video_filename
 from veo_lab.common import list_models
+from veo_lab.common import model_quota
 from veo_lab.common import save_session_metadata
 from veo_lab.common import stable_stem
+from veo_lab.metrics import ClipMetrics
 
 
 class TestUtilityFunctions:
@@ -214,3 +227,181 @@ class TestPathUtilities:
         # Should still be meaningful
         assert "test" in result
         assert "prompt" in result
+
+
+class TestRateLimiting:
+    """Test token-bucket pacing and concurrent job scheduling."""
+
+    def test_token_bucket_first_token_is_free(self):
+        """Test that a fresh bucket hands out its burst without waiting."""
+        bucket = TokenBucket(rate_per_minute=60, capacity=2)
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+
+    def test_token_bucket_paces_after_burst(self):
+        """Test that callers past the burst wait for the refill rate."""
+        bucket = TokenBucket(rate_per_minute=600)  # one token every 0.1s
+        bucket.acquire()
+        start = time.monotonic()
+        waited = bucket.acquire()
+        assert 0.05 < waited <= 0.1
+        assert time.monotonic() - start >= 0.05
+
+    def test_token_bucket_unlimited(self):
+        """Test that a non-positive rate never blocks."""
+        bucket = TokenBucket(rate_per_minute=0)
+        assert all(bucket.acquire() == 0 for _ in range(100))
+
+    def test_model_quota_env_override(self):
+        """Test VEO_RPM / VEO_MAX_CONCURRENT overrides."""
+        with patch.dict(os.environ, {"VEO_RPM": "10", "VEO_MAX_CONCURRENT": "4"}):
+            quota = model_quota("veo-3.0-generate-preview")
+        assert quota == ModelQuota(rpm=10, max_concurrent=4)
+
+    def test_rate_limiter_caps_concurrent_slots(self):
+        """Test that no more than max_concurrent slots are held at once per model."""
+        limiter = RateLimiter(default=ModelQuota(rpm=0, max_concurrent=2))
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def job():
+            nonlocal active, peak
+            with limiter.slot("veo-test"):
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.02)
+                with lock:
+                    active -= 1
+
+        with JobScheduler(max_workers=6) as scheduler:
+            futures = [scheduler.submit(job) for _ in range(6)]
+        assert all(f.exception() is None for f in futures)
+        assert peak == 2
+
+    def test_job_scheduler_runs_jobs_concurrently(self):
+        """Test that the scheduler overlaps blocking jobs."""
+        start = time.monotonic()
+        with JobScheduler(max_workers=4) as scheduler:
+            futures = [scheduler.submit(time.sleep, 0.1) for _ in range(4)]
+        assert all(f.done() for f in futures)
+        assert time.monotonic() - start < 0.3
+
+
+def _fake_client(polls_until_done: int):
+    """Client whose operations.get reports done after `polls_until_done` calls."""
+    client = Mock()
+    calls = {"n": 0}
+
+    def get(op):
+        calls["n"] += 1
+        done = calls["n"] >= polls_until_done
+        return SimpleNamespace(name=op.name, done=done, error=None)
+
+    client.operations.get.side_effect = get
+    return client
+
+
+class TestOperationPoller:
+    """Test the multiplexed operation poller."""
+
+    def make_poller(self, **kwargs):
+        defaults = {"min_interval": 0.01, "max_interval": 0.05, "max_polls_per_second": 0}
+        return OperationPoller(**{**defaults, **kwargs})
+
+    def test_already_done_operation_is_not_polled(self):
+        """Test that finished operations resolve without any polling."""
+        client = Mock()
+        op = SimpleNamespace(name="op", done=True)
+        assert self.make_poller().wait(client, op) is op
+        client.operations.get.assert_not_called()
+
+    def test_waits_until_done_and_records_history(self):
+        """Test polling until done and recording render time per model."""
+        poller = self.make_poller()
+        client = _fake_client(polls_until_done=3)
+        result = poller.wait(client, SimpleNamespace(name="op-1", done=False), model="veo-x")
+        assert result.done is True
+        assert client.operations.get.call_count == 3
+        assert poller.expected_render_seconds("veo-x") is not None
+        assert poller.pending_count() == 0
+
+    def test_records_polls_retries_and_render_time(self):
+        """Test that a metrics object receives the poller's counters and timings."""
+        poller = self.make_poller()
+        calls = {"n": 0}
+
+        def flaky_get(op):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise ConnectionError("blip")
+            return SimpleNamespace(name=op.name, done=calls["n"] >= 4, error=None)
+
+        client = Mock()
+        client.operations.get.side_effect = flaky_get
+        metrics = ClipMetrics()
+
+        poller.wait(client, SimpleNamespace(name="op", done=False), metrics=metrics)
+
+        assert metrics.polls == 4
+        assert metrics.retries == 1
+        assert metrics.stages["render"] >= metrics.stages["poll_lag"] > 0
+
+    def test_many_operations_share_one_loop(self):
+        """Test tracking many operations at once from a single thread."""
+        poller = self.make_poller()
+        futures = [
+            poller.track(_fake_client(2), SimpleNamespace(name=f"op-{i}", done=False))
+            for i in range(50)
+        ]
+        assert all(f.result(timeout=5).done for f in futures)
+        names = {t.name for t in threading.enumerate()}
+        assert "veo-poller" in names
+
+    def test_timeout(self):
+        """Test that operations past their deadline raise TimeoutError."""
+        poller = self.make_poller()
+        client = _fake_client(polls_until_done=10_000)
+        with pytest.raises(TimeoutError):
+            poller.wait(client, SimpleNamespace(name="slow", done=False), timeout=0.1)
+
+    def test_repeated_poll_errors_are_raised(self):
+        """Test that polling errors are retried, then surfaced."""
+        poller = self.make_poller(max_errors=3)
+        client = Mock()
+        client.operations.get.side_effect = ConnectionError("network down")
+        with pytest.raises(ConnectionError):
+            poller.wait(client, SimpleNamespace(name="op", done=False))
+        assert client.operations.get.call_count == 3
+
+    def test_operation_error_is_raised(self):
+        """Test that a finished operation carrying an error raises."""
+        poller = self.make_poller()
+        client = Mock()
+        client.operations.get.return_value = SimpleNamespace(
+            name="op", done=True, error={"message": "blocked"}
+        )
+        with pytest.raises(RuntimeError, match="blocked"):
+            poller.wait(client, SimpleNamespace(name="op", done=False))
+
+    def test_next_delay_adapts_to_history(self):
+        """Test that polling waits for the typical render time, then backs off."""
+        poller = OperationPoller(min_interval=5, max_interval=60, backoff=0.25)
+        assert poller.next_delay(0, None) == 5
+        assert poller.next_delay(0, 100) == 60  # capped at max_interval
+        assert poller.next_delay(80, 100) == 10
+        assert poller.next_delay(120, 100) == 30
+        assert poller.next_delay(1000, 100) == 60
+
+    def test_global_poll_rate_cap(self):
+        """Test that polls across operations are spaced by the rate cap."""
+        poller = self.make_poller(min_interval=0, max_polls_per_second=20)
+        start = time.monotonic()
+        futures = [
+            poller.track(_fake_client(1), SimpleNamespace(name=f"op-{i}", done=False))
+            for i in range(5)
+        ]
+        for f in futures:
+            f.result(timeout=5)
+        assert time.monotonic() - start >= 0.15
@@ -0,0 +1,193 @@
+"""Tests for the simulated Veo/Imagen backend."""
+
+import io
+import json
+import random
+import shutil
+
+import pytest
+from google.genai import errors
+from google.genai import types
+from PIL import Image
+
+from veo_lab import fake_backend
+from veo_lab.client import video_operation
+from veo_lab.fake_backend import FakeBackend
+from veo_lab.fake_backend import FakeClient
+from veo_lab.fake_backend import FakeConfig
+from veo_lab.fake_backend import RenderTime
+from veo_lab.fake_backend import parse_render_time
+
+
+def _client(**config):
+    return FakeClient(FakeBackend(FakeConfig(**{"render": RenderTime("fixed", 0.0), **config})))
+
+
+def _submit(client, model="veo-x", prompt="a fox"):
+    return client.models.generate_videos(model=model, prompt=prompt)
+
+
+class TestRenderTime:
+    """Test render-time distribution specs."""
+
+    def test_parse(self):
+        """Test the accepted spellings."""
+        assert parse_render_time("12") == RenderTime("fixed", 12.0)
+        assert parse_render_time("fixed:3") == RenderTime("fixed", 3.0)
+        assert parse_render_time("uniform:5:15") == RenderTime("uniform", 5.0, 15.0)
+        assert parse_render_time("lognormal:40:0.3") == RenderTime("lognormal", 40.0, 0.3)
+
+    @pytest.mark.parametrize("spec", ["", "gamma:1:2", "uniform:5", "fixed:x"])
+    def test_parse_rejects(self, spec):
+        """Test that unknown kinds and wrong arity raise ValueError."""
+        with pytest.raises(ValueError, match="bad render time"):
+            parse_render_time(spec)
+
+    def test_samples_stay_in_range(self):
+        """Test uniform bounds and the lognormal median."""
+        rng = random.Random(0)
+        uniform = [RenderTime("uniform", 5, 15).sample(rng) for _ in range(200)]
+        assert all(5 <= s <= 15 for s in uniform)
+        lognormal = sorted(RenderTime("lognormal", 40, 0.3).sample(rng) for _ in range(501))
+        assert 32 < lognormal[250] < 48
+
+    def test_config_from_env(self, monkeypatch):
+        """Test that VEO_FAKE_* variables configure the backend."""
+        monkeypatch.setenv("VEO_FAKE_RENDER", "uniform:1:2")
+        monkeypatch.setenv("VEO_FAKE_429", "0.1")
+        monkeypatch.setenv("VEO_FAKE_RPM", "4")
+        monkeypatch.setenv("VEO_FAKE_SEED", "7")
+        config = FakeConfig.from_env()
+        assert config.render == RenderTime("uniform", 1.0, 2.0)
+        assert (config.error_429, config.error_500, config.rpm, config.seed) == (0.1, 0.0, 4, 7)
+
+
+class TestOperations:
+    """Test the simulated long-running video operations."""
+
+    def test_pending_until_render_time(self):
+        """Test that an operation stays pending until its sampled render time passes."""
+        client = _client(render=RenderTime("fixed", 60.0))
+        op = _submit(client)
+        assert isinstance(op, types.GenerateVideosOperation)
+        assert op.done is False
+        assert client.operations.get(op).done is False
+        assert client.backend.calls == {"generate_videos": 1, "operations.get": 1}
+
+    def test_unknown_operation(self):
+        """Test that re-attaching to an operation this process never started is a 404."""
+        with pytest.raises(errors.ClientError) as e:
+            _client().operations.get(video_operation("models/x/operations/1"))
+        assert e.value.code == 404
+
+    @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+    def test_finished_operation_returns_mp4(self, temp_dir):
+        """Test that a done operation carries a real MP4 per requested candidate."""
+        client = _client()
+        op = client.models.generate_videos(
+            model="veo-x",
+            prompt="a fox",
+            config=types.GenerateVideosConfig(aspect_ratio="9:16", number_of_videos=2),
+        )
+        op = client.operations.get(op)
+        assert op.done is True
+        assert op.response is not None
+        videos = op.response.generated_videos or []
+        assert len(videos) == 2
+        video = videos[0].video
+        assert video is not None
+        client.files.download(file=video)
+        video.save(str(temp_dir / "clip.mp4"))
+        assert (temp_dir / "clip.mp4").read_bytes()[4:8] == b"ftyp"
+
+
+class TestFailures:
+    """Test simulated error rates and quota windows."""
+
+    @pytest.mark.parametrize(("rate", "code"), [("error_429", 429), ("error_500", 500)])
+    def test_error_rates(self, rate, code):
+        """Test that a certain error rate fails every call with that status."""
+        with pytest.raises(errors.APIError) as e:
+            _submit(_client(**{rate: 1.0}))
+        assert e.value.code == code
+
+    def test_error_rate_is_seeded(self):
+        """Test that the same seed fails the same calls."""
+
+        def outcomes():
+            client = _client(error_429=0.5, seed=3)
+            results = []
+            for _ in range(20):
+                try:
+                    _submit(client)
+                    results.append(True)
+                except errors.ClientError:
+                    results.append(False)
+            return results
+
+        first = outcomes()
+        assert first == outcomes()
+        assert True in first and False in first
+
+    def test_rpm_window(self):
+        """Test that submissions past the per-minute quota are rejected per model."""
+        client = _client(rpm=2)
+        _submit(client)
+        _submit(client)
+        with pytest.raises(errors.ClientError, match="RESOURCE_EXHAUSTED"):
+            _submit(client)
+        _submit(client, model="veo-y")
+
+    def test_concurrency_limit(self):
+        """Test that operations still rendering count against max_concurrent."""
+        client = _client(render=RenderTime("fixed", 60.0), max_concurrent=1)
+        _submit(client)
+        with pytest.raises(errors.ClientError, match="already running"):
+            _submit(client)
+
+        finished = _client(max_concurrent=1)
+        _submit(finished)
+        _submit(finished)
+
+
+class TestImagesAndText:
+    """Test the Imagen and Gemini stand-ins."""
+
+    def test_generate_images(self):
+        """Test that the requested number of decodable, distinct JPEGs come back."""
+        response = _client().models.generate_images(
+            model="imagen-x",
+            prompt="a red fox",
+            config=types.GenerateImagesConfig(number_of_images=2),
+        )
+        images = [g.image.image_bytes for g in response.generated_images or [] if g.image]
+        assert len(images) == 2 and images[0] != images[1]
+        assert images[0] is not None
+        assert Image.open(io.BytesIO(images[0])).format == "JPEG"
+
+    def test_generate_content(self):
+        """Test plain-text and JSON responses."""
+        client = _client()
+        text = client.models.generate_content(model="gemini-x", contents=["describe", object()])
+        assert (text.text or "").startswith("Simulated description")
+        variants = client.models.generate_content(
+            model="gemini-x",
+            contents="spec",
+            config=types.GenerateContentConfig(response_mime_type="application/json"),
+        )
+        assert len(json.loads(variants.text or "")) == 3
+
+
+class TestSelection:
+    """Test choosing the fake backend through the environment."""
+
+    def test_create_client_uses_fake_backend(self, monkeypatch):
+        """Test that VEO_BACKEND=fake makes both labs share one simulated backend."""
+        from imagen_lab.common import create_client as imagen_client
+        from veo_lab.common import create_client as veo_client
+
+        monkeypatch.setenv("VEO_BACKEND", "fake")
+        monkeypatch.setattr(fake_backend, "_shared", None)
+        veo, imagen = veo_client(), imagen_client()
+        assert isinstance(veo, FakeClient) and isinstance(imagen, FakeClient)
+        assert veo.backend is imagen.backend
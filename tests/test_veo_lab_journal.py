@@ -0,0 +1,189 @@
+"""Tests for the veo_lab job journal and resume behavior."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytest
+
+from veo_lab.common import generate_video
+from veo_lab.common import open_session
+from veo_lab.journal import DONE
+from veo_lab.journal import FAILED
+from veo_lab.journal import SUBMITTED
+from veo_lab.journal import SUBMITTING
+from veo_lab.journal import JobJournal
+
+
+def _entry(journal, key):
+    entry = journal.get(key)
+    assert entry is not None
+    return entry
+
+
+def _fake_save(client, op, dest_path):
+    dest_path.write_bytes(b"mp4")
+    return dest_path
+
+
+class TestJobJournal:
+    """Test journal persistence."""
+
+    def test_record_merges_fields(self, temp_dir):
+        """Test that later records update earlier fields for the same key."""
+        journal = JobJournal(temp_dir)
+        journal.record("a.mp4", SUBMITTING, prompt="p")
+        journal.record("a.mp4", SUBMITTED, op_name="operations/1")
+
+        entry = _entry(journal, "a.mp4")
+        assert entry["state"] == SUBMITTED
+        assert entry["prompt"] == "p"
+        assert entry["op_name"] == "operations/1"
+
+    def test_reload_from_disk(self, temp_dir):
+        """Test that a new journal instance sees previously written state."""
+        JobJournal(temp_dir).record("a.mp4", DONE, thumb="a.last.jpg")
+
+        reloaded = JobJournal(temp_dir)
+        assert _entry(reloaded, "a.mp4")["state"] == DONE
+        assert reloaded.summary() == {DONE: 1}
+
+    def test_torn_final_line_is_ignored(self, temp_dir):
+        """Test recovery from a crash mid-write."""
+        journal = JobJournal(temp_dir)
+        journal.record("a.mp4", SUBMITTED, op_name="operations/1")
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"key": "b.mp4", "sta')
+
+        reloaded = JobJournal(temp_dir)
+        assert _entry(reloaded, "a.mp4")["op_name"] == "operations/1"
+        assert reloaded.get("b.mp4") is None
+
+    def test_journal_is_jsonl(self, temp_dir):
+        """Test the on-disk format is one JSON object per line."""
+        journal = JobJournal(temp_dir)
+        journal.record("a.mp4", SUBMITTING)
+        journal.record("a.mp4", FAILED, error="boom")
+        lines = journal.path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["state"] for line in lines] == [SUBMITTING, FAILED]
+
+
+class TestOpenSession:
+    """Test session creation and resume."""
+
+    def test_new_session_creates_directory(self, temp_dir):
+        session_dir, journal = open_session("test_script", "a prompt", temp_dir, "veo-x")
+        assert session_dir.is_dir()
+        assert journal.path.parent == session_dir
+
+    def test_resume_reuses_directory(self, temp_dir):
+        session_dir, _ = open_session("test_script", "a prompt", temp_dir, "veo-x")
+        resumed_dir, journal = open_session("test_script", "other", temp_dir, "veo-x", session_dir)
+        assert resumed_dir == session_dir
+
+    def test_resume_missing_directory(self, temp_dir):
+        with pytest.raises(FileNotFoundError):
+            open_session("test_script", "a prompt", temp_dir, resume=temp_dir / "missing")
+
+
+class TestGenerateVideoResume:
+    """Test generate_video against journaled state."""
+
+    @patch("veo_lab.common.extract_last_frame", side_effect=Exception("no ffmpeg"))
+    @patch("veo_lab.common.save_generated_video", side_effect=_fake_save)
+    @patch("veo_lab.common.wait_for_video_operation")
+    def test_journals_each_stage(self, mock_wait, _mock_save, _mock_extract, temp_dir):
+        """Test that a fresh job is journaled through to done."""
+        client = Mock()
+        op = SimpleNamespace(name="operations/42", done=True)
+        client.models.generate_videos.return_value = op
+        mock_wait.return_value = op
+        journal = JobJournal(temp_dir)
+
+        result = generate_video(
+            client, "prompt", session_dir=temp_dir, journal=journal, sequence_num=1
+        )
+
+        entry = _entry(journal, result.path.name)
+        assert entry["state"] == DONE
+        assert entry["op_name"] == "operations/42"
+        assert entry["prompt"] == "prompt"
+        states = [json.loads(line)["state"] for line in journal.path.read_text().splitlines()]
+        assert states == [SUBMITTING, SUBMITTED, DONE]
+
+    @patch("veo_lab.common.wait_for_video_operation")
+    def test_done_job_is_not_resubmitted(self, mock_wait, temp_dir):
+        """Test that finished jobs are returned without touching the API."""
+        (temp_dir / "01_prompt.mp4").write_bytes(b"mp4")
+        journal = JobJournal(temp_dir)
+        journal.record("01_prompt.mp4", DONE, op_name="operations/1", thumb="")
+        client = Mock()
+
+        result = generate_video(
+            client, "prompt", session_dir=temp_dir, journal=journal, sequence_num=1
+        )
+
+        assert result.path == temp_dir / "01_prompt.mp4"
+        assert result.op_name == "operations/1"
+        client.models.generate_videos.assert_not_called()
+        mock_wait.assert_not_called()
+
+    @patch("veo_lab.common.extract_last_frame", side_effect=Exception("no ffmpeg"))
+    @patch("veo_lab.common.save_generated_video", side_effect=_fake_save)
+    @patch("veo_lab.common.wait_for_video_operation")
+    def test_submitted_job_is_reattached(self, mock_wait, _mock_save, _mock_extract, temp_dir):
+        """Test that in-flight operations are polled by name, not resubmitted."""
+        journal = JobJournal(temp_dir)
+        journal.record("01_prompt.mp4", SUBMITTED, op_name="operations/7")
+        client = Mock()
+        mock_wait.side_effect = lambda client, op, **kwargs: op
+
+        result = generate_video(
+            client, "prompt", session_dir=temp_dir, journal=journal, sequence_num=1
+        )
+
+        client.models.generate_videos.assert_not_called()
+        reattached_op = mock_wait.call_args[0][1]
+        assert reattached_op.name == "operations/7"
+        assert result.op_name == "operations/7"
+        assert _entry(journal, "01_prompt.mp4")["state"] == DONE
+
+    @patch("veo_lab.common.wait_for_video_operation", side_effect=RuntimeError("op failed"))
+    def test_failure_is_journaled(self, _mock_wait, temp_dir):
+        """Test that failed jobs are recorded so a resume resubmits them."""
+        journal = JobJournal(temp_dir)
+        client = Mock()
+        client.models.generate_videos.return_value = SimpleNamespace(name="operations/9")
+
+        with pytest.raises(RuntimeError):
+            generate_video(client, "prompt", session_dir=temp_dir, journal=journal, sequence_num=1)
+
+        entry = _entry(journal, "01_prompt.mp4")
+        assert entry["state"] == FAILED
+        assert entry["error"] == "op failed"
+
+    @patch("veo_lab.common.wait_for_video_operation", side_effect=TimeoutError("slow"))
+    def test_timeout_stays_submitted(self, _mock_wait, temp_dir):
+        """Test that a poll timeout leaves the job to be re-attached, not resubmitted."""
+        journal = JobJournal(temp_dir)
+        client = Mock()
+        client.models.generate_videos.return_value = SimpleNamespace(name="operations/9")
+
+        with pytest.raises(TimeoutError):
+            generate_video(client, "prompt", session_dir=temp_dir, journal=journal, sequence_num=1)
+
+        entry = _entry(journal, "01_prompt.mp4")
+        assert entry["state"] == SUBMITTED
+        assert entry["op_name"] == "operations/9"
+
+    def test_submit_failure_is_journaled(self, temp_dir):
+        """Test that a job the API never accepted is recorded as failed."""
+        journal = JobJournal(temp_dir)
+        client = Mock()
+        client.models.generate_videos.side_effect = ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            generate_video(client, "prompt", session_dir=temp_dir, journal=journal, sequence_num=1)
+
+        assert _entry(journal, "01_prompt.mp4")["state"] == FAILED
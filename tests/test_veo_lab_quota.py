@@ -0,0 +1,136 @@
+"""Tests for the cross-process quota ledger."""
+
+import multiprocessing
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from veo_lab.common import ModelQuota
+from veo_lab.common import RateLimiter
+from veo_lab.quota import QuotaLedger
+from veo_lab.quota import default_ledger
+
+
+def _submit_times(path, n, queue):
+    """Child process: take `n` paced submissions and report when each was granted."""
+    ledger = QuotaLedger(path)
+    for _ in range(n):
+        ledger.acquire("veo-x", rpm=600)
+        queue.put(time.time())
+
+
+class TestPacing:
+    """Test the shared submission pacing."""
+
+    def test_spacing_across_ledgers(self, temp_dir):
+        """Test that two ledger handles on one file share a single per-model budget."""
+        path = temp_dir / "quota.sqlite3"
+        first, second = QuotaLedger(path), QuotaLedger(path)
+        assert first.acquire("veo-x", rpm=600) == 0
+        waited = second.acquire("veo-x", rpm=600)
+        assert 0.05 < waited <= 0.1
+        assert second.acquire("veo-other", rpm=600) == 0
+
+    def test_unlimited_rpm(self, temp_dir):
+        """Test that a non-positive rpm never waits."""
+        ledger = QuotaLedger(temp_dir / "quota.sqlite3")
+        assert [ledger.acquire("veo-x", rpm=0) for _ in range(3)] == [0, 0, 0]
+
+    def test_defer(self, temp_dir):
+        """Test that defer holds back the next submission but never brings it forward."""
+        ledger = QuotaLedger(temp_dir / "quota.sqlite3")
+        ledger.defer("veo-x", 0.1)
+        ledger.defer("veo-x", 0.01)
+        assert 0.05 < ledger.acquire("veo-x", rpm=600) <= 0.1
+
+    def test_spacing_across_processes(self, temp_dir):
+        """Test that submissions from separate processes are spaced by the shared rpm."""
+        path = temp_dir / "quota.sqlite3"
+        QuotaLedger(path)
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        procs = [ctx.Process(target=_submit_times, args=(path, 3, queue)) for _ in range(2)]
+        for proc in procs:
+            proc.start()
+        times = sorted(queue.get(timeout=30) for _ in range(6))
+        for proc in procs:
+            proc.join(timeout=30)
+        gaps = [b - a for a, b in zip(times, times[1:], strict=False)]
+        assert min(gaps) > 0.08
+
+
+class TestLeases:
+    """Test the host-wide cap on operations in flight."""
+
+    def test_limit_blocks_until_release(self, temp_dir):
+        """Test that a second lease waits for the first to be released."""
+        path = temp_dir / "quota.sqlite3"
+        holder, waiter = QuotaLedger(path), QuotaLedger(path, poll_interval=0.02)
+        waited = []
+        done = threading.Event()
+
+        def wait_for_lease():
+            with waiter.lease("veo-x", limit=1) as seconds:
+                waited.append(seconds)
+                done.wait(5)
+
+        with holder.lease("veo-x", limit=1):
+            assert waiter.try_lease("veo-x", limit=1) is None
+            thread = threading.Thread(target=wait_for_lease)
+            thread.start()
+            time.sleep(0.15)
+            assert not waited
+        deadline = time.monotonic() + 5
+        while not waited and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert waited and waited[0] >= 0.1
+        assert holder.usage() == {"veo-x": 1}
+        done.set()
+        thread.join(timeout=5)
+        assert holder.usage() == {}
+
+    def test_dead_process_lease_is_reclaimed(self, temp_dir):
+        """Test that a lease left by a process that exited does not count."""
+        path = temp_dir / "quota.sqlite3"
+        code = (
+            "import pathlib, sys; from veo_lab.quota import QuotaLedger; "
+            "QuotaLedger(pathlib.Path(sys.argv[1])).try_lease('veo-x', 1)"
+        )
+        subprocess.run([sys.executable, "-c", code, str(path)], check=True)
+        ledger = QuotaLedger(path)
+        assert ledger.usage() == {}
+        assert ledger.try_lease("veo-x", limit=1) is not None
+
+
+class TestRateLimiter:
+    """Test RateLimiter's use of the ledger."""
+
+    def test_shared_limiter_uses_ledger(self, temp_dir, monkeypatch):
+        """Test that a shared limiter holds a ledger lease while its slot is held."""
+        monkeypatch.setenv("VEO_QUOTA_LEDGER", str(temp_dir / "quota.sqlite3"))
+        limiter = RateLimiter(default=ModelQuota(rpm=0, max_concurrent=2), shared=True)
+        ledger = default_ledger()
+        assert ledger is not None
+        with limiter.slot("veo-x"):
+            assert ledger.usage() == {"veo-x": 1}
+        assert ledger.usage() == {}
+
+    def test_disabled_ledger(self, monkeypatch):
+        """Test that VEO_QUOTA_LEDGER=0 falls back to in-process pacing."""
+        monkeypatch.setenv("VEO_QUOTA_LEDGER", "0")
+        assert default_ledger() is None
+        limiter = RateLimiter(default=ModelQuota(rpm=0, max_concurrent=1), shared=True)
+        with limiter.slot("veo-x"):
+            pass
+
+    @pytest.mark.parametrize("shared", [False, True])
+    def test_lookup(self, shared, temp_dir, monkeypatch):
+        """Test that `lookup` supplies quotas for models without an explicit one."""
+        monkeypatch.setenv("VEO_QUOTA_LEDGER", str(temp_dir / "quota.sqlite3"))
+        limiter = RateLimiter(
+            lookup=lambda model: ModelQuota(rpm=0, max_concurrent=3), shared=shared
+        )
+        assert limiter.quota("imagen-x").max_concurrent == 3
@@ -0,0 +1,294 @@
+"""Tests for retry classification, backoff and the quota circuit breaker."""
+
+import json
+import random
+import sqlite3
+import threading
+import time
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import httpx
+import pytest
+from google.genai import errors
+
+from veo_lab.common import generate_video
+from veo_lab.metrics import ClipMetrics
+from veo_lab.resilience import PERMANENT
+from veo_lab.resilience import QUOTA
+from veo_lab.resilience import TRANSIENT
+from veo_lab.resilience import CircuitBreaker
+from veo_lab.resilience import RetryPolicy
+from veo_lab.resilience import call_with_retry
+from veo_lab.resilience import classify
+from veo_lab.resilience import retry_after
+
+
+def _error(code, status, retry_delay=None, headers=None):
+    error = {"code": code, "status": status, "message": "boom"}
+    if retry_delay:
+        error["details"] = [
+            {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": retry_delay}
+        ]
+    response = httpx.Response(code, headers=headers or {})
+    cls = errors.ClientError if code < 500 else errors.ServerError
+    return cls(code, {"error": error}, response)
+
+
+def _flaky(*outcomes):
+    """A callable raising or returning each of `outcomes` in turn."""
+    calls = iter(outcomes)
+
+    def fn():
+        outcome = next(calls)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return fn
+
+
+FAST = RetryPolicy(max_attempts=4, base=0.01, cap=0.02, quota_cooldown=0.05)
+
+
+class TestClassify:
+    """Test error classification."""
+
+    @pytest.mark.parametrize(
+        ("error", "kind"),
+        [
+            (_error(429, "RESOURCE_EXHAUSTED"), QUOTA),
+            (_error(503, "UNAVAILABLE"), TRANSIENT),
+            (_error(500, "INTERNAL"), TRANSIENT),
+            (_error(408, "DEADLINE_EXCEEDED"), TRANSIENT),
+            (_error(400, "INVALID_ARGUMENT"), PERMANENT),
+            (_error(403, "PERMISSION_DENIED"), PERMANENT),
+            (httpx.ConnectError("refused"), TRANSIENT),
+            (TimeoutError(), TRANSIENT),
+            (ValueError("bad prompt"), PERMANENT),
+        ],
+    )
+    def test_classes(self, error, kind):
+        """Test that each error maps to its retry class."""
+        assert classify(error) == kind
+
+    def test_retry_after_header(self):
+        """Test that the Retry-After header is honored."""
+        assert retry_after(_error(503, "UNAVAILABLE", headers={"Retry-After": "7"})) == 7.0
+
+    def test_retry_info_detail(self):
+        """Test that google.rpc.RetryInfo's retryDelay is honored."""
+        assert retry_after(_error(429, "RESOURCE_EXHAUSTED", retry_delay="37s")) == 37.0
+
+    def test_no_hint(self):
+        """Test that errors without a hint give None."""
+        assert retry_after(_error(500, "INTERNAL")) is None
+        assert retry_after(ValueError()) is None
+
+
+class TestRetryPolicy:
+    """Test the backoff schedule."""
+
+    def test_full_jitter_within_cap(self):
+        """Test that delays are jittered below the exponential ceiling and the cap."""
+        policy = RetryPolicy(base=2.0, cap=10.0)
+        rng = random.Random(0)
+        for attempt, ceiling in [(1, 2.0), (2, 4.0), (3, 8.0), (4, 10.0), (9, 10.0)]:
+            delays = [policy.backoff(attempt, rng) for _ in range(50)]
+            assert all(0 <= d <= ceiling for d in delays)
+            assert len(set(delays)) > 1
+
+    def test_from_env(self, monkeypatch):
+        """Test that VEO_RETRY_* override the defaults."""
+        monkeypatch.setenv("VEO_RETRY_ATTEMPTS", "2")
+        monkeypatch.setenv("VEO_RETRY_BASE", "0.5")
+        monkeypatch.setenv("VEO_RETRY_CAP", "3")
+        assert RetryPolicy.from_env() == RetryPolicy(max_attempts=2, base=0.5, cap=3.0)
+
+
+class TestCallWithRetry:
+    """Test the retry loop and the decisions it records."""
+
+    def test_transient_then_success(self):
+        """Test that transient errors are retried and recorded in the metrics."""
+        metrics = ClipMetrics()
+        fn = _flaky(_error(503, "UNAVAILABLE"), httpx.ReadTimeout("slow"), "op")
+        result = call_with_retry(
+            fn, model="veo-x", metrics=metrics, policy=FAST, breaker=CircuitBreaker()
+        )
+        assert result == "op"
+        assert metrics.submit_retries == 2
+        assert [d["error"] for d in metrics.retry_decisions] == [TRANSIENT, TRANSIENT]
+        assert [d["source"] for d in metrics.retry_decisions] == ["backoff", "backoff"]
+        assert metrics.stages["backoff"] > 0
+        assert "submit" in metrics.stages
+
+    def test_permanent_raises_at_once(self):
+        """Test that permanent errors are not retried."""
+        fn = Mock(side_effect=_error(400, "INVALID_ARGUMENT"))
+        metrics = ClipMetrics()
+        with pytest.raises(errors.ClientError):
+            call_with_retry(fn, model="veo-x", metrics=metrics, policy=FAST)
+        assert fn.call_count == 1
+        assert metrics.submit_retries == 0
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that retries stop at max_attempts and the give-up is recorded."""
+        fn = Mock(side_effect=_error(500, "INTERNAL"))
+        metrics = ClipMetrics()
+        with pytest.raises(errors.ServerError):
+            call_with_retry(fn, model="veo-x", metrics=metrics, policy=FAST)
+        assert fn.call_count == FAST.max_attempts
+        assert metrics.retry_decisions[-1]["action"] == "give_up"
+
+    def test_retry_after_overrides_backoff(self):
+        """Test that a server Retry-After replaces the jittered delay."""
+        metrics = ClipMetrics()
+        fn = _flaky(_error(503, "UNAVAILABLE", headers={"Retry-After": "0.05"}), "op")
+        call_with_retry(fn, model="veo-x", metrics=metrics, policy=FAST)
+        assert metrics.retry_decisions[0]["source"] == "retry_after"
+        assert metrics.retry_decisions[0]["delay"] == 0.05
+
+    def test_ambiguous_errors_not_retried_for_non_idempotent_calls(self):
+        """Test that a lost response is not retried when a retry could double-submit."""
+        fn = Mock(side_effect=httpx.ReadTimeout("slow"))
+        metrics = ClipMetrics()
+        with pytest.raises(httpx.ReadTimeout):
+            call_with_retry(fn, model="veo-x", metrics=metrics, policy=FAST, idempotent=False)
+        assert fn.call_count == 1
+        assert metrics.retry_decisions == [{"attempt": 1, "error": TRANSIENT, "action": "give_up"}]
+
+    def test_definite_errors_retried_for_non_idempotent_calls(self):
+        """Test that 5xx and 429 responses are still retried: the server refused the call."""
+        fn = _flaky(_error(503, "UNAVAILABLE"), _error(429, "RESOURCE_EXHAUSTED"), "op")
+        result = call_with_retry(
+            fn, model="veo-x", policy=FAST, breaker=CircuitBreaker(), idempotent=False
+        )
+        assert result == "op"
+
+    def test_quota_defers_ledger(self, temp_dir, monkeypatch):
+        """Test that a quota error pushes back other processes' next submission."""
+        path = temp_dir / "quota.sqlite3"
+        monkeypatch.setenv("VEO_QUOTA_LEDGER", str(path))
+        fn = _flaky(_error(429, "RESOURCE_EXHAUSTED", retry_delay="0.1s"), "op")
+        metrics = ClipMetrics()
+        start = time.time()
+        assert call_with_retry(fn, model="veo-x", metrics=metrics, policy=FAST) == "op"
+        assert metrics.retry_decisions[0]["source"] == "breaker"
+        assert metrics.stages["backoff"] >= 0.09
+        with sqlite3.connect(path) as db:
+            (next_submit,) = db.execute("SELECT next_submit FROM pacing").fetchone()
+        assert next_submit >= start + 0.1
+
+
+class TestCircuitBreaker:
+    """Test the shared pause on quota exhaustion."""
+
+    def test_trip_pauses_other_callers(self):
+        """Test that one worker's quota error holds back the others."""
+        breaker = CircuitBreaker()
+        tripped = threading.Event()
+        started = []
+
+        def other():
+            tripped.wait()
+            breaker.wait()
+            started.append(time.monotonic())
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        trip_at = time.monotonic()
+        breaker.trip(0.2)
+        tripped.set()
+        thread.join(5)
+        assert started and started[0] - trip_at >= 0.19
+
+    def test_half_open_single_probe(self):
+        """Test that after the cooldown only one caller probes until it succeeds."""
+        breaker = CircuitBreaker()
+        breaker.trip(0.01)
+        time.sleep(0.02)
+        breaker.wait()  # this caller is the probe
+        assert breaker.is_open
+        released = threading.Event()
+        thread = threading.Thread(target=lambda: (breaker.wait(), released.set()))
+        thread.start()
+        assert not released.wait(0.1)
+        breaker.success()
+        assert released.wait(2)
+        thread.join()
+        assert not breaker.is_open
+
+    def test_repeated_trips_double(self):
+        """Test that consecutive trips lengthen the pause up to the maximum."""
+        breaker = CircuitBreaker(max_cooldown=3.0)
+        assert [breaker.trip(1.0) for _ in range(3)] == [1.0, 2.0, 3.0]
+        breaker.success()
+        assert breaker.trip(1.0) == 1.0
+
+    def test_probe_out_of_attempts(self):
+        """Test that a probe giving up on a quota error does not leave the breaker stuck."""
+        breaker = CircuitBreaker()
+        breaker.trip(0.01)
+        policy = RetryPolicy(max_attempts=1, quota_cooldown=0.01)
+        with pytest.raises(errors.ClientError):
+            call_with_retry(
+                Mock(side_effect=_error(429, "RESOURCE_EXHAUSTED")),
+                model="veo-x",
+                policy=policy,
+                breaker=breaker,
+            )
+        done = threading.Event()
+        thread = threading.Thread(
+            target=lambda: (
+                call_with_retry(lambda: "op", model="veo-x", policy=policy, breaker=breaker),
+                done.set(),
+            )
+        )
+        thread.start()
+        assert done.wait(2)
+        thread.join()
+        assert not breaker.is_open
+
+    def test_probe_interrupted(self):
+        """Test that a probe interrupted by a non-Exception error releases the breaker."""
+        breaker = CircuitBreaker()
+        breaker.trip(0.01)
+        with pytest.raises(KeyboardInterrupt):
+            call_with_retry(
+                Mock(side_effect=KeyboardInterrupt), model="veo-x", policy=FAST, breaker=breaker
+            )
+        assert breaker.wait() < 1.0
+
+
+class TestRenderRetries:
+    """Test retries surfacing in the per-clip metrics."""
+
+    @patch("veo_lab.common.save_generated_video")
+    @patch("veo_lab.common.wait_for_video_operation")
+    def test_submit_retry_recorded(self, mock_wait, mock_save, temp_dir):
+        """Test that a retried generate_videos call is saved in the session metrics."""
+        op = Mock()
+        op.name = "operations/1"
+        client = Mock()
+        client.models.generate_videos.side_effect = [_error(503, "UNAVAILABLE"), op]
+        mock_wait.return_value = op
+        mock_save.side_effect = lambda client, op, dest: dest.touch() or dest
+
+        generate_video(client, "a fox", script_name="test_script", session_dir=temp_dir)
+
+        assert client.models.generate_videos.call_count == 2
+        metadata = json.loads((temp_dir / "metadata.json").read_text())
+        (record,) = metadata["metrics"].values()
+        assert record["submit_retries"] == 1
+        assert record["retry_decisions"][0]["code"] == 503
+
+    def test_submit_timeout_not_resubmitted(self, temp_dir):
+        """Test that generate_videos is not called again after a timed-out submission."""
+        client = Mock()
+        client.models.generate_videos.side_effect = httpx.ReadTimeout("slow")
+
+        with pytest.raises(httpx.ReadTimeout):
+            generate_video(client, "a fox", script_name="test_script", session_dir=temp_dir)
+
+        assert client.models.generate_videos.call_count == 1
@@ -0,0 +1,83 @@
+"""Tests for veo_lab.stats latency aggregation."""
+
+import json
+
+from typer.testing import CliRunner
+
+from veo_lab.metrics import ClipMetrics
+from veo_lab.metrics import percentile
+from veo_lab.stats import app
+from veo_lab.stats import collect_metrics
+from veo_lab.stats import summarize
+
+
+def _session(root, name, records):
+    session = root / "2025-01-01" / name
+    session.mkdir(parents=True)
+    metadata = {"files": list(records), "metrics": records}
+    (session / "metadata.json").write_text(json.dumps(metadata))
+    return session
+
+
+class TestPercentile:
+    """Test nearest-rank percentiles."""
+
+    def test_nearest_rank(self):
+        """Test p50 and p95 on a small sample."""
+        samples = [float(i) for i in range(1, 21)]
+        assert percentile(samples, 50) == 10
+        assert percentile(samples, 95) == 19
+        assert percentile([7.0], 95) == 7
+
+
+class TestClipMetrics:
+    """Test stage timing accumulation."""
+
+    def test_stage_accumulates_even_on_error(self):
+        """Test that repeated and failing stages still add their time."""
+        metrics = ClipMetrics()
+        metrics.add("download", 1.5)
+        try:
+            with metrics.stage("download"):
+                raise OSError("disk full")
+        except OSError:
+            pass
+        assert metrics.stages["download"] >= 1.5
+
+
+class TestStats:
+    """Test aggregation across sessions."""
+
+    def test_summarize_per_model_and_stage(self, temp_dir):
+        """Test that samples from every session are grouped by model and stage."""
+        _session(
+            temp_dir,
+            "a",
+            {
+                "01.mp4": {"model": "veo-x", "stages": {"render": 60, "download": 2}, "polls": 4},
+                "02.mp4": {"model": "veo-x", "stages": {"render": 80, "download": 4}, "polls": 6},
+            },
+        )
+        _session(temp_dir, "b", {"final.mp4": {"model": "veo-y", "stages": {"concat": 1.0}}})
+        (temp_dir / "2025-01-01" / "broken").mkdir()
+        (temp_dir / "2025-01-01" / "broken" / "metadata.json").write_text("{")
+
+        records = collect_metrics(temp_dir)
+        summary = summarize(records)
+
+        assert len(records) == 3
+        assert summary["veo-x"]["render"] == {"n": 2, "p50": 60, "p95": 80, "max": 80}
+        assert summary["veo-x"]["polls"]["p95"] == 6
+        assert list(summary["veo-x"])[:2] == ["render", "download"]
+        assert summary["veo-y"] == {"concat": {"n": 1, "p50": 1.0, "p95": 1.0, "max": 1.0}}
+
+    def test_cli_table_and_json(self, temp_dir):
+        """Test the stats command output formats."""
+        _session(temp_dir, "a", {"01.mp4": {"model": "veo-x", "stages": {"render": 61.0}}})
+
+        table = CliRunner().invoke(app, [str(temp_dir)])
+        as_json = CliRunner().invoke(app, [str(temp_dir), "--json"])
+
+        assert table.exit_code == 0
+        assert "veo-x" in table.output and "61.0s" in table.output
+        assert json.loads(as_json.output)["veo-x"]["render"]["p50"] == 61.0
@@ -0,0 +1,135 @@
+"""Tests for veo_lab.tracing span export."""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+from unittest.mock import patch
+
+import pytest
+
+from veo_lab import tracing
+from veo_lab.common import generate_video
+
+
+def _spans(path):
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource in json.loads(line)["resourceSpans"]:
+            for scope in resource["scopeSpans"]:
+                spans.extend(scope["spans"])
+    return {span["name"]: span for span in spans}
+
+
+@pytest.fixture
+def trace_file(temp_dir):
+    path = temp_dir / "trace.jsonl"
+    tracing.configure(path)
+    return path
+
+
+class TestSpans:
+    """Test span nesting and the OTLP/JSON layout."""
+
+    def test_nested_spans_share_trace(self, trace_file):
+        """Test that children carry the root's trace id and their parent's span id."""
+        with tracing.span("root", command="x"), tracing.span("child"):
+            tracing.record_span("waited", 1.5)
+
+        spans = _spans(trace_file)
+        root, child, waited = spans["root"], spans["child"], spans["waited"]
+        assert root["parentSpanId"] == ""
+        assert child["parentSpanId"] == root["spanId"]
+        assert waited["parentSpanId"] == child["spanId"]
+        assert len({root["traceId"], child["traceId"], waited["traceId"]}) == 1
+        assert root["attributes"] == [{"key": "command", "value": {"stringValue": "x"}}]
+        duration = int(waited["endTimeUnixNano"]) - int(waited["startTimeUnixNano"])
+        assert duration == pytest.approx(1.5e9, rel=0.01)
+
+    def test_error_status_and_resource(self, trace_file):
+        """Test that a raising block marks its span failed and lines are OTLP requests."""
+        with pytest.raises(ValueError), tracing.span("broken"):
+            raise ValueError("bad prompt")
+
+        line = json.loads(trace_file.read_text())
+        resource = line["resourceSpans"][0]
+        keys = {a["key"] for a in resource["resource"]["attributes"]}
+        assert {"service.name", "process.pid"} <= keys
+        assert resource["scopeSpans"][0]["spans"][0]["status"] == {
+            "code": 2,
+            "message": "bad prompt",
+        }
+
+    def test_bind_carries_parent_into_pool(self, trace_file):
+        """Test that work submitted through bind() nests under the submitting span."""
+
+        def work():
+            with tracing.span("worker", thread=threading.current_thread().name):
+                pass
+
+        with tracing.span("root"), ThreadPoolExecutor(1) as pool:
+            pool.submit(tracing.bind(work)).result()
+
+        spans = _spans(trace_file)
+        assert spans["worker"]["parentSpanId"] == spans["root"]["spanId"]
+
+    def test_disabled_is_noop(self, temp_dir):
+        """Test that nothing is written and no-op spans are returned when tracing is off."""
+        assert tracing.span("x") is tracing.NOOP_SPAN
+
+        def fn():
+            return 1
+
+        assert tracing.bind(fn) is fn
+        with tracing.span("y") as span:
+            span.set("k", 1)
+        tracing.record_span("z", 1.0)
+        assert not list(temp_dir.iterdir())
+
+    def test_env_setting(self, temp_dir, monkeypatch):
+        """Test that VEO_TRACE selects an output path on first use."""
+        path = temp_dir / "env.jsonl"
+        monkeypatch.setenv("VEO_TRACE", str(path))
+        monkeypatch.setattr(tracing, "_configured", False)
+        with tracing.span("from-env"):
+            pass
+        assert "from-env" in _spans(path)
+
+    def test_traced_command_keeps_signature(self, trace_file):
+        """Test that @traced keeps the wrapped signature typer reads options from."""
+        import inspect
+
+        from veo_lab.simple import run
+
+        assert "prompt" in inspect.signature(run).parameters
+
+
+class TestPipelineSpans:
+    """Test the spans emitted around a rendered clip."""
+
+    @patch("veo_lab.common.extract_last_frame")
+    @patch("veo_lab.common.save_generated_video")
+    @patch("veo_lab.common.wait_for_video_operation")
+    def test_job_tree(self, mock_wait_op, mock_save_video, mock_extract, temp_dir, trace_file):
+        """Test that one clip yields a job span with slot, submit, poll and download children."""
+        mock_wait_op.side_effect = lambda client, op, *, model, metrics: op
+        mock_save_video.side_effect = lambda client, op, dest: dest.write_bytes(b"x")
+
+        with tracing.span("simple.run"):
+            generate_video(
+                Mock(), "trace prompt", model="veo-x", script_name="t", session_dir=temp_dir
+            )
+
+        spans = _spans(trace_file)
+        run, job = spans["simple.run"], spans["veo.job"]
+        assert job["parentSpanId"] == run["spanId"]
+        for name in (
+            "veo.slot_wait",
+            "veo.submit",
+            "veo.poll",
+            "veo.download",
+            "ffmpeg.last_frame",
+        ):
+            assert spans[name]["parentSpanId"] == job["spanId"], name
+        attributes = {a["key"]: a["value"] for a in job["attributes"]}
+        assert attributes["model"] == {"stringValue": "veo-x"}
@@ -0,0 +1,207 @@
+"""Tests for the Files API upload cache."""
+
+import io
+import json
+import threading
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from unittest.mock import Mock
+
+import pytest
+from google.genai import errors
+
+from imagen_lab.common import analyze_image
+from veo_lab.cassette import Cassette
+from veo_lab.fake_backend import FakeBackend
+from veo_lab.fake_backend import FakeClient
+from veo_lab.fake_backend import FakeConfig
+from veo_lab.uploads import UploadCache
+from veo_lab.uploads import UploadHandle
+from veo_lab.uploads import files_api_supported
+from veo_lab.uploads import image_part
+
+DATA = b"\x89PNG fake reference image"
+
+
+@pytest.fixture
+def client():
+    return FakeClient(FakeBackend(FakeConfig()))
+
+
+def _uploads(client):
+    return client.backend.calls.get("files.upload", 0)
+
+
+def _handle(cache, client, data=DATA):
+    handle = cache.handle(client, data, "image/png")
+    assert handle is not None
+    return handle
+
+
+def _inline(part):
+    assert part.inline_data is not None and part.file_data is None
+    return part.inline_data.data
+
+
+def _file_uri(part):
+    assert part.file_data is not None and part.inline_data is None
+    return part.file_data.file_uri or ""
+
+
+def _store_handle(cache, expires):
+    handle = UploadHandle("files/old", "https://x/files/old", "image/png", expires.isoformat())
+    cache.store(UploadCache.digest(DATA), handle)
+
+
+class TestUploadCache:
+    """Test upload reuse and expiry."""
+
+    def test_uploads_once(self, client, temp_dir):
+        """Test that repeated requests for one image share a single upload."""
+        cache = UploadCache(temp_dir)
+        first = _handle(cache, client)
+        second = _handle(cache, client)
+        assert first == second
+        assert first.uri.endswith(first.name)
+        assert _uploads(client) == 1
+
+    def test_shared_across_instances(self, client, temp_dir):
+        """Test that handles persist for other processes pointing at the same root."""
+        UploadCache(temp_dir).handle(client, DATA, "image/png")
+        assert UploadCache(temp_dir).lookup(UploadCache.digest(DATA)) is not None
+        UploadCache(temp_dir).handle(client, DATA, "image/png")
+        assert _uploads(client) == 1
+
+    def test_distinct_content(self, client, temp_dir):
+        """Test that different bytes get different uploads."""
+        cache = UploadCache(temp_dir)
+        a = _handle(cache, client)
+        b = _handle(cache, client, DATA + b"!")
+        assert a.uri != b.uri
+        assert _uploads(client) == 2
+
+    def test_expiring_handle_is_replaced(self, client, temp_dir):
+        """Test that a handle close to expiry is uploaded again."""
+        cache = UploadCache(temp_dir)
+        _store_handle(cache, datetime.now(UTC) + timedelta(minutes=5))
+        assert cache.lookup(UploadCache.digest(DATA)) is None
+        handle = _handle(cache, client)
+        assert handle.name != "files/old"
+        assert _uploads(client) == 1
+
+    def test_concurrent_single_upload(self, client, temp_dir):
+        """Test that workers asking for the same image at once upload it once."""
+        cache = UploadCache(temp_dir)
+        handles = []
+        threads = [
+            threading.Thread(target=lambda: handles.append(cache.handle(client, DATA, "image/png")))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(set(handles)) == 1
+        assert _uploads(client) == 1
+
+    def test_upload_failure(self, temp_dir):
+        """Test that a failed upload gives no handle and stores nothing."""
+        client = FakeClient(FakeBackend(FakeConfig(error_500=1.0)))
+        cache = UploadCache(temp_dir)
+        assert cache.handle(client, DATA, "image/png") is None
+        assert cache.lookup(UploadCache.digest(DATA)) is None
+
+
+class TestImagePart:
+    """Test choosing between a file reference and inline bytes."""
+
+    def test_inline_first_then_reference(self, client, temp_dir):
+        """Test that an image is sent inline once and uploaded when it is reused."""
+        cache = UploadCache(temp_dir)
+        assert _inline(image_part(client, DATA, "image/png", cache)) == DATA
+        assert _uploads(client) == 0
+        second = _file_uri(image_part(client, DATA, "image/png", cache))
+        assert second.startswith("https://")
+        assert _file_uri(image_part(client, DATA, "image/png", cache)) == second
+        assert _uploads(client) == 1
+
+    def test_large_image_uploaded_at_once(self, client, temp_dir, monkeypatch):
+        """Test that an image over the inline limit is uploaded on first use."""
+        monkeypatch.setattr("veo_lab.uploads.INLINE_LIMIT", len(DATA) - 1)
+        assert _file_uri(image_part(client, DATA, "image/png", UploadCache(temp_dir)))
+        assert _uploads(client) == 1
+
+    def test_stored_handle_used_at_once(self, client, temp_dir):
+        """Test that a handle uploaded by another process is used on first sight."""
+        cache = UploadCache(temp_dir)
+        _store_handle(cache, datetime.now(UTC) + timedelta(hours=1))
+        part = image_part(client, DATA, "image/png", cache)
+        assert _file_uri(part) == "https://x/files/old"
+        assert _uploads(client) == 0
+
+    def test_disabled_is_inline(self, client):
+        """Test that VEO_UPLOADS=0 (the test default) sends the bytes."""
+        for _ in range(2):
+            assert _inline(image_part(client, DATA, "image/png")) == DATA
+        assert _uploads(client) == 0
+
+    def test_vertex_is_inline(self, temp_dir):
+        """Test that Vertex AI clients, which have no Files API, send the bytes."""
+        client = Mock()
+        client._api_client.vertexai = True
+        assert not files_api_supported(client)
+        cache = UploadCache(temp_dir)
+        for _ in range(2):
+            assert _inline(image_part(client, DATA, "image/png", cache)) == DATA
+        client.files.upload.assert_not_called()
+
+    def test_failed_upload_is_inline(self, temp_dir):
+        """Test that a failed upload falls back to inline bytes."""
+        client = FakeClient(FakeBackend(FakeConfig(error_500=1.0)))
+        cache = UploadCache(temp_dir)
+        for _ in range(2):
+            assert _inline(image_part(client, DATA, "image/png", cache)) == DATA
+
+
+class TestAnalyzeImage:
+    """Test the upload cache in imagen_lab's image analysis."""
+
+    def test_reuses_upload(self, client, temp_dir, monkeypatch):
+        """Test that a one-off analysis sends bytes and repeated ones share one upload."""
+        monkeypatch.setattr("veo_lab.uploads.UPLOADS_ROOT", temp_dir)
+        monkeypatch.setenv("VEO_UPLOADS", "1")
+        analyze_image(client, "gemini-x", DATA, "image/png")
+        assert _uploads(client) == 0
+        for _ in range(2):
+            analyze_image(client, "gemini-x", DATA, "image/png")
+        assert _uploads(client) == 1
+        assert client.backend.calls["generate_content"] == 3
+
+    def test_rejected_handle_falls_back(self, temp_dir, monkeypatch):
+        """Test that a handle the API rejects is forgotten and the bytes are sent."""
+        monkeypatch.setattr("veo_lab.uploads.UPLOADS_ROOT", temp_dir)
+        monkeypatch.setenv("VEO_UPLOADS", "1")
+        _store_handle(UploadCache(temp_dir), datetime.now(UTC) + timedelta(hours=1))
+        client = Mock()
+        client._api_client.vertexai = False
+        missing = errors.ClientError(404, {"error": {"code": 404, "message": "File not found"}})
+        client.models.generate_content.side_effect = [missing, Mock(text="a fox")]
+
+        assert analyze_image(client, "gemini-x", DATA, "image/png") == "a fox"
+        first, retry = client.models.generate_content.call_args_list
+        assert _file_uri(first.kwargs["contents"][1]) == "https://x/files/old"
+        assert _inline(retry.kwargs["contents"][1]) == DATA
+        assert UploadCache(temp_dir).lookup(UploadCache.digest(DATA)) is None
+
+
+class TestCassetteUploads:
+    """Test that uploads record with a stable request key."""
+
+    def test_bytes_io_dumped_as_blob(self, temp_dir):
+        """Test that an upload source is stored by content, not by object identity."""
+        cassette = Cassette(temp_dir)
+        first = cassette.dump({"file": io.BytesIO(DATA)})
+        second = cassette.dump({"file": io.BytesIO(DATA)})
+        assert first == second
+        assert json.dumps(first) and "$blob" in first["file"]